@@ -4,6 +4,10 @@ from sqlalchemy.dialects.postgresql import UUID
 
 class IoFlight(db.Model):
     __tablename__ = "io_flight"
+    __table_args__ = (
+        # 1人1日1レコード（入山で作成・2回目のスキャンで下山を記録）
+        db.Index("ux_io_flight_uuid_entry_date", "uuid", "entry_date", unique=True),
+    )
 
     id                  = db.Column(db.Integer, primary_key=True)
     member_number       = db.Column(db.String(20))
@@ -26,3 +30,10 @@ class IoFlight(db.Model):
     comment             = db.Column(db.String(255))                               # 備考
     entrance_fee_paid    = db.Column(db.Boolean, nullable=False, default=False)    # 入山料入金確認
     yamachin_confirmed  = db.Column(db.Boolean, nullable=False, default=False)    # 山チン入金確認
+
+
+# 過去シーズンのアーカイブ（io_flight と同じ列構成。app.routes.retention が移動する）
+io_flight_archive = db.Table(
+    "io_flight_archive", db.metadata,
+    *(db.Column(c.name, c.type, primary_key=c.primary_key) for c in IoFlight.__table__.columns),
+)
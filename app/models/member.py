@@ -4,6 +4,7 @@ members テーブル SQLAlchemy モデル
 DB構成V5 対応（2026-03-23）
 
 改定８（2026-03-31）: is_leader / instructor_role カラム追加
+改定９（2026-10-18）: search_key カラム追加（氏名検索用の正規化キー）
 
 members テーブルは個人の基本情報・ステータスのみを保持する。
 連絡先    → member_contacts
@@ -32,6 +33,7 @@ class Member(db.Model):
     # ── 基本個人情報 ──────────────────────────────────────────────
     full_name     = db.Column(db.Text)                                            # 氏名
     furigana      = db.Column(db.Text)                                            # ふりがな
+    search_key    = db.Column(db.Text)                                            # 氏名検索キー（member_name_search で自動更新）
     gender        = db.Column(db.Text)                                            # 性別
     blood_type    = db.Column(db.Text)                                            # 血液型
     birthday      = db.Column(db.Date)                                            # 生年月日
@@ -20,9 +20,27 @@ member_contacts テーブル SQLAlchemy モデル
     db.session.add(contact)
 """
 from app.db import db
+from app.serializers import Serializer, ymd_hm
 from datetime import datetime
 
 
+_to_dict = Serializer({
+    "id":               None,
+    "member_id":        None,
+    "zip_code":         None,
+    "address":          None,
+    "mobile_phone":     None,
+    "home_phone":       None,
+    "email":            None,
+    "company_name":     None,
+    "company_phone":    None,
+    "emergency_name":   None,
+    "emergency_phone":  None,
+    "medical_history":  None,
+    "updated_at":       ymd_hm,
+})
+
+
 class MemberContact(db.Model):
     __tablename__ = "member_contacts"
 
@@ -72,22 +90,7 @@ class MemberContact(db.Model):
     # ── ヘルパーメソッド ──────────────────────────────────────────
 
     def to_dict(self) -> dict:
-        return {
-            "id":               self.id,
-            "member_id":        self.member_id,
-            "zip_code":         self.zip_code,
-            "address":          self.address,
-            "mobile_phone":     self.mobile_phone,
-            "home_phone":       self.home_phone,
-            "email":            self.email,
-            "company_name":     self.company_name,
-            "company_phone":    self.company_phone,
-            "emergency_name":   self.emergency_name,
-            "emergency_phone":  self.emergency_phone,
-            "medical_history":  self.medical_history,
-            "updated_at":       self.updated_at.strftime("%Y-%m-%d %H:%M")
-                                if self.updated_at else None,
-        }
+        return _to_dict(self)
 
     def apply_dict(self, data: dict) -> None:
         """dict からフィールドを一括セット"""
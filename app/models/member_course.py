@@ -29,13 +29,35 @@ member_type の値:
 course_name の値（member_type が冬季会員 / スクールの場合のみ）:
     冬季会員: 'ALL'（12/1〜4/30） / '1'〜'4'（月入会）
     スクール: 'B' / 'NP' / 'P' / 'XC' / 'T'
+
+「現在有効なコースは1会員1件」の保証（2026-10-18 追加）:
+    部分一意インデックス ux_member_courses_current
+      ON member_courses (member_id) WHERE status = 'active' AND end_date IS NULL
+    で DB 側が2件目の current を拒否する。
+    コースの切り替えは MemberCourse.start_new() を使うこと
+    （会員行をロック → 現在コースを終了 → 新コースを追加 を1か所で行う）。
 """
 from app.db import db
+from app.serializers import Serializer, iso, ymd_hm, obj
 from datetime import datetime, date
+from sqlalchemy import text
+
+
+# start_new(current=...) を省略したときの印（None は「現在コースなし」を表すため別に用意）
+CURRENT_NOT_LOADED = object()
 
 
 class MemberCourse(db.Model):
     __tablename__ = "member_courses"
+    __table_args__ = (
+        # 現在有効なコースは1会員につき1件のみ
+        db.Index(
+            "ux_member_courses_current",
+            "member_id",
+            unique=True,
+            postgresql_where=db.text("status = 'active' AND end_date IS NULL"),
+        ),
+    )
 
     # ── カラム定義 ────────────────────────────────────────────────
 
@@ -110,25 +132,7 @@ class MemberCourse(db.Model):
 
     def to_dict(self) -> dict:
         """JSON シリアライズ可能な dict に変換"""
-        def fd(d):
-            return d.isoformat() if d else None
-
-        return {
-            "id":             self.id,
-            "member_id":      self.member_id,
-            "member_type":    self.member_type,
-            "course_name":    self.course_name,
-            "course_fee":     self.course_fee,
-            "start_date":     fd(self.start_date),
-            "end_date":       fd(self.end_date),
-            "status":         self.status,
-            "confirmed_by":   self.confirmed_by,
-            "application_id": self.application_id,
-            "display_name":   self.display_name,
-            "is_active":      self.is_active,
-            "created_at":     self.created_at.strftime("%Y-%m-%d %H:%M")
-                              if self.created_at else None,
-        }
+        return _to_dict(self)
 
     def expire(self, end_date: date = None) -> None:
         """このコースを終了させる（次のコース開始時に呼ぶ）"""
@@ -136,14 +140,66 @@ class MemberCourse(db.Model):
         self.status    = 'expired'
         self.updated_at = datetime.utcnow()
 
+    @classmethod
+    def current_filter(cls):
+        """現在有効なコースの条件（ux_member_courses_current と同じ）"""
+        return db.and_(cls.status == 'active', cls.end_date.is_(None))
+
     @classmethod
     def get_current(cls, member_id: int) -> "MemberCourse | None":
-        """指定会員の現在有効なコースを1件返す"""
-        return cls.query.filter_by(
-            member_id=member_id,
-            status='active',
-            end_date=None,
-        ).order_by(cls.start_date.desc()).first()
+        """指定会員の現在有効なコースを1件返す（部分一意インデックスで高々1件）"""
+        return cls.query.filter(
+            cls.member_id == member_id,
+            cls.current_filter(),
+        ).first()
+
+    @classmethod
+    def get_current_many(cls, member_ids) -> dict:
+        """member_id → 現在有効なコース を1クエリで返す（コースのない会員は含まない）"""
+        member_ids = set(member_ids)
+        if not member_ids:
+            return {}
+        return {
+            c.member_id: c for c in
+            cls.query.filter(cls.member_id.in_(member_ids), cls.current_filter()).all()
+        }
+
+    @classmethod
+    def start_new(cls, member_id: int, member_type: str, start_date: date,
+                  course_name=None, course_fee=None, confirmed_by=None,
+                  application_id=None, end_current_on: date = None,
+                  current=CURRENT_NOT_LOADED) -> "MemberCourse":
+        """
+        現在コースを終了し、新しいコースを現在有効として追加する。
+        同一会員への同時切り替えは members 行のロックで直列化する。
+        現在コースの終了日は end_current_on（省略時は start_date）。
+        current に現在コース（なければ None）を渡すとロックと再取得を省く。
+        その場合は呼び出し側で members 行をロックしてから読んだものを渡すこと。
+        commit は呼び出し側で行う。
+        """
+        if current is CURRENT_NOT_LOADED:
+            db.session.execute(
+                text("SELECT id FROM members WHERE id = :id FOR UPDATE"),
+                {"id": member_id},
+            )
+            current = cls.get_current(member_id)
+        if current:
+            current.expire(end_date=end_current_on or start_date)
+            db.session.flush()   # 旧コースを先に終了させ、一意インデックス違反を防ぐ
+
+        new_course = cls(
+            member_id      = member_id,
+            member_type    = member_type,
+            course_name    = course_name,
+            course_fee     = course_fee,
+            start_date     = start_date,
+            end_date       = None,
+            status         = 'active',
+            confirmed_by   = confirmed_by,
+            application_id = application_id,
+        )
+        db.session.add(new_course)
+        return new_course
 
     @classmethod
     def get_history(cls, member_id: int) -> list:
@@ -151,3 +207,20 @@ class MemberCourse(db.Model):
         return cls.query.filter_by(
             member_id=member_id,
         ).order_by(cls.start_date.desc()).all()
+
+
+_to_dict = Serializer({
+    "id":             None,
+    "member_id":      None,
+    "member_type":    None,
+    "course_name":    None,
+    "course_fee":     None,
+    "start_date":     iso,
+    "end_date":       iso,
+    "status":         None,
+    "confirmed_by":   None,
+    "application_id": None,
+    "display_name":   obj(lambda c: c.display_name),
+    "is_active":      obj(lambda c: c.is_active),
+    "created_at":     ymd_hm,
+})
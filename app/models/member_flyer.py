@@ -21,9 +21,29 @@ APScheduler との関係:
     期限切れの場合は member_courses に 'ビジター' レコードを追加する。
 """
 from app.db import db
+from app.serializers import Serializer, iso, ymd_hm
 from datetime import datetime
 
 
+_to_dict = Serializer({
+    "id":                   None,
+    "member_id":            None,
+    "organization":         None,
+    "reg_no":               None,
+    "reglimit_date":        iso,
+    "next_reglimit_date":   iso,
+    "license":              None,
+    "repack_date":          iso,
+    "glider_name":          None,
+    "glider_color":         None,
+    "home_area":            None,
+    "experience":           None,
+    "leader":               None,
+    "visitor_fee":          None,
+    "updated_at":           ymd_hm,
+})
+
+
 class MemberFlyer(db.Model):
     __tablename__ = "member_flyers"
 
@@ -73,26 +93,7 @@ class MemberFlyer(db.Model):
     # ── ヘルパーメソッド ──────────────────────────────────────────
 
     def to_dict(self) -> dict:
-        def fd(d):
-            return d.isoformat() if d else None
-        return {
-            "id":                   self.id,
-            "member_id":            self.member_id,
-            "organization":         self.organization,
-            "reg_no":               self.reg_no,
-            "reglimit_date":        fd(self.reglimit_date),
-            "next_reglimit_date":   fd(self.next_reglimit_date),
-            "license":              self.license,
-            "repack_date":          fd(self.repack_date),
-            "glider_name":          self.glider_name,
-            "glider_color":         self.glider_color,
-            "home_area":            self.home_area,
-            "experience":           self.experience,
-            "leader":               self.leader,
-            "visitor_fee":          self.visitor_fee,
-            "updated_at":           self.updated_at.strftime("%Y-%m-%d %H:%M")
-                                    if self.updated_at else None,
-        }
+        return _to_dict(self)
 
     def apply_dict(self, data: dict, parse_date_fn=None) -> None:
         """dict からフィールドを一括セット"""
@@ -14,6 +14,7 @@ app/models/tour_booking.py
 """
 
 from app.db import db
+from app.serializers import Serializer, iso, ymd_hm, obj
 from datetime import datetime
 
 
@@ -55,23 +56,7 @@ class TourBooking(db.Model):
                    )
 
     def to_dict(self) -> dict:
-        def fd(d): return d.isoformat() if d else None
-        return {
-            "id":               self.id,
-            "booking_no":       self.booking_no,
-            "school_name":      self.school_name,
-            "contact_email":    self.contact_email,
-            "flight_date_from": fd(self.flight_date_from),
-            "flight_date_to":   fd(self.flight_date_to),
-            "flight_days":      self.flight_days,
-            "visitor_fee_unit": self.visitor_fee_unit,
-            "total_fee":        self.total_fee,
-            "notes":            self.notes,
-            "app_status":       self.app_status,
-            "created_at":       self.created_at.strftime("%Y-%m-%d %H:%M") if self.created_at else None,
-            "leaders":      [l.to_dict() for l in self.leaders],
-            "participants": [p.to_dict() for p in self.participants],
-        }
+        return _booking_to_dict(self)
 
 
 class TourLeader(db.Model):
@@ -95,18 +80,7 @@ class TourLeader(db.Model):
     member_type     = db.Column(db.Text)                                         # 10 分類（年会員/スクール/ビジター等）
 
     def to_dict(self) -> dict:
-        return {
-            "id":              self.id,
-            "booking_id":      self.booking_id,
-            "sort_order":      self.sort_order,
-            "member_number":   self.member_number,
-            "full_name":       self.full_name,
-            "phone":           self.phone,
-            "license":         self.license,
-            "reg_no":          self.reg_no,
-            "instructor_role": self.instructor_role,
-            "member_type":     self.member_type,
-        }
+        return _leader_to_dict(self)
 
 
 class TourParticipant(db.Model):
@@ -130,15 +104,48 @@ class TourParticipant(db.Model):
     attend_days    = db.Column(db.Text)                                          # 10 参加日（手動入力テキスト）
 
     def to_dict(self) -> dict:
-        return {
-            "id":           self.id,
-            "booking_id":   self.booking_id,
-            "sort_order":   self.sort_order,
-            "member_number": self.member_number,
-            "full_name":    self.full_name,
-            "phone":        self.phone,
-            "license":      self.license,
-            "reg_no":       self.reg_no,
-            "member_type":  self.member_type,
-            "attend_days":  self.attend_days,
-        }
+        return _participant_to_dict(self)
+
+
+_leader_to_dict = Serializer({
+    "id":              None,
+    "booking_id":      None,
+    "sort_order":      None,
+    "member_number":   None,
+    "full_name":       None,
+    "phone":           None,
+    "license":         None,
+    "reg_no":          None,
+    "instructor_role": None,
+    "member_type":     None,
+})
+
+_participant_to_dict = Serializer({
+    "id":            None,
+    "booking_id":    None,
+    "sort_order":    None,
+    "member_number": None,
+    "full_name":     None,
+    "phone":         None,
+    "license":       None,
+    "reg_no":        None,
+    "member_type":   None,
+    "attend_days":   None,
+})
+
+_booking_to_dict = Serializer({
+    "id":               None,
+    "booking_no":       None,
+    "school_name":      None,
+    "contact_email":    None,
+    "flight_date_from": iso,
+    "flight_date_to":   iso,
+    "flight_days":      None,
+    "visitor_fee_unit": None,
+    "total_fee":        None,
+    "notes":            None,
+    "app_status":       None,
+    "created_at":       ymd_hm,
+    "leaders":          obj(lambda b: _leader_to_dict.many(b.leaders)),
+    "participants":     obj(lambda b: _participant_to_dict.many(b.participants)),
+})
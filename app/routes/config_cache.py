@@ -0,0 +1,266 @@
+"""
+app/routes/config_cache.py
+設定キャッシュ（config_master / config_values のプロセス内スナップショット）
+新規追加（2026-10-18）
+
+用途:
+    料金・選択肢の参照（請負の1本料金・施設料、体験フォームの /api/exp/config、
+    メール送信設定、ビジター料金、/config/api/options など）は、リクエストの
+    たびに config_master JOIN config_values を1〜十数回発行していた。
+    設定は管理画面からしか変わらないので、両表をまとめて1回読み込み、
+    (category, item_name) で引けるスナップショットとしてワーカー内に保持する。
+
+バージョン:
+    ・config_version（1行だけの表）の version を config_routes の書き込みごとに
+      +1 する（bump_config_version()。書き込みと同じトランザクション）
+    ・各ワーカーは最後の確認から _REVALIDATE_SEC 秒を過ぎた参照のときだけ
+      version を1行読み、変わっていればスナップショットを読み直す。
+      それ以外の参照はクエリを発行しない
+    ・書き込んだワーカー自身は commit 直後にスナップショットを破棄する
+    ・読み込みはリクエストのセッションとは別の接続で行う
+      （呼び出し側のトランザクションに影響しない）
+
+参照:
+    config_values(category, item_name)   有効な値（sort_order, id 順）
+    config_value(category, item_name)    先頭の値（なければ default）
+    config_int(category, item_name)      先頭の値を整数で（なければ default）
+    config_masters()                     全マスタ（sort_order, id 順。無効含む）
+    config_options()                     カテゴリ → 値のリスト（/config/api/options）
+
+    値は常に is_active の行だけ。active_master=False で無効なマスタの値も含める。
+    category=None で全カテゴリから item_name に一致する値を引く。
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.db import db
+
+
+_REVALIDATE_SEC = 5
+
+
+# 起動時マイグレーション（config_routes の record_once から実行）
+CONFIG_VERSION_DDL = [
+    """CREATE TABLE IF NOT EXISTS config_version (
+        id         SMALLINT PRIMARY KEY CHECK (id = 1),
+        version    BIGINT    NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP NOT NULL DEFAULT now()
+    )""",
+    "INSERT INTO config_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING",
+]
+
+
+ConfigValue = namedtuple("ConfigValue", "id master_id value label sort_order value_type")
+
+ConfigMaster = namedtuple(
+    "ConfigMaster",
+    "id category item_name value_type unit description sort_order is_active values",
+)
+
+
+# =========================================
+# スナップショット
+# =========================================
+
+class _Snapshot:
+    """読み込んだ時点の両表。作成後は変更しない（参照はロックなし）。"""
+
+    def __init__(self, version, master_rows, value_rows):
+        self.version   = version
+        self.loaded_at = time.time()
+
+        values_by_master = {}
+        for v in value_rows:
+            values_by_master.setdefault(v.master_id, []).append(v)
+
+        self.masters = tuple(
+            ConfigMaster(
+                m.id, m.category, m.item_name, m.value_type, m.unit,
+                m.description, m.sort_order, m.is_active,
+                tuple(
+                    ConfigValue(v.id, v.master_id, v.value, v.label, v.sort_order, m.value_type)
+                    for v in values_by_master.get(m.id, ())
+                ),
+            )
+            for m in master_rows
+        )
+
+        # (category, item_name) / (None, item_name) → (有効マスタの値, 全マスタの値)
+        merged = {}
+        for m in self.masters:
+            for key in ((m.category, m.item_name), (None, m.item_name)):
+                active, every = merged.setdefault(key, ([], []))
+                every.extend(m.values)
+                if m.is_active:
+                    active.extend(m.values)
+        order = lambda v: (v.sort_order, v.id)
+        self.values = {
+            key: (tuple(sorted(active, key=order)), tuple(sorted(every, key=order)))
+            for key, (active, every) in merged.items()
+        }
+
+        # /config/api/options と同じ並び（マスタの sort_order, id → 値の sort_order, id）
+        self.options = {}
+        for m in self.masters:
+            if m.is_active:
+                self.options.setdefault(m.category, []).extend(v.value for v in m.values)
+
+    def stats(self) -> dict:
+        return {
+            "version":   self.version,
+            "loaded_at": self.loaded_at,
+            "masters":   len(self.masters),
+            "values":    sum(len(m.values) for m in self.masters),
+        }
+
+
+_EMPTY = ((), ())
+
+
+def _read_version(conn):
+    try:
+        return conn.execute(text("SELECT version FROM config_version WHERE id = 1")).scalar()
+    except Exception:
+        # config_version がまだない（起動前の CLI 等）。毎回読み直しにはせず None 扱い
+        conn.rollback()
+        return None
+
+
+def _load(conn) -> _Snapshot:
+    # version を先に読む（読み込み中の書き込みは次の確認で拾う）
+    version = _read_version(conn)
+    masters = conn.execute(text("""
+        SELECT id, category, item_name, value_type, unit,
+               description, sort_order, is_active
+        FROM config_master
+        ORDER BY sort_order, id
+    """)).fetchall()
+    values = conn.execute(text("""
+        SELECT id, master_id, value, label, sort_order
+        FROM config_values
+        WHERE is_active = TRUE
+        ORDER BY sort_order, id
+    """)).fetchall()
+    return _Snapshot(version, masters, values)
+
+
+class _ConfigCache:
+    def __init__(self, revalidate_sec: float):
+        self.revalidate_sec = revalidate_sec
+        self._lock       = threading.Lock()
+        self._snapshot   = None
+        self._checked_at = 0.0
+        self.loads       = 0
+        self.checks      = 0
+
+    def get(self) -> _Snapshot:
+        snap = self._snapshot
+        if snap is not None and time.monotonic() - self._checked_at < self.revalidate_sec:
+            return snap
+        with self._lock:
+            snap = self._snapshot
+            if snap is not None and time.monotonic() - self._checked_at < self.revalidate_sec:
+                return snap
+            with db.engine.connect() as conn:
+                if snap is not None:
+                    self.checks += 1
+                    if _read_version(conn) == snap.version:
+                        self._checked_at = time.monotonic()
+                        return snap
+                snap = _load(conn)
+            self.loads      += 1
+            self._snapshot   = snap
+            self._checked_at = time.monotonic()
+            return snap
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+    def stats(self) -> dict:
+        snap = self._snapshot
+        return {
+            **(snap.stats() if snap else {"version": None, "loaded_at": None}),
+            "loads":          self.loads,
+            "checks":         self.checks,
+            "revalidate_sec": self.revalidate_sec,
+        }
+
+
+_cache = _ConfigCache(_REVALIDATE_SEC)
+
+
+# =========================================
+# 参照
+# =========================================
+
+def config_values(category, item_name, active_master: bool = True):
+    """(category, item_name) の有効な値（ConfigValue）を sort_order, id 順で返す"""
+    active, every = _cache.get().values.get((category, item_name), _EMPTY)
+    return active if active_master else every
+
+
+def config_value(category, item_name, default=None, active_master: bool = True):
+    """先頭の値（文字列）。なければ default"""
+    values = config_values(category, item_name, active_master)
+    return values[0].value if values else default
+
+
+def config_int(category, item_name, default: int = 0) -> int:
+    """先頭の値を整数で返す（"1500.0" も可）。なし・数値でない場合は default"""
+    try:
+        return int(float(config_value(category, item_name)))
+    except (TypeError, ValueError):
+        return default
+
+
+def config_masters():
+    """全マスタ（ConfigMaster。無効含む）を sort_order, id 順で返す"""
+    return _cache.get().masters
+
+
+def config_options() -> dict:
+    """有効なカテゴリ → 値のリスト（/config/api/options）"""
+    return _cache.get().options
+
+
+def clear() -> None:
+    """このワーカーのスナップショットを破棄する（次の参照で読み直す）"""
+    _cache.clear()
+
+
+def stats() -> dict:
+    return _cache.stats()
+
+
+# =========================================
+# 書き込み側
+# =========================================
+
+_PENDING_KEY = "config_cache_bumped"
+
+
+def bump_config_version() -> None:
+    """
+    config_master / config_values を書き換えたトランザクション内で呼ぶ。
+    全ワーカーの次回確認で読み直しになる。commit は呼び出し側で行う。
+    """
+    db.session.execute(text(
+        "UPDATE config_version SET version = version + 1, updated_at = now() WHERE id = 1"
+    ))
+    db.session.info[_PENDING_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_after_commit(session):
+    if session.info.pop(_PENDING_KEY, None):
+        _cache.clear()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -3,15 +3,35 @@ app/routes/config_routes.py
 設定管理画面 ルート & REST API
 Blueprint名: config  /  URLプレフィックス: /config
 DB: SQLAlchemy (db.session.execute) + text()
+
+改定（2026-10-18）:
+  1. 書き込み（マスタ / 値の作成・更新・削除）ごとに config_version を +1
+     （app.routes.config_cache の各ワーカーのスナップショットを読み直させる）
+  2. GET /api/options を設定キャッシュから返す
+  3. GET /api/cache を追加（このワーカーの設定キャッシュの状態。参照のみ）
+     破棄は DELETE /api/cache
 """
 
 from flask import Blueprint, request, jsonify, render_template
 from sqlalchemy import text
 from app.db import db
+from app.routes import config_cache
+from app.routes.config_cache import CONFIG_VERSION_DDL, bump_config_version
 
 config_bp = Blueprint("config", __name__, url_prefix="/config")
 
 
+@config_bp.record_once
+def _on_register(state):
+    with state.app.app_context():
+        for sql in CONFIG_VERSION_DDL:
+            try:
+                db.session.execute(text(sql))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+
+
 # ══════════════════════════════════════════════════════════
 # ページ
 # ══════════════════════════════════════════════════════════
@@ -106,6 +126,7 @@ def create_master():
         "sort_order":  data.get("sort_order", 0),
         "is_active":   data.get("is_active", True),
     }).fetchone()
+    bump_config_version()
     db.session.commit()
     return jsonify({"id": row[0], "message": "作成しました"}), 201
 
@@ -133,6 +154,7 @@ def update_master(master_id):
         "is_active":   data.get("is_active", True),
         "id":          master_id,
     })
+    bump_config_version()
     db.session.commit()
     return jsonify({"message": "更新しました"})
 
@@ -142,6 +164,7 @@ def delete_master(master_id):
     db.session.execute(text(
         "DELETE FROM config_master WHERE id = :id"
     ), {"id": master_id})
+    bump_config_version()
     db.session.commit()
     return jsonify({"message": "削除しました"})
 
@@ -177,6 +200,7 @@ def create_value():
         "sort_order": data.get("sort_order", 0),
         "is_active":  data.get("is_active", True),
     }).fetchone()
+    bump_config_version()
     db.session.commit()
     return jsonify({"id": row[0], "message": "追加しました"}), 201
 
@@ -198,6 +222,7 @@ def update_value(value_id):
         "is_active":  data.get("is_active", True),
         "id":         value_id,
     })
+    bump_config_version()
     db.session.commit()
     return jsonify({"message": "更新しました"})
 
@@ -207,6 +232,7 @@ def delete_value(value_id):
     db.session.execute(text(
         "DELETE FROM config_values WHERE id = :id"
     ), {"id": value_id})
+    bump_config_version()
     db.session.commit()
     return jsonify({"message": "削除しました"})
 
@@ -227,17 +253,19 @@ def get_options():
     全カテゴリの選択肢（config_values.value）を一括返却。
     is_active=true のもののみ。sort_order 昇順。
     """
-    rows = db.session.execute(text("""
-        SELECT m.category, v.value
-        FROM config_master m
-        JOIN config_values v ON v.master_id = m.id
-        WHERE m.is_active = true
-          AND v.is_active = true
-        ORDER BY m.sort_order, m.id, v.sort_order, v.id
-    """)).fetchall()
+    return jsonify(config_cache.config_options())
 
-    result = {}
-    for category, value in rows:
-        result.setdefault(category, []).append(value)
 
-    return jsonify(result)
+# GET /config/api/cache
+# 設定キャッシュの状態をこのワーカー分だけ返す。
+@config_bp.route("/api/cache", methods=["GET"])
+def get_cache_stats():
+    return jsonify(config_cache.stats())
+
+
+# DELETE /config/api/cache
+# このワーカーの設定キャッシュを破棄する（次の参照で読み直す）。
+@config_bp.route("/api/cache", methods=["DELETE"])
+def clear_cache():
+    config_cache.clear()
+    return jsonify(config_cache.stats())
@@ -9,12 +9,39 @@ from ..db import db  # 相対インポートに統一
 from ..models.contract import Contract       # もし他で使っていれば残す
 from ..models.member import Member
 from ..models.member_contact import MemberContact
+from .member_name_search import filter_by_name
+from .member_lookup_cache import lookup_member
+from .config_cache import config_int
+from .contract_summary import (
+    SUMMARY_DDL, rebuild_contract_summary, refresh_contract_summary, summary_key,
+    month_range, payroll,
+)
+from ..serializers import Serializer, flag, iso, obj
 from datetime import date, datetime, timedelta
 from typing import Optional
 import uuid as uuidlib
-from sqlalchemy import func
-
-contract_bp = Blueprint("contract", __name__)
+import click
+from sqlalchemy import func, text
+
+contract_bp = Blueprint("contract", __name__, cli_group="contract")
+
+
+@contract_bp.record_once
+def _on_register(state):
+    with state.app.app_context():
+        for sql in SUMMARY_DDL + _HANDOVER_SEARCH_DDL:
+            try:
+                db.session.execute(text(sql))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+        # 日別集計の再集計（ORM を経由しない更新の取りこぼし対策）
+        try:
+            rebuild_contract_summary()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[contract_summary] rebuild skipped: {e}")
 
 
 # ─────────────────────────────────────────
@@ -25,25 +52,24 @@ def _fd(d: Optional[date]) -> Optional[str]:
     return d.isoformat() if d else None
 
 
-def _contract_to_dict(c: Contract) -> dict:
-    return {
-        "id":                c.id,
-        "flight_date":       _fd(c.flight_date),
-        "flight_time":       c.flight_time or "",
-        "uuid":              c.uuid,
-        "name":              c.name,
-        "daily_flight":      c.daily_flight,
-        "takeoff_location":  c.takeoff_location,
-        "used_glider":       c.used_glider,
-        "size":              c.size,
-        "pilot_harness":     c.pilot_harness,
-        "repack_date":       _fd(c.repack_date),
-        "passenger_harness": c.passenger_harness,
-        "near_miss":         c.near_miss,
-        "improvement":       c.improvement,
-        "damaged_section":   c.damaged_section,
-        "mini_guarantee":    bool(c.mini_guarantee),
-    }
+_contract_to_dict = Serializer({
+    "id":                None,
+    "flight_date":       iso,
+    "flight_time":       obj(lambda c: c.flight_time or ""),
+    "uuid":              None,
+    "name":              None,
+    "daily_flight":      None,
+    "takeoff_location":  None,
+    "used_glider":       None,
+    "size":              None,
+    "pilot_harness":     None,
+    "repack_date":       iso,
+    "passenger_harness": None,
+    "near_miss":         None,
+    "improvement":       None,
+    "damaged_section":   None,
+    "mini_guarantee":    flag,
+})
 
 
 # ─────────────────────────────────────────
@@ -99,18 +125,17 @@ def api_lookup():
         return jsonify({"error": "会員番号を入力してください"}), 400
 
     # 会員番号で検索（請負担当者のみ）、なければUUID（QR）で検索
-    member = Member.query.filter_by(member_number=query, contract=True).first()
-    if not member:
+    # member_lookup_cache 経由（朝の連続スキャンは DB を引かない）
+    member = lookup_member(member_number=query)
+    if not (member and member.contract):
+        member = None
         try:
             uuidlib.UUID(query)   # UUID形式かチェック（不正な文字列を弾く）
-            member = Member.query.filter(
-                Member.uuid.cast(db.String) == query,
-                Member.contract == True
-            ).first()
+            member = lookup_member(uuid=query)
         except ValueError:
             pass
 
-    if not member:
+    if not (member and member.contract):
         return jsonify({"error": "請負担当者が見つかりません"}), 404
 
     return jsonify({
@@ -127,7 +152,7 @@ def api_lookup():
 @contract_bp.route("/api/cont/search_by_name", methods=["POST"])
 def api_search_by_name():
     """
-    氏名（部分一致）で請負担当者を検索する。
+    氏名・ふりがな（正規化キーで部分一致 / 類似度順）で請負担当者を検索する。
     Request  JSON: { "name": "山田" }
     Response JSON: { "members": [ { "full_name": "...", "uuid": "...", "member_number": "..." }, ... ] }
     """
@@ -138,12 +163,7 @@ def api_search_by_name():
         return jsonify({"error": "氏名を入力してください"}), 400
 
     members = (
-        Member.query
-        .filter(
-            Member.contract == True,
-            Member.full_name.ilike(f"%{name}%"),
-        )
-        .order_by(Member.full_name)
+        filter_by_name(Member.query.filter(Member.contract == True), name)
         .limit(20)
         .all()
     )
@@ -208,6 +228,40 @@ def api_verify_pass():
     })
 
 
+# ─────────────────────────────────────────
+# 登録1本分の値（register / register_batch 共通）
+# ─────────────────────────────────────────
+
+_FLIGHT_TEXT_FIELDS = (
+    "used_glider", "size", "pilot_harness", "passenger_harness",
+    "near_miss", "improvement", "damaged_section",
+)
+
+
+def _flight_values(data: dict) -> dict:
+    """
+    登録1本分の入力 → rep_contract の列（flight_date / uuid / name 以外）。
+    金額は設定（請負: 最低保証 / 1本料金）から。場所が空なら ValueError。
+    """
+    mini_guarantee = bool(data.get("mini_guarantee", False))
+
+    # 場所は必須（最低保証時は任意）
+    takeoff_location = (data.get("takeoff_location") or "").strip()
+    if not takeoff_location and not mini_guarantee:
+        raise ValueError("場所は必須です")
+
+    return {
+        "flight_time":      (data.get("flight_time") or "").strip() or None,
+        "takeoff_location": takeoff_location,
+        # 最低保証：本数0・金額は最低保証料金 / 通常：1本=1本料金（累積計算なし）
+        "daily_flight":     0 if mini_guarantee else 1,
+        "total_amount":     config_int("請負", "最低保証" if mini_guarantee else "1本料金"),
+        "mini_guarantee":   mini_guarantee,
+        "repack_date":      None,
+        **{f: (data.get(f) or "").strip() or None for f in _FLIGHT_TEXT_FIELDS},
+    }
+
+
 # ─────────────────────────────────────────
 # API: 登録
 # ─────────────────────────────────────────
@@ -227,7 +281,6 @@ def api_register():
       "near_miss": "", "improvement": "", "damaged_section": ""
     }
     """
-    from sqlalchemy import text as _text
     data = request.get_json(silent=True) or {}
     target_uuid = data.get("uuid")
     name = (data.get("name") or "").strip()
@@ -236,54 +289,13 @@ def api_register():
     if not target_uuid:
         return jsonify({"error": "UUIDが取得できません"}), 400
 
-    flight_time    = (data.get("flight_time") or "").strip()
-    mini_guarantee = bool(data.get("mini_guarantee", False))
-
-    # 場所は必須（最低保証時は任意）
-    takeoff_location = (data.get("takeoff_location") or "").strip()
-    if not takeoff_location and not mini_guarantee:
-        return jsonify({"error": "場所は必須です"}), 400
-    def _get_config_value(item_name):
-        row = db.session.execute(_text("""
-            SELECT v.value FROM config_master m
-            JOIN config_values v ON v.master_id = m.id
-            WHERE m.category = '請負' AND m.item_name = :item_name
-              AND m.is_active = true AND v.is_active = true
-            ORDER BY v.sort_order, v.id LIMIT 1
-        """), {"item_name": item_name}).fetchone()
-        try:
-            return int(float(row[0])) if row else 0
-        except (ValueError, TypeError):
-            return 0
-
-    if mini_guarantee:
-        # 最低保証：本数0・金額は最低保証料金
-        flight_count  = 0
-        total_amount  = _get_config_value("最低保証")
-    else:
-        # 通常：1本=1本料金（累積計算なし）
-        flight_count  = 1
-        total_amount  = _get_config_value("1本料金")
+    try:
+        values = _flight_values(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     # 新規レコード登録
-    record = Contract(
-        flight_date       = today,
-        flight_time       = flight_time or None,
-        uuid              = target_uuid,
-        name              = name,
-        daily_flight      = flight_count,
-        takeoff_location  = takeoff_location,
-        used_glider       = (data.get("used_glider") or "").strip() or None,
-        size              = (data.get("size") or "").strip() or None,
-        pilot_harness     = (data.get("pilot_harness") or "").strip() or None,
-        repack_date       = None,
-        passenger_harness = (data.get("passenger_harness") or "").strip() or None,
-        near_miss         = (data.get("near_miss") or "").strip() or None,
-        improvement       = (data.get("improvement") or "").strip() or None,
-        damaged_section   = (data.get("damaged_section") or "").strip() or None,
-        total_amount      = total_amount,
-        mini_guarantee    = mini_guarantee,
-    )
+    record = Contract(flight_date=today, uuid=target_uuid, name=name, **values)
     db.session.add(record)
 
     try:
@@ -301,7 +313,93 @@ def api_register():
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"保存失敗: {str(e)}"}), 500
-        
+
+
+# ─────────────────────────────────────────
+# API: まとめて登録（当日分）
+# ─────────────────────────────────────────
+
+_REGISTER_BATCH_MAX = 30
+
+
+@contract_bp.route("/api/cont/register_batch", methods=["POST"])
+def api_register_batch():
+    """
+    同じ会員の当日のフライトを複数本まとめて登録する（1トランザクション）。
+    1本でも入力が不正なら何も登録せず 400（index で何本目かを返す）。
+    Request JSON:
+    {
+      "uuid": "...", "name": "...",
+      "flights": [ { /register と同じ1本分の項目 }, ... ]
+    }
+    Response JSON:
+    {
+      "status": "ok", "ok_count": 3,
+      "flight_number": 7,               # 登録後の当日の通常フライト本数
+      "results": [ { "index": 0, "id": 123, "flight_number": 5 }, ... ]
+                                        # 最低保証の行は flight_number: null
+    }
+    """
+    data = request.get_json(silent=True) or {}
+    target_uuid = data.get("uuid")
+    name = (data.get("name") or "").strip()
+    flights = data.get("flights")
+    today = date.today()
+
+    if not target_uuid:
+        return jsonify({"error": "UUIDが取得できません"}), 400
+    if not isinstance(flights, list) or not flights:
+        return jsonify({"error": "flights は1件以上の配列で指定してください"}), 400
+    if len(flights) > _REGISTER_BATCH_MAX:
+        return jsonify({"error": f"一度に登録できるのは {_REGISTER_BATCH_MAX} 本までです"}), 400
+
+    rows = []
+    for i, item in enumerate(flights):
+        try:
+            values = _flight_values(item if isinstance(item, dict) else {})
+        except ValueError as e:
+            return jsonify({"error": f"{i + 1}本目: {e}", "index": i}), 400
+        rows.append({"flight_date": today, "uuid": target_uuid, "name": name, **values})
+
+    table = Contract.__table__
+    try:
+        # 複数行を1回の INSERT ... RETURNING で登録（入力順 = id 順）
+        inserted = db.session.execute(
+            table.insert().values(rows).returning(table.c.id, table.c.mini_guarantee)
+        ).fetchall()
+        # ORM を経由しないので日別集計はここで反映
+        refresh_contract_summary([summary_key(target_uuid, today)])
+        # 登録後の当日の通常フライト本数（最低保証除く）
+        flight_number = Contract.query.filter_by(
+            uuid=target_uuid, flight_date=today, mini_guarantee=False
+        ).count()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"保存失敗: {str(e)}"}), 500
+
+    # 各行の通し本数（登録後の本数から逆算）
+    inserted = sorted(inserted, key=lambda r: r.id)
+    number = flight_number - sum(1 for r in inserted if not r.mini_guarantee)
+    results = []
+    for i, r in enumerate(inserted):
+        if not r.mini_guarantee:
+            number += 1
+        results.append({
+            "index":         i,
+            "id":            r.id,
+            "flight_number": None if r.mini_guarantee else number,
+        })
+
+    return jsonify({
+        "status":        "ok",
+        "message":       f"{len(results)}本 登録しました",
+        "ok_count":      len(results),
+        "flight_number": flight_number,
+        "results":       results,
+    }), 201
+
+
 # ─────────────────────────────────────────
 # API: 編集（当日分のみ）
 # ─────────────────────────────────────────
@@ -337,7 +435,6 @@ def api_delete(record_id):
 @contract_bp.route("/api/cont/<int:record_id>", methods=["PUT"])
 def api_update(record_id):
     """1レコード（1本分）の編集。当日分のみ。mini_guarantee対応。"""
-    from sqlalchemy import text as _text
     record = Contract.query.get_or_404(record_id)
 
     # 当日分のみ編集可
@@ -354,17 +451,7 @@ def api_update(record_id):
 
     # config_masterから料金取得
     def _get_config_value(item_name):
-        row = db.session.execute(_text("""
-            SELECT v.value FROM config_master m
-            JOIN config_values v ON v.master_id = m.id
-            WHERE m.category = '請負' AND m.item_name = :item_name
-              AND m.is_active = true AND v.is_active = true
-            ORDER BY v.sort_order, v.id LIMIT 1
-        """), {"item_name": item_name}).fetchone()
-        try:
-            return int(float(row[0])) if row else 0
-        except (ValueError, TypeError):
-            return 0
+        return config_int("請負", item_name)
 
     if mini_guarantee:
         daily_flight = 0
@@ -547,21 +634,8 @@ def cont_info_summary():
     year, month = _get_year_month(request)
     members = _contract_members()
 
-    # 当月の集計をまとめて取得（uuid をキーに）
-    agg = (
-        db.session.query(
-            Contract.uuid,
-            func.coalesce(func.sum(Contract.daily_flight), 0).label("total_flights"),
-            func.coalesce(func.sum(Contract.total_amount),  0).label("total_amount"),
-        )
-        .filter(
-            db.extract("year",  Contract.flight_date) == year,
-            db.extract("month", Contract.flight_date) == month,
-        )
-        .group_by(Contract.uuid)
-        .all()
-    )
-    agg_map = {str(row.uuid).lower(): row for row in agg}
+    # 当月の集計をまとめて取得（uuid をキーに。合計金額は控除前）
+    agg_map = {row.uuid: row for row in payroll(year, month, 0)}
 
     result = []
     for m in members:
@@ -571,7 +645,7 @@ def cont_info_summary():
             "uuid":          uuid_str,
             "name":          m.full_name,
             "total_flights": int(row.total_flights) if row else 0,
-            "total_amount":  int(row.total_amount)  if row else 0,
+            "total_amount":  int(row.amount_raw)    if row else 0,
         })
 
     return jsonify({"year": year, "month": month, "data": result})
@@ -588,90 +662,25 @@ def cont_info_flight_days():
     contract=True の全メンバーについて当月の
     フライト日数・フライト本数・施設料控除後合計金額を返す。
     """
-    from sqlalchemy import text as _text
-
     year, month = _get_year_month(request)
     members = _contract_members()
 
     # 施設料を config_master から取得
-    def _get_facility_fee():
-        row = db.session.execute(_text("""
-            SELECT v.value FROM config_master m
-            JOIN config_values v ON v.master_id = m.id
-            WHERE m.category = '請負' AND m.item_name = '施設料'
-              AND m.is_active = true AND v.is_active = true
-            ORDER BY v.sort_order, v.id LIMIT 1
-        """)).fetchone()
-        try:
-            return int(float(row[0])) if row else 0
-        except (ValueError, TypeError):
-            return 0
-
-    facility_fee = _get_facility_fee()
-
-    # 日数と合計を同時に集計
-    agg = (
-        db.session.query(
-            Contract.uuid,
-            func.count(func.distinct(Contract.flight_date)).label("flight_days"),
-            func.coalesce(func.sum(Contract.daily_flight), 0).label("total_flights"),
-            func.coalesce(func.sum(Contract.total_amount),  0).label("total_amount_raw"),
-            func.coalesce(
-                func.sum(db.case((Contract.mini_guarantee == True, 1), else_=0)), 0
-            ).label("mini_guarantee_days"),
-        )
-        .filter(
-            db.extract("year",  Contract.flight_date) == year,
-            db.extract("month", Contract.flight_date) == month,
-        )
-        .group_by(Contract.uuid)
-        .all()
-    )
-    agg_map = {str(row.uuid).lower(): row for row in agg}
-
-    # 施設料控除は日別に計算する必要があるため、
-    # 個人ごとに日別フライト本数を取得して控除額を算出する
-    # 日別集計（uuid + flight_date ごとの通常フライト本数）
-    day_agg = (
-        db.session.query(
-            Contract.uuid,
-            Contract.flight_date,
-            func.coalesce(func.sum(Contract.daily_flight), 0).label("day_flights"),
-        )
-        .filter(
-            db.extract("year",  Contract.flight_date) == year,
-            db.extract("month", Contract.flight_date) == month,
-            Contract.mini_guarantee == False,
-        )
-        .group_by(Contract.uuid, Contract.flight_date)
-        .all()
-    )
+    facility_fee = config_int("請負", "施設料")
 
-    # uuid別に施設料控除額を合算
-    deduction_map: dict[str, int] = {}
-    for row in day_agg:
-        uuid_str = str(row.uuid).lower()
-        n = int(row.day_flights)
-        if n >= 4:
-            deduction = facility_fee * 2
-        elif n >= 2:
-            deduction = facility_fee
-        else:
-            deduction = 0
-        deduction_map[uuid_str] = deduction_map.get(uuid_str, 0) + deduction
+    # 日数・本数・最低保証・施設料控除後合計を会員別に取得
+    agg_map = {row.uuid: row for row in payroll(year, month, facility_fee)}
 
     result = []
     for m in members:
         uuid_str = str(m.uuid).lower()
         row = agg_map.get(uuid_str)
-        total_raw  = int(row.total_amount_raw) if row else 0
-        deduction  = deduction_map.get(uuid_str, 0)
         result.append({
             "uuid":               uuid_str,
             "name":               m.full_name,
             "flight_days":        int(row.flight_days)        if row else 0,
             "total_flights":      int(row.total_flights)      if row else 0,
-            "total_amount":       total_raw - deduction,
+            "total_amount":       int(row.total_amount)       if row else 0,
             "mini_guarantee_days": int(row.mini_guarantee_days) if row else 0,
             "facility_fee":       facility_fee,
         })
@@ -697,30 +706,23 @@ def cont_info_detail(member_uuid: str):
     - mini_guarantee  : その日に最低保証レコードが存在するか
     - notes           : near_miss / improvement / damaged_section を結合
     """
-    from sqlalchemy import text as _text
-
     year, month = _get_year_month(request)
     member_uuid = member_uuid.lower()   # UUID 大文字/小文字を統一
 
     # 施設料を config_master から取得
-    fee_row = db.session.execute(_text("""
-        SELECT v.value FROM config_master m
-        JOIN config_values v ON v.master_id = m.id
-        WHERE m.category = '請負' AND m.item_name = '施設料'
-          AND m.is_active = true AND v.is_active = true
-        ORDER BY v.sort_order, v.id LIMIT 1
-    """)).fetchone()
-    try:
-        facility_fee = int(float(fee_row[0])) if fee_row else 0
-    except (ValueError, TypeError):
-        facility_fee = 0
+    facility_fee = config_int("請負", "施設料")
+
+    # 日別の本数・施設料控除・控除後金額
+    days = payroll(year, month, facility_fee, member_uuid=member_uuid, by_day=True)
 
+    # 飛行時刻・備考のために当月のレコードも取得
+    start, end = month_range(year, month)
     records = (
         Contract.query
         .filter(
             Contract.uuid.cast(db.String) == member_uuid,
-            db.extract("year",  Contract.flight_date) == year,
-            db.extract("month", Contract.flight_date) == month,
+            Contract.flight_date >= start,
+            Contract.flight_date <  end,
         )
         .order_by(Contract.flight_date, Contract.flight_time, Contract.id)
         .all()
@@ -736,18 +738,13 @@ def cont_info_detail(member_uuid: str):
         display_name = member.full_name if member else member_uuid
 
     # 日付ごとにグループ化
-    from collections import OrderedDict
-    grouped = OrderedDict()
+    grouped = {}
     for r in records:
-        key = r.flight_date.isoformat() if r.flight_date else "unknown"
-        if key not in grouped:
-            grouped[key] = []
-        grouped[key].append(r)
+        grouped.setdefault(r.flight_date, []).append(r)
 
     data = []
-    for flight_date_str, day_records in grouped.items():
-        # 通常フライト本数（mini_guarantee=False のレコードの daily_flight 合計）
-        normal_flights = sum(int(r.daily_flight or 0) for r in day_records if not r.mini_guarantee)
+    for day in days:
+        day_records = grouped.get(day.flight_date, [])
 
         # 飛行時刻リスト（None・空文字を除外、重複も除外）
         flight_times = []
@@ -759,22 +756,6 @@ def cont_info_detail(member_uuid: str):
                 seen_times.add(t)
         flight_times.sort()
 
-        # 合計金額（各レコードの total_amount を合算）
-        day_total_amount_raw = sum(int(r.total_amount or 0) for r in day_records)
-
-        # 施設料控除（通常フライト本数に基づく）
-        if normal_flights >= 4:
-            day_deduction = facility_fee * 2
-        elif normal_flights >= 2:
-            day_deduction = facility_fee
-        else:
-            day_deduction = 0
-
-        day_total_amount = day_total_amount_raw - day_deduction
-
-        # 最低保証：その日に mini_guarantee=True のレコードが1件以上あるか
-        day_mini_guarantee = any(r.mini_guarantee for r in day_records)
-
         # 備考を全レコードから収集（重複除外）
         notes_set = []
         seen_notes = set()
@@ -791,12 +772,12 @@ def cont_info_detail(member_uuid: str):
         notes = "　".join(notes_set)
 
         data.append({
-            "flight_date":      flight_date_str,
-            "daily_flight":     normal_flights,
+            "flight_date":      day.flight_date.isoformat(),
+            "daily_flight":     day.day_normal_flights,
             "flight_times":     flight_times,
-            "total_amount":     day_total_amount,
-            "facility_fee":     day_deduction,
-            "mini_guarantee":   day_mini_guarantee,
+            "total_amount":     int(day.day_total_amount),
+            "facility_fee":     int(day.day_deduction),
+            "mini_guarantee":   bool(day.day_mini_guarantee),
             "notes":            notes,
         })
 
@@ -810,6 +791,19 @@ def cont_info_detail(member_uuid: str):
     })
 
 
+# ─────────────────────────────────────────
+# CLI: 日別集計の再集計
+# flask contract rebuild-summary
+# ─────────────────────────────────────────
+
+@contract_bp.cli.command("rebuild-summary")
+def cli_rebuild_summary():
+    """rep_contract から contract_daily_summary を作り直す"""
+    n = rebuild_contract_summary()
+    db.session.commit()
+    click.echo(f"contract_daily_summary: {n} rows")
+
+
 # ─────────────────────────────────────────
 # ページルート: 請負管理
 # ─────────────────────────────────────────
@@ -831,26 +825,49 @@ _HANDOVER_FIELDS = {
 }
 
 
+# 3項目をつないだ検索対象（インデックスの式と検索の式は同じ文字列にする）
+_HANDOVER_TEXT_SQL = (
+    "(COALESCE(near_miss, '') || ' ' || COALESCE(improvement, '') "
+    "|| ' ' || COALESCE(damaged_section, ''))"
+)
+
+# 全期間の報告事項検索用（部分一致を trigram で引く。日本語は語に分かち書き
+# されないため to_tsvector ではなく pg_trgm を使う）
+_HANDOVER_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_rep_contract_handover_trgm "
+    f"ON rep_contract USING gin ({_HANDOVER_TEXT_SQL} gin_trgm_ops)",
+]
+
+_HANDOVER_SEARCH_LIMIT     = 100
+_HANDOVER_SEARCH_LIMIT_MAX = 500
+
+
+def _has_text(column):
+    return db.and_(column != None, column != "")
+
+
 @contract_bp.route("/api/cont_info/handover")
 def cont_info_handover():
     """
     当月の引継ぎ報告事項（ヒヤリハット / 営業改善点 / 機材破損状況）の
-    件数を返す。
+    件数を返す（3項目を1回の集計で数える）。
     """
     year, month = _get_year_month(request)
-
-    base_q = Contract.query.filter(
-        db.extract("year",  Contract.flight_date) == year,
-        db.extract("month", Contract.flight_date) == month,
-    )
-
-    result = []
-    for field, label in _HANDOVER_FIELDS.items():
-        count = base_q.filter(
-            getattr(Contract, field) != None,
-            getattr(Contract, field) != "",
-        ).count()
-        result.append({"category": field, "label": label, "count": count})
+    start, end = month_range(year, month)
+
+    counts = db.session.query(*[
+        func.count().filter(_has_text(getattr(Contract, field))).label(field)
+        for field in _HANDOVER_FIELDS
+    ]).filter(
+        Contract.flight_date >= start,
+        Contract.flight_date <  end,
+    ).one()
+
+    result = [
+        {"category": field, "label": label, "count": getattr(counts, field)}
+        for field, label in _HANDOVER_FIELDS.items()
+    ]
 
     return jsonify({"year": year, "month": month, "data": result})
 
@@ -872,13 +889,13 @@ def cont_info_handover_detail():
     if category not in _HANDOVER_FIELDS:
         return jsonify({"error": "不正なカテゴリです"}), 400
 
+    start, end = month_range(year, month)
     records = (
         Contract.query
         .filter(
-            db.extract("year",  Contract.flight_date) == year,
-            db.extract("month", Contract.flight_date) == month,
-            getattr(Contract, category) != None,
-            getattr(Contract, category) != "",
+            Contract.flight_date >= start,
+            Contract.flight_date <  end,
+            _has_text(getattr(Contract, category)),
         )
         .order_by(Contract.flight_date, Contract.id)
         .all()
@@ -901,6 +918,81 @@ def cont_info_handover_detail():
         "data":     data,
     })
 
+# ─────────────────────────────────────────
+# API: 引継ぎ報告事項 — 全期間検索
+# GET /api/cont_info/handover/search?q=ライザー&category=&from=&to=&limit=
+# ─────────────────────────────────────────
+
+@contract_bp.route("/api/cont_info/handover/search")
+def cont_info_handover_search():
+    """
+    引継ぎ報告事項（3項目）を全期間から部分一致で検索する（新しい順）。
+    category: near_miss | improvement | damaged_section（省略時は3項目すべて）
+    from / to: YYYY-MM-DD（任意。両端を含む）
+    各行の matches に、語を含む項目（category / label / content）を返す。
+    """
+    q = (request.args.get("q") or "").strip()
+    if not q:
+        return jsonify({"error": "q は必須です"}), 400
+
+    category = request.args.get("category") or None
+    if category and category not in _HANDOVER_FIELDS:
+        return jsonify({"error": "不正なカテゴリです"}), 400
+
+    try:
+        date_from = datetime.strptime(request.args["from"], "%Y-%m-%d").date() if request.args.get("from") else None
+        date_to   = datetime.strptime(request.args["to"],   "%Y-%m-%d").date() if request.args.get("to")   else None
+        limit = int(request.args.get("limit", _HANDOVER_SEARCH_LIMIT))
+    except ValueError:
+        return jsonify({"error": "from / to / limit の形式が正しくありません"}), 400
+    limit = max(1, min(limit, _HANDOVER_SEARCH_LIMIT_MAX))
+
+    pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    fields = [category] if category else list(_HANDOVER_FIELDS)
+
+    where = [f"{_HANDOVER_TEXT_SQL} ILIKE :pattern"]
+    params = {"pattern": pattern, "n": limit + 1}
+    if category:
+        where.append(f"{category} ILIKE :pattern")
+    if date_from:
+        where.append("flight_date >= :date_from")
+        params["date_from"] = date_from
+    if date_to:
+        where.append("flight_date <= :date_to")
+        params["date_to"] = date_to
+
+    rows = db.session.execute(text(f"""
+        SELECT id, flight_date, name, {", ".join(fields)},
+               {", ".join(f"{f} ILIKE :pattern AS hit_{f}" for f in fields)}
+        FROM rep_contract
+        WHERE {" AND ".join(where)}
+        ORDER BY flight_date DESC, id DESC
+        LIMIT :n
+    """), params).fetchall()
+
+    has_more = len(rows) > limit
+    data = [
+        {
+            "id":      r.id,
+            "date":    _fd(r.flight_date),
+            "name":    r.name,
+            "matches": [
+                {"category": f, "label": _HANDOVER_FIELDS[f], "content": getattr(r, f)}
+                for f in fields if getattr(r, f"hit_{f}")
+            ],
+        }
+        for r in rows[:limit]
+    ]
+
+    return jsonify({
+        "q":        q,
+        "category": category,
+        "count":    len(data),
+        "has_more": has_more,
+        "data":     data,
+    })
+
+
 # ─────────────────────────────────────────
 # API: 個人別 月次日報一覧（統合ページ用）
 # GET /api/cont/my_reports?uuid=...&year=YYYY&month=MM
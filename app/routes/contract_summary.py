@@ -0,0 +1,246 @@
+"""
+app/routes/contract_summary.py
+請負 日別集計（contract_daily_summary）
+新規追加（2026-10-18）
+
+用途:
+    請負管理の月次画面（/api/cont_info/summary・flight_days・detail）は表示の
+    たびに rep_contract を extract(year/month) で全件走査し、会員別・日別の
+    2回の GROUP BY と Python 側での施設料控除を行っていた。
+    contract_daily_summary は (uuid, flight_date) ごとに1行を持ち、月次画面は
+    その月の数十行を読むだけで済む。
+
+保持する値（uuid は小文字、flight_date ごと）:
+    record_cnt      : レコード件数（1本=1レコード。最低保証レコードを含む）
+    total_flights   : daily_flight の合計
+    normal_flights  : 最低保証以外の daily_flight の合計（施設料控除の判定に使う）
+    mini_cnt        : 最低保証レコードの件数（> 0 ならその日は最低保証あり）
+    amount_raw      : total_amount の合計（施設料控除前）
+    deduction_units : 施設料控除の単位数（_DEDUCTION_UNITS_SQL）
+
+    控除額 = deduction_units × 施設料。施設料は設定管理で変わりうるので
+    金額ではなく単位数を保持し、表示時に現在の施設料を掛ける（従来と同じ結果）。
+
+更新タイミング:
+    ・rep_contract を含む flush の直後（after_flush）に、変更前 / 変更後の
+      (uuid, flight_date) の行を rep_contract から集計し直す
+      （api_register / api_update / api_delete / apply_cont_tan は同じトランザクションで反映）。
+      控除は本数に対して段階的なので差分の加算ではなく、その日の行を再計算する。
+      同じ (uuid, flight_date) の同時登録はアドバイザリロックで順番に再計算する
+    ・起動時に全件を再集計（ORM を経由しない更新の取りこぼし対策）
+    ・flask contract rebuild-summary で手動再集計
+
+給与計算（payroll()）:
+    請負管理のサマリー・フライト状況・個人別詳細は同じ payroll() を使う。
+    月の範囲（flight_date >= 月初 AND < 翌月初）で集計表を1回だけ読み、
+    会員別の日数・本数・最低保証・控除後合計を1つの SQL で返す。
+    by_day=True では日別の行に、同じ会員別合計をウィンドウ関数で付けて返す。
+"""
+
+from datetime import date
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.db import db
+from app.models.contract import Contract
+from app.routes.flush_history import flush_changes
+
+
+# 施設料控除の段階（この式だけが判定の定義。日別集計の deduction_units 列を作る）
+#   通常フライト（最低保証以外）2本以上 → 施設料 × 1、4本以上 → 施設料 × 2
+_DEDUCTION_UNITS_SQL = """CASE WHEN {n} >= 4 THEN 2
+                               WHEN {n} >= 2 THEN 1
+                               ELSE 0 END"""
+
+_UUID_KEY = "LOWER(CAST(uuid AS TEXT))"
+
+_SUMMARY_COLS = [
+    "record_cnt", "total_flights", "normal_flights", "mini_cnt", "amount_raw", "deduction_units",
+]
+
+_NORMAL_FLIGHTS = "COALESCE(SUM(daily_flight) FILTER (WHERE NOT mini_guarantee), 0)"
+
+# rep_contract の行から集計表の列を作る SELECT（_SUMMARY_COLS と同じ順）
+_AGGREGATE_SELECT = f"""
+    SELECT {_UUID_KEY}, flight_date,
+           COUNT(*),
+           COALESCE(SUM(daily_flight), 0),
+           {_NORMAL_FLIGHTS},
+           COUNT(*) FILTER (WHERE mini_guarantee),
+           COALESCE(SUM(total_amount), 0),
+           {_DEDUCTION_UNITS_SQL.format(n=_NORMAL_FLIGHTS)}
+    FROM rep_contract
+"""
+
+
+# 起動時マイグレーション（contract_routes の record_once から実行）
+SUMMARY_DDL = [
+    """CREATE TABLE IF NOT EXISTS contract_daily_summary (
+        uuid            VARCHAR(36)   NOT NULL,
+        flight_date     DATE          NOT NULL,
+        record_cnt      INTEGER       NOT NULL DEFAULT 0,
+        total_flights   INTEGER       NOT NULL DEFAULT 0,
+        normal_flights  INTEGER       NOT NULL DEFAULT 0,
+        mini_cnt        INTEGER       NOT NULL DEFAULT 0,
+        amount_raw      NUMERIC(12,2) NOT NULL DEFAULT 0,
+        deduction_units SMALLINT      NOT NULL DEFAULT 0,
+        PRIMARY KEY (uuid, flight_date)
+    )""",
+    # 月の範囲で読む（全会員）
+    "CREATE INDEX IF NOT EXISTS ix_contract_daily_summary_flight_date "
+    "ON contract_daily_summary (flight_date)",
+    # 再計算（その日の rep_contract だけを読む）
+    "CREATE INDEX IF NOT EXISTS ix_rep_contract_flight_date ON rep_contract (flight_date)",
+]
+
+
+# =========================================
+# 再集計
+# =========================================
+
+def rebuild_contract_summary() -> int:
+    """rep_contract から全件を再集計し、行数を返す。commit は呼び出し側で行う。"""
+    db.session.execute(text("DELETE FROM contract_daily_summary"))
+    return db.session.execute(text(f"""
+        INSERT INTO contract_daily_summary (uuid, flight_date, {", ".join(_SUMMARY_COLS)})
+        {_AGGREGATE_SELECT}
+        WHERE uuid IS NOT NULL AND flight_date IS NOT NULL
+        GROUP BY {_UUID_KEY}, flight_date
+    """)).rowcount
+
+
+# =========================================
+# 日単位の再計算
+# =========================================
+
+_LOCK_SQL = text("""
+    SELECT pg_advisory_xact_lock(hashtext(:uuid), (CAST(:flight_date AS DATE) - DATE '2000-01-01'))
+""")
+
+_REFRESH_SQL = text(f"""
+    INSERT INTO contract_daily_summary (uuid, flight_date, {", ".join(_SUMMARY_COLS)})
+    {_AGGREGATE_SELECT}
+    WHERE flight_date = :flight_date AND {_UUID_KEY} = :uuid
+    GROUP BY {_UUID_KEY}, flight_date
+    ON CONFLICT (uuid, flight_date) DO UPDATE SET
+    {", ".join(f"{c} = EXCLUDED.{c}" for c in _SUMMARY_COLS)}
+""")
+
+_PRUNE_SQL = text(f"""
+    DELETE FROM contract_daily_summary
+    WHERE uuid = :uuid AND flight_date = :flight_date
+      AND NOT EXISTS (
+          SELECT 1 FROM rep_contract
+          WHERE flight_date = :flight_date AND {_UUID_KEY} = :uuid
+      )
+""")
+
+
+def summary_key(member_uuid, flight_date):
+    """(uuid, flight_date) → 集計表のキー (小文字 uuid, flight_date)。どちらかがなければ None"""
+    if member_uuid is None or flight_date is None:
+        return None
+    return str(member_uuid).lower(), flight_date
+
+
+def refresh_contract_summary(keys, connection=None) -> None:
+    """
+    (uuid, flight_date) の集計行を rep_contract から再計算する。
+    該当レコードがなくなった日は行を削除する。commit は呼び出し側で行う。
+    """
+    params = [
+        {"uuid": k[0], "flight_date": k[1]}
+        for k in sorted(k for k in set(keys) if k is not None)
+    ]
+    if not params:
+        return
+    conn = connection if connection is not None else db.session
+    # 同時登録の再計算を (uuid, flight_date) ごとに直列化（キー順に取ってデッドロックを避ける）
+    for p in params:
+        conn.execute(_LOCK_SQL, p)
+    conn.execute(_REFRESH_SQL, params)
+    conn.execute(_PRUNE_SQL, params)
+
+
+_KEY_ATTRS = ("uuid", "flight_date")
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_contract_summary_after_flush(session, flush_context):
+    """rep_contract を含む flush の後、変更前後の日の集計行を再計算する"""
+    keys = set()
+    for before, after in flush_changes(session, Contract, _KEY_ATTRS):
+        for values in (before, after):
+            if values is not None:
+                keys.add(summary_key(*values))
+    keys.discard(None)
+    if keys:
+        refresh_contract_summary(keys, connection=session.connection())
+
+
+# =========================================
+# 参照
+# =========================================
+
+def month_range(year: int, month: int):
+    """[月初, 翌月初)"""
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+# 会員別合計の列（名前, 集計式）。{over} は GROUP BY では空、by_day では OVER w
+_PAYROLL_TOTALS = [
+    ("flight_days",         "COUNT(*){over}"),
+    ("total_flights",       "SUM(total_flights){over}"),
+    ("mini_guarantee_days", "SUM(mini_cnt){over}"),
+    ("amount_raw",          "SUM(amount_raw){over}"),
+    ("deduction",           "SUM(deduction_units){over} * :fee"),
+    ("total_amount",        "SUM(amount_raw){over} - SUM(deduction_units){over} * :fee"),
+]
+
+# 日別の列（by_day のみ）
+_PAYROLL_DAY_COLS = [
+    ("flight_date",         "flight_date"),
+    ("day_normal_flights",  "normal_flights"),
+    ("day_total_flights",   "total_flights"),
+    ("day_mini_guarantee",  "mini_cnt > 0"),
+    ("day_amount_raw",      "amount_raw"),
+    ("day_deduction",       "deduction_units * :fee"),
+    ("day_total_amount",    "amount_raw - deduction_units * :fee"),
+]
+
+
+def payroll(year: int, month: int, facility_fee: int, member_uuid=None, by_day: bool = False):
+    """
+    月の請負給与（施設料控除後）を返す。member_uuid を指定するとその会員だけ。
+
+    by_day=False : 会員ごとに1行
+                   uuid, flight_days, total_flights, mini_guarantee_days,
+                   amount_raw, deduction, total_amount
+    by_day=True  : 会員・日ごとに1行（uuid, flight_date 順）。上の会員別合計に加えて
+                   flight_date, day_normal_flights, day_total_flights, day_mini_guarantee,
+                   day_amount_raw, day_deduction, day_total_amount
+    """
+    start, end = month_range(year, month)
+    where, params = "flight_date >= :start AND flight_date < :end", {
+        "start": start, "end": end, "fee": facility_fee,
+    }
+    if member_uuid is not None:
+        where += " AND uuid = :uuid"
+        params["uuid"] = str(member_uuid).lower()
+
+    if by_day:
+        cols = [f"{expr} AS {name}" for name, expr in _PAYROLL_DAY_COLS]
+        over, tail = " OVER w", "WINDOW w AS (PARTITION BY uuid) ORDER BY uuid, flight_date"
+    else:
+        cols = []
+        over, tail = "", "GROUP BY uuid"
+    cols += [f"{expr.format(over=over)} AS {name}" for name, expr in _PAYROLL_TOTALS]
+
+    return db.session.execute(text(f"""
+        SELECT uuid, {", ".join(cols)}
+        FROM contract_daily_summary
+        WHERE {where}
+        {tail}
+    """), params).fetchall()
@@ -8,6 +8,7 @@ from app.db import db
 from datetime import date, datetime
 from sqlalchemy import text, func, extract
 from app.models.experience import Member as ExperienceMember
+from app.routes.config_cache import config_value, config_values
 
 exp_bp = Blueprint("exp", __name__)
 
@@ -108,37 +109,19 @@ def _next_reservation_no(resv_type: str) -> int:
 
 def _get_config(category: str, item_name: str) -> list[dict]:
     """
-    config_values を (category, item_name) で検索して返す。
+    config_values を (category, item_name) で検索して返す（設定キャッシュ経由）。
     実際のカラム: cv.value（表示文字列 or 金額文字列）, cv.label（省略可）
     """
-    rows = db.session.execute(
-        text("""
-            SELECT cv.id,
-                   COALESCE(cv.label, cv.value) AS disp,
-                   cv.value,
-                   cm.value_type,
-                   cv.sort_order
-            FROM config_values cv
-            JOIN config_master cm ON cm.id = cv.master_id
-            WHERE cm.category  = :cat
-              AND cm.item_name  = :name
-              AND cm.is_active  = TRUE
-              AND cv.is_active  = TRUE
-            ORDER BY cv.sort_order, cv.id
-        """),
-        {"cat": category, "name": item_name}
-    ).fetchall()
-
     result = []
-    for r in rows:
+    for v in config_values(category, item_name):
         # value_type が amount の場合は数値に変換、options は 0
         try:
-            amt = int(r.value) if r.value_type == "amount" else 0
+            amt = int(v.value) if v.value_type == "amount" else 0
         except (ValueError, TypeError):
             amt = 0
         result.append({
-            "id":     r.id,
-            "label":  r.disp,
+            "id":     v.id,
+            "label":  v.label if v.label is not None else v.value,
             "amount": amt,
         })
     return result
@@ -152,23 +135,10 @@ def _get_config_multi(items: list[tuple[str, str]]) -> list[dict]:
     """
     result = []
     for category, item_name in items:
-        rows = db.session.execute(
-            text("""
-                SELECT cv.value, cm.value_type, cm.item_name
-                FROM config_values cv
-                JOIN config_master cm ON cm.id = cv.master_id
-                WHERE cm.category  = :cat
-                  AND cm.item_name  = :name
-                  AND cm.is_active  = TRUE
-                  AND cv.is_active  = TRUE
-                ORDER BY cv.sort_order, cv.id
-                LIMIT 1
-            """),
-            {"cat": category, "name": item_name}
-        ).fetchone()
-        if rows:
+        value = config_value(category, item_name)
+        if value is not None:
             try:
-                amt = int(rows.value)
+                amt = int(value)
             except (ValueError, TypeError):
                 amt = 0
             result.append({"label": item_name, "amount": amt})
@@ -15,6 +15,7 @@ from sqlalchemy import text
 from app.db import db
 from app.models.member import Member
 from app.models.work_contract import WorkContract
+from app.routes.config_cache import config_values
 from datetime import date
 
 exp_status_bp = Blueprint("exp_status", __name__)
@@ -54,15 +55,7 @@ def _next_resv_no(resv_type: str) -> int:
 
 
 def _get_config(category: str, item_name: str) -> list[str]:
-    rows = db.session.execute(text("""
-        SELECT cv.value
-        FROM config_values cv
-        JOIN config_master cm ON cm.id = cv.master_id
-        WHERE cm.category = :cat AND cm.item_name = :name
-          AND cm.is_active = TRUE AND cv.is_active = TRUE
-        ORDER BY cv.sort_order, cv.id
-    """), {"cat": category, "name": item_name}).fetchall()
-    return [r.value for r in rows]
+    return [v.value for v in config_values(category, item_name)]
 
 
 # ══════════════════════════════════════════════════════════
@@ -5,6 +5,7 @@
 from flask import Blueprint, render_template, request, jsonify
 from app.db import db
 from app.models.experience import Member
+from app.routes.config_cache import config_masters
 from datetime import datetime
 # import uuid
 import os
@@ -188,37 +189,24 @@ def get_exp_course_options():
     item_name に「コース」を含むレコードの config_values を返す。
     該当が複数あれば最初の1件を使用。
     """
-    from sqlalchemy import text
     try:
-        master = db.session.execute(text("""
-            SELECT id, item_name, unit
-            FROM config_master
-            WHERE category = '体験'
-              AND value_type = 'options'
-              AND item_name LIKE '%コース%'
-              AND is_active = true
-            ORDER BY sort_order, id
-            LIMIT 1
-        """)).fetchone()
+        master = next(
+            (m for m in config_masters()
+             if m.category == "体験" and m.value_type == "options"
+             and "コース" in m.item_name and m.is_active),
+            None,
+        )
 
         if not master:
             return jsonify({"options": []})
 
-        values = db.session.execute(text("""
-            SELECT id, value, label, sort_order
-            FROM config_values
-            WHERE master_id = :mid
-              AND is_active = true
-            ORDER BY sort_order, id
-        """), {"mid": master.id}).fetchall()
-
         options = [
             {
                 "value": str(v.id),
                 "label": v.label if v.label else v.value,
                 "price": v.value
             }
-            for v in values
+            for v in master.values
         ]
 
         return jsonify({
@@ -0,0 +1,77 @@
+"""
+app/routes/flush_history.py
+after_flush での変更前 / 変更後の値の取り出し（集計表の差分更新で共用）
+新規追加（2026-10-18）
+
+用途:
+    io_flight_stats（日別集計）・io_member_stats（会員別集計）・
+    contract_summary（請負 日別集計）は、flush の直後に対象モデルの
+    「変更前（DB 上）の値」と「変更後の値」から集計表を更新する。
+    その取り出しと new / dirty / deleted の走査をここにまとめる。
+
+    flush_changes(session, Model, attrs)
+        → (変更前の値 or None, 変更後の値 or None) を1レコードずつ返す
+          追加は (None, 後)、更新は (前, 後)、削除は (前, None)
+    flush_deltas(session, Model, attrs, contribution, width)
+        → 変更前を -1、変更後を +1 として寄与を足し合わせた {キー: [件数...]}
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import inspect
+
+
+def current_attr_values(record, attrs):
+    """attrs の現在値のリスト"""
+    return [getattr(record, k) for k in attrs]
+
+
+def previous_attr_values(record, attrs):
+    """attrs の flush 前（DB 上）の値のリスト。変更のない属性は現在値を使う。"""
+    state = inspect(record).attrs
+    values = []
+    for k in attrs:
+        hist = state[k].history
+        if hist.deleted:
+            values.append(hist.deleted[0])
+        elif hist.unchanged:
+            values.append(hist.unchanged[0])
+        else:
+            values.append(getattr(record, k))
+    return values
+
+
+def flush_changes(session, model, attrs):
+    """after_flush 内で model のレコードごとに (変更前, 変更後) の値を返す"""
+    for obj in session.new:
+        if isinstance(obj, model):
+            yield None, current_attr_values(obj, attrs)
+    for obj in session.dirty:
+        if isinstance(obj, model) and session.is_modified(obj):
+            yield previous_attr_values(obj, attrs), current_attr_values(obj, attrs)
+    for obj in session.deleted:
+        if isinstance(obj, model):
+            yield previous_attr_values(obj, attrs), None
+
+
+def flush_deltas(session, model, attrs, contribution, width: int) -> dict:
+    """
+    contribution(*値) → (キー, [件数 × width]) を変更前は減算・変更後は加算して返す。
+    キーが None の寄与は数えない。
+    """
+    deltas = defaultdict(lambda: [0] * width)
+
+    def add(values, sign):
+        key, counts = contribution(*values)
+        if key is None:
+            return
+        acc = deltas[key]
+        for i, n in enumerate(counts):
+            acc[i] += sign * n
+
+    for before, after in flush_changes(session, model, attrs):
+        if before is not None:
+            add(before, -1)
+        if after is not None:
+            add(after, +1)
+    return deltas
@@ -0,0 +1,208 @@
+"""
+app/routes/io_flight_live.py
+入下山管理 ライブボード（Server-Sent Events + PostgreSQL LISTEN/NOTIFY）
+新規追加（2026-10-18）
+
+用途:
+    入下山管理画面は /api/io/info/daily で当日分を丸ごと取り直していた。
+    GET /api/io/info/live（SSE）は接続時に1回だけ当日分を送り、以降は
+    変更のあったレコードだけを送る。画面の数が増えても DB の負荷は変わらない。
+
+流れ:
+    書き込み（入山 / 下山・山チン / 備考 / 入金の更新）
+      → notify_io_changes(ids) が同じトランザクションで NOTIFY io_flight_changes
+        （ORM 経由の変更は after_flush で自動送信。NOTIFY は commit 時に配信される）
+      → 各 gunicorn ワーカーのリスナースレッド（1ワーカー1接続）が LISTEN で受信し、
+        変更行を1回だけ読み直して、そのワーカーの購読者キューへ配る
+      → SSE: event: upsert（レコード）/ delete（{"id": ...}）
+        画面の条件（日付・分類）から外れた更新も delete として送る
+
+注意:
+    SSE は接続中ワーカーのスレッドを占有するため、gunicorn はスレッド付き
+    （--threads）で起動すること。
+"""
+
+import json
+import queue
+import select
+import threading
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.db import db
+from app.models.io_flight import IoFlight
+
+
+CHANNEL = "io_flight_changes"
+
+_NOTIFY_CHUNK    = 500   # 1通知あたりの id 数（NOTIFY のペイロード上限 8000 バイト対策）
+_LISTEN_TIMEOUT  = 5     # LISTEN 待ちのタイムアウト秒（停止確認の間隔）
+_QUEUE_MAX       = 1000  # 購読者ごとの未送信イベント上限（超えたら切断して再接続させる）
+HEARTBEAT_SEC    = 15    # SSE のハートビート間隔
+
+
+# =========================================
+# 送信（NOTIFY）
+# =========================================
+
+def notify_io_changes(ids, connection=None) -> None:
+    """
+    変更された io_flight の id を通知する（commit 時に配信）。
+    commit は呼び出し側で行う。
+    """
+    ids = sorted({i for i in ids if i is not None})
+    if not ids:
+        return
+    conn = connection if connection is not None else db.session
+    for start in range(0, len(ids), _NOTIFY_CHUNK):
+        conn.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CHANNEL, "payload": json.dumps({"ids": ids[start:start + _NOTIFY_CHUNK]})},
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _notify_after_flush(session, flush_context):
+    """io_flight を含む flush の後、変更された id を通知する"""
+    ids = [
+        obj.id for obj in session.new | session.dirty | session.deleted
+        if isinstance(obj, IoFlight)
+    ]
+    if ids:
+        notify_io_changes(ids, connection=session.connection())
+
+
+# =========================================
+# 受信（LISTEN）とワーカー内の配信
+# =========================================
+
+class _Broker:
+    """1ワーカー分の購読者キューとリスナースレッド"""
+
+    def __init__(self):
+        self._lock        = threading.Lock()
+        self._subscribers = set()
+        self._thread      = None
+
+    def subscribe(self, app, load_records) -> queue.Queue:
+        q = queue.Queue(maxsize=_QUEUE_MAX)
+        with self._lock:
+            self._subscribers.add(q)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._listen, args=(app, load_records),
+                    name="io-flight-listener", daemon=True,
+                )
+                self._thread.start()
+        return q
+
+    def unsubscribe(self, q) -> None:
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def _publish(self, item) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(item)
+            except queue.Full:
+                # 読み出しが追いつかない購読者は切断（クライアントが再接続して取り直す）
+                self.unsubscribe(q)
+                q.queue.clear()
+                q.put_nowait(None)
+
+    def _stop_if_idle(self) -> bool:
+        """購読者がいなければスレッドを終了扱いにする（subscribe との競合を lock で防ぐ）"""
+        with self._lock:
+            if self._subscribers:
+                return False
+            self._thread = None
+            return True
+
+    def _listen(self, app, load_records) -> None:
+        with app.app_context():
+            raw = db.engine.raw_connection()
+            raw.detach()   # プールに戻さない専用接続
+            conn = raw.dbapi_connection
+            conn.autocommit = True
+            try:
+                conn.cursor().execute(f"LISTEN {CHANNEL}")
+                while not self._stop_if_idle():
+                    if select.select([conn], [], [], _LISTEN_TIMEOUT) == ([], [], []):
+                        continue
+                    conn.poll()
+                    ids = set()
+                    while conn.notifies:
+                        note = conn.notifies.pop(0)
+                        try:
+                            ids.update(json.loads(note.payload).get("ids") or [])
+                        except ValueError:
+                            continue
+                    if ids:
+                        self._dispatch(ids, load_records)
+            finally:
+                # 接続断などで終了した場合は残りの購読者を切断（EventSource が再接続する）
+                remaining = ()
+                with self._lock:
+                    if self._thread is threading.current_thread():
+                        self._thread = None
+                        remaining, self._subscribers = self._subscribers, set()
+                for q in remaining:
+                    q.queue.clear()
+                    q.put_nowait(None)
+                conn.close()
+
+    def _dispatch(self, ids, load_records) -> None:
+        try:
+            records = load_records(sorted(ids))
+        finally:
+            db.session.remove()
+        for record in records:
+            self._publish(("upsert", record))
+        for missing in ids - {r["id"] for r in records}:
+            self._publish(("delete", {"id": missing}))
+
+
+_broker = _Broker()
+
+
+# =========================================
+# SSE
+# =========================================
+
+def _sse(event_name: str, data) -> str:
+    return f"event: {event_name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def stream_live_board(app, load_records, load_snapshot, match):
+    """
+    SSE のジェネレータ。
+    購読を開始してから現在の一覧（load_snapshot()）を1回送り、以降は
+    match(record) が真のレコードの変更を送る。削除と、更新で match しなく
+    なったレコード（分類の変更など）は delete として送る。
+    一覧を読んだ後はセッションを返却し、配信中はコネクションを保持しない。
+    """
+    q = _broker.subscribe(app, load_records)
+    try:
+        try:
+            first = _sse("snapshot", load_snapshot())
+            db.session.commit()
+        finally:
+            db.session.remove()
+        yield first
+        while True:
+            try:
+                item = q.get(timeout=HEARTBEAT_SEC)
+            except queue.Empty:
+                yield ": ping\n\n"
+                continue
+            if item is None:
+                return
+            event_name, data = item
+            if event_name == "upsert" and not match(data):
+                # 画面の条件から外れた → 画面に残っていれば消させる
+                event_name, data = "delete", {"id": data["id"]}
+            yield _sse(event_name, data)
+    finally:
+        _broker.unsubscribe(q)
@@ -5,92 +5,197 @@ Mt.FUJI PARAGLIDING / FujipSystem
 改定: 2026-03-24
   - /api/io/lookup_by_name  : 氏名（部分一致）で会員候補を返す
   - /api/io/verify_pass     : 携帯番号下4桁でPASSコード認証する
+
+改定: 2026-10-18
+  - /api/io/lookup・/api/io/checkin の会員情報を member_snapshot の1行参照に変更
+    （members + contacts + flyers + 現在コースの個別取得を廃止）
+  - /api/io/lookup は member_lookup_cache 経由（再スキャンは DB を引かない）
+  - _record_to_dict を app.serializers.Serializer に置き換え（一覧の dict 化を高速化）
+  - /api/io/info/calendar を日別集計表（io_flight_daily_stats）参照に変更
+    個人フィルター（type=member）は月の日付範囲で1回だけ GROUP BY する
+    （extract による全件走査・id リストの IN (...) を廃止）
+  - io_flight に (uuid, entry_date) の一意インデックスを追加
+    /api/io/checkin を member_snapshot からの INSERT ... ON CONFLICT DO UPDATE
+    1文に変更（同時スキャンでも1人1日1レコード。入山 / 下山を同じ文で判定）
+  - /api/io/sync : オフライン中に記録した入山 / 下山イベントを一括反映する
+  - /api/io/info/live : 入下山管理のライブボード（SSE）。接続時に当日分、以降は差分のみ
+    書き込み時に io_flight_live.notify_io_changes() で NOTIFY（全ワーカーへ配信）
+  - 過去シーズンは retention で io_flight_archive へ移動。参照系（daily / date-members /
+    special / member_suggest / 個人カレンダー）は _flights_since() で期間に応じて
+    アーカイブを UNION ALL する（直近の期間はホット表のみ）
+  - /api/io/info/special に keyset ページング（limit / after、entry_date・id 降順）と
+    CSV / NDJSON のストリーミング出力（format=csv|ndjson）を追加
+    総件数は山チン / 備考ありなら日別集計の合計、個人系は対象者の COUNT
+    （パラメータなしは従来どおり全件の JSON）
+  - /api/io/info/member_suggest を人物表（io_person）参照に変更
+    （io_flight 全履歴の ILIKE + DISTINCT ON を廃止。最近・よく来る順に並べる）
+    入山時（checkin / sync）に io_person を更新する
+  - /api/io/members/<uuid>/stats : 会員別の入山集計（io_member_season_stats）
+    /api/io/lookup の応答にも stats として含める（ゲートで履歴を引かずに表示）
+  - /api/io/tour/<booking_id>/checkin : ツアーの引率者・参加者を一括で入山 / 下山
+    （会員は1回で取得・複数行 INSERT 1文。対象外は理由付きで返す）
 """
 
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, Response, stream_with_context, current_app
 from app.db import db
-from app.models.io_flight import IoFlight
+from app.models.io_flight import IoFlight, io_flight_archive
 from app.models.member import Member
-from app.models.member_flyer import MemberFlyer
-from app.models.member_course import MemberCourse
 from app.models.member_contact import MemberContact
+from app.models.tour_booking import TourBooking
+from app.routes.member_name_search import filter_by_name
+from app.routes.member_snapshot import get_snapshot
+from app.routes.member_lookup_cache import lookup_member
+from app.routes.io_flight_stats import (
+    DAILY_STATS_DDL, add_daily_stats, count_daily_stats, read_daily_stats, rebuild_daily_stats,
+)
+from app.routes.io_flight_live import notify_io_changes, stream_live_board
+from app.routes.io_person import IO_PERSON_DDL, backfill_io_persons, suggest_io_persons, touch_io_persons
+from app.routes.io_member_stats import (
+    MEMBER_STATS_DDL, add_member_stats, member_stats_key, read_member_stats, rebuild_member_stats,
+)
+from app.routes.retention import archived_before
+from app.serializers import Serializer, as_str, hm, iso, obj
+from collections import Counter, defaultdict
 from datetime import date, datetime, timedelta
-from sqlalchemy import func, extract
+from sqlalchemy import func, select, text, tuple_, union_all
+from sqlalchemy.orm import aliased
+import csv
+import io
+import json
 import uuid as uuidlib
 
 io_bp = Blueprint("io_flight", __name__)
 
 
+# 起動時マイグレーション: (uuid, entry_date) の一意インデックス
+#   既存の重複は最初の入山レコード（最小 id）に統合してから作成する
+#   （下山時刻は最も遅いもの・フラグは OR・備考は連結）
+_CHECKIN_UNIQUE_DDL = [
+    """
+    WITH d AS (
+        SELECT uuid, entry_date,
+               MIN(id)                                   AS keep_id,
+               MAX(out_time)                             AS out_time,
+               BOOL_OR(yamachin)                         AS yamachin,
+               BOOL_OR(entrance_fee_paid)                AS entrance_fee_paid,
+               BOOL_OR(yamachin_confirmed)               AS yamachin_confirmed,
+               STRING_AGG(NULLIF(comment, ''), ' / ' ORDER BY id) AS comment
+        FROM io_flight
+        WHERE uuid IS NOT NULL
+        GROUP BY uuid, entry_date
+        HAVING COUNT(*) > 1
+    ), merged AS (
+        UPDATE io_flight f SET
+            out_time           = d.out_time,
+            yamachin           = d.yamachin,
+            entrance_fee_paid  = d.entrance_fee_paid,
+            yamachin_confirmed = d.yamachin_confirmed,
+            comment            = LEFT(d.comment, 255)
+        FROM d
+        WHERE f.id = d.keep_id
+    )
+    DELETE FROM io_flight f
+    USING d
+    WHERE f.uuid = d.uuid AND f.entry_date = d.entry_date AND f.id <> d.keep_id
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_io_flight_uuid_entry_date ON io_flight (uuid, entry_date)",
+]
+
+# 起動時マイグレーション: /api/io/info/special の keyset ページング用部分インデックス
+#   （entry_date 降順・id 降順で該当行だけを先頭から読む）
+_SPECIAL_PAGE_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_io_flight_yamachin_page "
+    "ON io_flight (entry_date DESC, id DESC) WHERE yamachin",
+    "CREATE INDEX IF NOT EXISTS ix_io_flight_comment_page "
+    "ON io_flight (entry_date DESC, id DESC) WHERE comment <> ''",
+]
+
+
+@io_bp.record_once
+def _on_register(state):
+    with state.app.app_context():
+        for sql in (_CHECKIN_UNIQUE_DDL + DAILY_STATS_DDL + _SPECIAL_PAGE_DDL
+                    + IO_PERSON_DDL + MEMBER_STATS_DDL):
+            try:
+                db.session.execute(text(sql))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+        # 日別集計・会員別集計の全件再集計（ORM 外の変更・差分の取りこぼしを取り込む）
+        for rebuild in (rebuild_daily_stats, rebuild_member_stats):
+            try:
+                rebuild()
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+        # 人物表（io_person）の初回作成（空のときだけ）
+        try:
+            backfill_io_persons()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+
+
 # ─────────────────────────────────────────
 # ヘルパー
 # ─────────────────────────────────────────
 
-def _check_expiry(target_date: date | None) -> str:
-    if not target_date:
-        return "none"
-    today = date.today()
-    if target_date < today:
-        return "expired"
-    if target_date <= today + timedelta(days=31):
-        return "warning"
-    return "ok"
-
-
-def _repack_limit(member: Member) -> date | None:
-    flyer = member.flyer  # backref 経由で MemberFlyer を取得
-    if not flyer or not flyer.repack_date:
-        return None
-    rd = flyer.repack_date
-    try:
-        return rd.replace(year=rd.year + 1)
-    except ValueError:
-        return rd.replace(year=rd.year + 1, day=28)
-
-
-def _get_current_course(member: Member) -> MemberCourse | None:
-    """現在有効なコースを取得"""
-    return MemberCourse.get_current(member.id)
-
-
 def _fd(d: date | None) -> str | None:
     return d.isoformat() if d else None
 
 
-def _record_to_dict(r: IoFlight) -> dict:
-    """IoFlight レコードを辞書に変換"""
-    return {
-        "id":             r.id,
-        "member_number":  r.member_number,
-        "uuid":           str(r.uuid) if r.uuid else None,
-        "member_class":   r.member_class,
-        "full_name":      r.full_name,
-        "course_name":    r.course_name,
-        "reg_no":         r.reg_no,
-        "reglimit_date":  _fd(r.reglimit_date),
-        "license":        r.license,
-        "glider_name":    r.glider_name,
-        "glider_color":   r.glider_color,
-        "repack_date":    _fd(r.repack_date),
-        "insurance_type": r.insurance_type,
-        "radio_type":     r.radio_type,
-        "entry_date":     r.entry_date.isoformat() if r.entry_date else None,
-        "in_time":        r.in_time.strftime("%H:%M") if r.in_time else None,
-        "out_time":       r.out_time.strftime("%H:%M") if r.out_time else None,
-        "status":         "下山済" if r.out_time else "入山中",
-        "yamachin":           r.yamachin,
-        "comment":            r.comment or "",
-        "entrance_fee_paid":   r.entrance_fee_paid,
-        "yamachin_confirmed": r.yamachin_confirmed,
-    }
-
-
-def _apply_class_filter(query, class_filter: str):
+# IoFlight レコード → 辞書（app.serializers で事前コンパイル）
+_record_to_dict = Serializer({
+    "id":                 None,
+    "member_number":      None,
+    "uuid":               as_str,
+    "member_class":       None,
+    "full_name":          None,
+    "course_name":        None,
+    "reg_no":             None,
+    "reglimit_date":      iso,
+    "license":            None,
+    "glider_name":        None,
+    "glider_color":       None,
+    "repack_date":        iso,
+    "insurance_type":     None,
+    "radio_type":         None,
+    "entry_date":         iso,
+    "in_time":            hm,
+    "out_time":           hm,
+    "status":             obj(lambda r: "下山済" if r.out_time else "入山中"),
+    "yamachin":           None,
+    "comment":            obj(lambda r: r.comment or ""),
+    "entrance_fee_paid":  None,
+    "yamachin_confirmed": None,
+})
+
+
+def _apply_class_filter(query, class_filter: str, entity=IoFlight):
     """分類フィルターを適用（allの場合は無視）"""
     if class_filter and class_filter != "all":
-        query = query.filter(IoFlight.member_class.ilike(f"%{class_filter}%"))
+        query = query.filter(entity.member_class.ilike(f"%{class_filter}%"))
     return query
 
 
+def _flights_since(since: date | None):
+    """
+    since 以降（None = 全期間）の入山記録を読むエンティティを返す。
+    アーカイブ済みの期間（retention_state.archived_before より前）を含む場合のみ
+    io_flight_archive を UNION ALL した別名を返し、それ以外はホット表（IoFlight）のまま。
+    返したエンティティは参照専用（更新は IoFlight で行う）。
+    アーカイブに移るのは入金確認済みの行だけなので、更新・入金確認が必要な行は
+    常にホット表にある（retention の settled）。
+    """
+    boundary = archived_before("io_flight")
+    if boundary is None or (since is not None and since >= boundary):
+        return IoFlight
+    flights = union_all(
+        select(IoFlight.__table__), select(io_flight_archive),
+    ).subquery("io_flight_all")
+    return aliased(IoFlight, flights)
+
+
 def _period_cutoff(period: str) -> date | None:
     """期間文字列から開始日を返す。'all' の場合は None（全期間）"""
     if period == "all":
@@ -130,9 +235,9 @@ def io_index():
 #   }
 #
 # 検索条件:
-#   - full_name の部分一致（ilike）
+#   - 氏名・ふりがなの正規化キーで部分一致 / 類似検索（member_name_search）
 #   - member_status が 'active' または 'visitor' の会員のみ返す
-#   - 最大10件に制限
+#   - 類似度の高い順・最大10件に制限
 @io_bp.route("/api/io/lookup_by_name", methods=["POST"])
 def api_lookup_by_name():
     data  = request.get_json(silent=True) or {}
@@ -145,12 +250,10 @@ def api_lookup_by_name():
         return jsonify({"error": "氏名を1文字以上入力してください"}), 400
 
     members = (
-        Member.query
-        .filter(
-            Member.full_name.ilike(f"%{name}%"),
-            Member.member_status.in_(["active", "visitor"]),
+        filter_by_name(
+            Member.query.filter(Member.member_status.in_(["active", "visitor"])),
+            name,
         )
-        .order_by(Member.full_name)
         .limit(10)
         .all()
     )
@@ -227,99 +330,529 @@ def api_lookup():
     if not query:
         return jsonify({"error": "検索キーワードを入力してください"}), 400
 
-    member = None
+    snap = None
     try:
         uuid_obj = uuidlib.UUID(query)
-        member = Member.query.filter_by(uuid=str(uuid_obj)).first()
+        snap = lookup_member(uuid=str(uuid_obj))
     except ValueError:
-        member = Member.query.filter_by(member_number=query).first()
+        snap = lookup_member(member_number=query)
 
-    if not member:
+    if not snap:
         return jsonify({"error": "会員が見つかりません"}), 404
 
-    today      = date.today()
-    flyer      = member.flyer   # MemberFlyer（backref）
-    course     = _get_current_course(member)  # MemberCourse（現在有効）
-    repack_lim = _repack_limit(member)
-    existing   = IoFlight.query.filter_by(uuid=member.uuid, entry_date=today).first()
+    today    = date.today()
+    existing = IoFlight.query.filter_by(uuid=snap.uuid, entry_date=today).first()
 
     return jsonify({
-        "member_number":  member.member_number,
-        "uuid":           member.uuid,
-        "full_name":      member.full_name,
-        "member_type":    course.member_type  if course else None,
-        "course_name":    course.course_name  if course else None,
-        "reg_no":         flyer.reg_no        if flyer  else None,
-        "reglimit_date":  _fd(flyer.reglimit_date)  if flyer else None,
-        "license":        flyer.license       if flyer  else None,
-        "glider_name":    flyer.glider_name   if flyer  else None,
-        "glider_color":   flyer.glider_color  if flyer  else None,
-        "repack_date":    _fd(flyer.repack_date) if flyer else None,
-        "repack_limit":   _fd(repack_lim),
-        "license_status": _check_expiry(flyer.reglimit_date if flyer else None),
-        "repack_status":  _check_expiry(repack_lim),
+        "member_number":  snap.member_number,
+        "uuid":           snap.uuid,
+        "full_name":      snap.full_name,
+        "member_type":    snap.member_type,
+        "course_name":    snap.course_name,
+        "reg_no":         snap.reg_no,
+        "reglimit_date":  _fd(snap.reglimit_date),
+        "license":        snap.license,
+        "glider_name":    snap.glider_name,
+        "glider_color":   snap.glider_color,
+        "repack_date":    _fd(snap.repack_date),
+        "repack_limit":   _fd(snap.repack_limit),
+        "license_status": snap.license_status,
+        "repack_status":  snap.repack_status,
         "already_in":     existing is not None,
         "already_out":    existing.out_time is not None if existing else False,
         "io_flight_id":   existing.id if existing else None,
         "in_time":        existing.in_time.strftime("%H:%M") if existing and existing.in_time else None,
         "out_time":       existing.out_time.strftime("%H:%M") if existing and existing.out_time else None,
+        "stats":          read_member_stats(snap.uuid, today) if snap.uuid else None,
     })
 
 
+# GET /api/io/members/<uuid>/stats
+# 会員別の入山集計（今シーズン / 通算の日数・山チン件数・未入金件数・最後の入山日）
+@io_bp.route("/api/io/members/<member_uuid>/stats")
+def api_io_member_stats(member_uuid):
+    try:
+        uuid_obj = uuidlib.UUID(member_uuid)
+    except ValueError:
+        return jsonify({"error": "uuid が不正です"}), 400
+    return jsonify({"uuid": str(uuid_obj), **read_member_stats(uuid_obj)})
+
+
 @io_bp.route("/api/io/checkin", methods=["POST"])
 def api_checkin():
     data   = request.get_json(silent=True) or {}
-    member = Member.query.filter(
-        (Member.member_number == (data.get("member_number") or "")) |
-        (Member.uuid          == (data.get("uuid") or ""))
-    ).first()
+    now    = datetime.now()
+    params = _checkin_params(data, now)
 
-    if not member:
-        return jsonify({"error": "会員が見つかりません"}), 404
+    row = _checkin_upsert(params)
+    if row is None:
+        # 会員なし / 本日の下山済み のどちらかを判定（失敗時のみ追加で参照する）
+        if not _find_checkin_member(params):
+            return jsonify({"error": "会員が見つかりません"}), 404
+        return jsonify({"error": "本日の退場記録が既にあります"}), 400
 
-    today    = date.today()
-    existing = IoFlight.query.filter_by(uuid=member.uuid, entry_date=today).first()
-    now      = datetime.now()
-
-    if existing:
-        if existing.out_time:
-            return jsonify({"error": "本日の退場記録が既にあります"}), 400
-        existing.out_time = now
-        db.session.commit()
+    db.session.commit()
+
+    if not row.inserted:
         return jsonify({
             "action":   "checkout",
             "out_time": now.strftime("%H:%M"),
-            "message":  f"{member.full_name} さんの下山を記録しました",
+            "message":  f"{row.full_name} さんの下山を記録しました",
         })
+    return jsonify({
+        "action":       "checkin",
+        "in_time":      now.strftime("%H:%M"),
+        "message":      f"{row.full_name} さんの入山を記録しました",
+        "io_flight_id": row.id,
+    })
+
+
+# 入山 / 下山を1文で行う（member_snapshot → io_flight）
+#   ・会員番号を優先し、なければ UUID で member_snapshot の1行を選ぶ
+#   ・(uuid, entry_date) が未登録なら入山として INSERT
+#   ・入山中（out_time IS NULL）なら out_time を記録（下山）
+#   ・下山済み・会員なしの場合は行を返さない
+#   inserted は xmax = 0（この文で挿入された行）で判定する
+_CHECKIN_SQL = text("""
+    INSERT INTO io_flight (
+        member_number, uuid, member_class, full_name, course_name,
+        reg_no, reglimit_date, license, glider_name, glider_color, repack_date,
+        insurance_type, radio_type, entry_date, in_time,
+        yamachin, entrance_fee_paid, yamachin_confirmed
+    )
+    SELECT
+        s.member_number, CAST(s.uuid AS uuid),
+        COALESCE(:member_class, s.member_type), s.full_name,
+        COALESCE(:course_name, s.course_name),
+        s.reg_no, s.reglimit_date, s.license,
+        COALESCE(:glider_name, s.glider_name), COALESCE(:glider_color, s.glider_color),
+        s.repack_limit,
+        :insurance_type, :radio_type, :entry_date, :at,
+        FALSE, FALSE, FALSE
+    FROM member_snapshot s
+    WHERE s.member_number = :member_number OR s.uuid = :uuid
+    ORDER BY COALESCE(s.member_number = :member_number, FALSE) DESC
+    LIMIT 1
+    ON CONFLICT (uuid, entry_date) DO UPDATE
+        SET out_time = EXCLUDED.in_time
+        WHERE io_flight.out_time IS NULL
+    RETURNING id, (xmax = 0) AS inserted, entry_date, member_class, full_name,
+              uuid, member_number
+""")
+
+
+def _checkin_params(data: dict, at: datetime) -> dict:
+    """_CHECKIN_SQL のパラメータ（空文字は未指定として会員情報を使う）"""
+    def opt(key):
+        return (data.get(key) or None)
+
+    try:
+        member_uuid = str(uuidlib.UUID(str(data.get("uuid") or "")))
+    except ValueError:
+        member_uuid = None
+
+    return {
+        "member_number":  opt("member_number"),
+        "uuid":           member_uuid,
+        "member_class":   opt("member_class"),
+        "course_name":    opt("course_name"),
+        "glider_name":    opt("glider_name"),
+        "glider_color":   opt("glider_color"),
+        "insurance_type": opt("insurance_type"),
+        "radio_type":     opt("radio_type"),
+        "entry_date":     at.date(),
+        "at":             at,
+    }
+
+
+def _checkin_upsert(params: dict):
+    """
+    入山 / 下山を1文で記録し、RETURNING の行を返す（commit は呼び出し側）。
+    会員なし・下山済みの場合は None。
+    """
+    row = db.session.execute(_CHECKIN_SQL, params).first()
+    if row is not None:
+        # ORM を経由しないため集計・人物表・ライブボード通知は直接行う
+        if row.inserted:
+            _track_new_flights([row])
+        notify_io_changes([row.id])
+    return row
+
+
+def _track_new_flights(rows) -> None:
+    """
+    ORM を経由せずに入山（INSERT）した行を日別集計・会員別集計・人物表に反映する。
+    rows は RETURNING の行（uuid / member_number / full_name / member_class / entry_date）。
+    """
+    daily, member = defaultdict(Counter), defaultdict(Counter)
+    for r in rows:
+        daily[(r.entry_date, r.member_class)].update(total_cnt=1, unpaid_cnt=1)
+        member[member_stats_key(r.uuid, r.entry_date)].update(flight_days=1, unpaid_cnt=1)
+    add_daily_stats(daily)
+    add_member_stats(member)
+    touch_io_persons(rows)
+
+
+def _find_checkin_member(params: dict):
+    return (
+        (params["member_number"] and get_snapshot(member_number=params["member_number"]))
+        or (params["uuid"] and get_snapshot(uuid=params["uuid"]))
+        or None
+    )
+
+
+# ─────────────────────────────────────────
+# オフライン受付の一括同期
+# ─────────────────────────────────────────
 
-    repack_lim = _repack_limit(member)
-    flyer      = member.flyer
-    course     = _get_current_course(member)
-    record = IoFlight(
-        member_number  = member.member_number,
-        uuid           = member.uuid,
-        member_class   = data.get("member_class") or (course.member_type if course else None),
-        full_name      = member.full_name,
-        course_name    = data.get("course_name")  or (course.course_name if course else None),
-        reg_no         = flyer.reg_no        if flyer else None,
-        reglimit_date  = flyer.reglimit_date  if flyer else None,
-        license        = flyer.license        if flyer else None,
-        glider_name    = data.get("glider_name")  or (flyer.glider_name  if flyer else None),
-        glider_color   = data.get("glider_color") or (flyer.glider_color if flyer else None),
-        repack_date    = repack_lim,
-        insurance_type = data.get("insurance_type"),
-        radio_type     = data.get("radio_type"),
-        entry_date     = today,
-        in_time        = now,
+# POST /api/io/sync
+# 電波の届かない間に端末で記録した入山 / 下山イベントをまとめて反映する。
+#
+# リクエスト:
+#   {"events": [
+#       {"event_id": "端末側ID", "action": "checkin" | "checkout",
+#        "at": "2026-10-18T08:15:00+09:00",
+#        "member_number": "...", "uuid": "...",
+#        "member_class": ..., "course_name": ..., "glider_name": ...,
+#        "glider_color": ..., "insurance_type": ..., "radio_type": ...}, ...]}
+#
+# 処理:
+#   ・会員は member_snapshot から一括取得
+#   ・(uuid, 入山日) ごとにイベントをまとめ、入山は最も早い時刻・下山は最も遅い時刻を採用
+#   ・1回の INSERT ... ON CONFLICT で反映（既存レコードも同じ規則で更新）
+#     → 同じバッチを再送しても結果は変わらない
+#   ・全体を1トランザクションで commit し、イベントごとの結果を返す
+_SYNC_MAX = 500
+
+_SYNC_SQL = text("""
+    INSERT INTO io_flight (
+        member_number, uuid, member_class, full_name, course_name,
+        reg_no, reglimit_date, license, glider_name, glider_color, repack_date,
+        insurance_type, radio_type, entry_date, in_time, out_time,
+        yamachin, entrance_fee_paid, yamachin_confirmed
+    )
+    SELECT
+        s.member_number, CAST(s.uuid AS uuid),
+        COALESCE(e.member_class, s.member_type), s.full_name,
+        COALESCE(e.course_name, s.course_name),
+        s.reg_no, s.reglimit_date, s.license,
+        COALESCE(e.glider_name, s.glider_name), COALESCE(e.glider_color, s.glider_color),
+        s.repack_limit,
+        e.insurance_type, e.radio_type, e.entry_date,
+        COALESCE(e.in_time, e.out_time), e.out_time,
+        FALSE, FALSE, FALSE
+    FROM jsonb_to_recordset(CAST(:rows AS jsonb)) AS e(
+        member_id integer, entry_date date, in_time timestamp, out_time timestamp,
+        member_class text, course_name text, glider_name text, glider_color text,
+        insurance_type text, radio_type text
     )
-    db.session.add(record)
+    JOIN member_snapshot s ON s.member_id = e.member_id
+    ON CONFLICT (uuid, entry_date) DO UPDATE SET
+        in_time  = LEAST(io_flight.in_time, EXCLUDED.in_time),
+        out_time = CASE
+                       WHEN EXCLUDED.out_time IS NULL THEN io_flight.out_time
+                       ELSE GREATEST(io_flight.out_time, EXCLUDED.out_time)
+                   END
+    RETURNING id, (xmax = 0) AS inserted, uuid, entry_date, member_class,
+              member_number, full_name
+""")
+
+
+def _parse_event_time(value) -> datetime:
+    """ISO 形式の時刻 → サーバーのローカル時刻（naive）"""
+    at = datetime.fromisoformat(str(value))
+    if at.tzinfo is not None:
+        at = at.astimezone().replace(tzinfo=None)
+    return at
+
+
+@io_bp.route("/api/io/sync", methods=["POST"])
+def api_io_sync():
+    data   = request.get_json(silent=True) or {}
+    events = data.get("events")
+
+    if not isinstance(events, list) or not events:
+        return jsonify({"error": "events が指定されていません"}), 400
+    if len(events) > _SYNC_MAX:
+        return jsonify({"error": f"一度に同期できるのは {_SYNC_MAX} 件までです"}), 400
+
+    results = [None] * len(events)
+
+    def fail(i, message):
+        event_id = events[i].get("event_id") if isinstance(events[i], dict) else None
+        results[i] = {"index": i, "event_id": event_id, "status": "error", "message": message}
+
+    # ── 入力チェック ──────────────────────────────
+    parsed = []   # (index, action, at, params)
+    for i, ev in enumerate(events):
+        if not isinstance(ev, dict):
+            fail(i, "イベントの形式が不正です")
+            continue
+        action = ev.get("action")
+        if action not in ("checkin", "checkout"):
+            fail(i, "action は checkin / checkout のいずれかです")
+            continue
+        try:
+            at = _parse_event_time(ev.get("at"))
+        except (TypeError, ValueError):
+            fail(i, "at の日時形式が不正です")
+            continue
+        parsed.append((i, action, at, _checkin_params(ev, at)))
+
+    # ── 会員を一括取得（会員番号優先・なければ UUID） ────────
+    numbers = sorted({p["member_number"] for _, _, _, p in parsed if p["member_number"]})
+    uuids   = sorted({p["uuid"] for _, _, _, p in parsed if p["uuid"]})
+    by_number, by_uuid = {}, {}
+    if numbers or uuids:
+        for snap in db.session.execute(text("""
+            SELECT member_id, uuid, member_number FROM member_snapshot
+            WHERE member_number = ANY(:numbers) OR uuid = ANY(:uuids)
+        """), {"numbers": numbers, "uuids": uuids}):
+            by_number[snap.member_number] = snap
+            by_uuid[snap.uuid] = snap
+
+    # ── (uuid, 入山日) ごとにまとめる ──────────────────
+    groups = {}   # (uuid, entry_date) → {"row": {...}, "events": [(index, action)]}
+    for i, action, at, p in parsed:
+        snap = by_number.get(p["member_number"]) or by_uuid.get(p["uuid"])
+        if not snap:
+            fail(i, "会員が見つかりません")
+            continue
+        key = (snap.uuid, p["entry_date"])
+        group = groups.setdefault(key, {
+            "row": {"member_id": snap.member_id, "entry_date": p["entry_date"],
+                    "in_time": None, "out_time": None},
+            "events": [],
+        })
+        row = group["row"]
+        if action == "checkin":
+            if row["in_time"] is None or at < row["in_time"]:
+                row["in_time"] = at
+            for col in ("member_class", "course_name", "glider_name", "glider_color",
+                        "insurance_type", "radio_type"):
+                row.setdefault(col, p[col])
+        elif row["out_time"] is None or at > row["out_time"]:
+            row["out_time"] = at
+        group["events"].append((i, action))
+
+    # ── 既存レコード（下山のみのイベント・時刻の前後チェック用） ───
+    existing = {}
+    if groups:
+        for r in db.session.execute(text("""
+            SELECT f.id, CAST(f.uuid AS text) AS uuid, f.entry_date, f.in_time
+            FROM io_flight f
+            JOIN jsonb_to_recordset(CAST(:keys AS jsonb)) AS k(uuid uuid, entry_date date)
+              ON f.uuid = k.uuid AND f.entry_date = k.entry_date
+        """), {"keys": json.dumps([{"uuid": u, "entry_date": d.isoformat()} for u, d in groups])}):
+            existing[(r.uuid, r.entry_date)] = r
+
+    rows = []
+    for key, group in groups.items():
+        row = group["row"]
+        current = existing.get(key)
+        # 反映後の入山時刻（_SYNC_SQL は既存と LEAST を取る）で前後を判定する
+        in_times = [t for t in (row["in_time"], current.in_time if current else None) if t]
+        in_time = min(in_times) if in_times else None
+        error = None
+        if in_time is None:
+            error = "入山記録がありません"
+        elif row["out_time"] and row["out_time"] < in_time:
+            error = "下山時刻が入山時刻より前です"
+        if error:
+            for i, _ in group["events"]:
+                fail(i, error)
+            continue
+        rows.append({k: v.isoformat() if isinstance(v, (date, datetime)) else v
+                     for k, v in row.items()})
+
+    # ── 一括反映 ──────────────────────────────
+    flights = {}
+    if rows:
+        returned = db.session.execute(_SYNC_SQL, {"rows": json.dumps(rows)}).fetchall()
+        for r in returned:
+            flights[(str(r.uuid), r.entry_date)] = r
+        # ORM を経由しないため集計・人物表・ライブボード通知は直接行う
+        _track_new_flights([r for r in returned if r.inserted])
+        notify_io_changes(r.id for r in returned)
     db.session.commit()
 
+    for key, group in groups.items():
+        flight = flights.get(key)
+        if flight is None:
+            continue
+        for i, action in group["events"]:
+            results[i] = {"index": i, "event_id": events[i].get("event_id"),
+                          "status": "ok", "action": action, "io_flight_id": flight.id}
+    for i, r in enumerate(results):
+        if r is None:
+            fail(i, "反映できませんでした")
+
+    ok_count = sum(1 for r in results if r["status"] == "ok")
     return jsonify({
-        "action":       "checkin",
-        "in_time":      now.strftime("%H:%M"),
-        "message":      f"{member.full_name} さんの入山を記録しました",
-        "io_flight_id": record.id,
+        "status":      "ok",
+        "ok_count":    ok_count,
+        "error_count": len(results) - ok_count,
+        "results":     results,
+    })
+
+
+# ─────────────────────────────────────────
+# ツアーの一括入山 / 下山
+# ─────────────────────────────────────────
+
+# POST /api/io/tour/<booking_id>/checkin
+# ツアー申込（TourBooking）の引率者・参加者をまとめて入山 / 下山する。
+#
+# リクエスト（省略可）:
+#   {"action": "checkin" | "checkout", "insurance_type": ..., "radio_type": ...}
+#
+# 処理:
+#   ・会員番号を member_snapshot から1回で取得
+#   ・本日の既存レコードを1回で取得
+#   ・入山は member_snapshot からの複数行 INSERT ... ON CONFLICT DO NOTHING（1文）
+#     下山は入山中の行をまとめて UPDATE（1文）
+#   ・対象外（未登録・会員なし・重複・期限切れ・入山済み / 下山済み / 入山記録なし）は
+#     理由を付けて skipped で返す
+_TOUR_CHECKIN_SQL = text("""
+    INSERT INTO io_flight (
+        member_number, uuid, member_class, full_name, course_name,
+        reg_no, reglimit_date, license, glider_name, glider_color, repack_date,
+        insurance_type, radio_type, entry_date, in_time,
+        yamachin, entrance_fee_paid, yamachin_confirmed
+    )
+    SELECT
+        s.member_number, CAST(s.uuid AS uuid),
+        COALESCE(e.member_class, s.member_type), s.full_name, s.course_name,
+        s.reg_no, s.reglimit_date, s.license, s.glider_name, s.glider_color,
+        s.repack_limit,
+        :insurance_type, :radio_type, :entry_date, :at,
+        FALSE, FALSE, FALSE
+    FROM jsonb_to_recordset(CAST(:rows AS jsonb)) AS e(member_id integer, member_class text)
+    JOIN member_snapshot s ON s.member_id = e.member_id
+    ON CONFLICT (uuid, entry_date) DO NOTHING
+    RETURNING id, uuid, entry_date, member_class, member_number, full_name
+""")
+
+_TOUR_CHECKOUT_SQL = text("""
+    UPDATE io_flight SET out_time = :at
+    WHERE entry_date = :entry_date
+      AND out_time IS NULL
+      AND uuid = ANY(CAST(:uuids AS uuid[]))
+    RETURNING id, uuid
+""")
+
+
+@io_bp.route("/api/io/tour/<int:booking_id>/checkin", methods=["POST"])
+def api_io_tour_checkin(booking_id):
+    data    = request.get_json(silent=True) or {}
+    action  = data.get("action") or "checkin"
+    booking = TourBooking.query.get(booking_id)
+
+    if not booking:
+        return jsonify({"error": "ツアー申込が見つかりません"}), 404
+    if booking.app_status == "cancelled":
+        return jsonify({"error": "キャンセル済みのツアーです"}), 400
+    if action not in ("checkin", "checkout"):
+        return jsonify({"error": "action は checkin / checkout のいずれかです"}), 400
+
+    now   = datetime.now()
+    today = now.date()
+    people = (
+        [("leader", p) for p in sorted(booking.leaders, key=lambda p: (p.sort_order, p.id))]
+        + [("participant", p) for p in sorted(booking.participants, key=lambda p: (p.sort_order, p.id))]
+    )
+    results = [
+        {"role": role, "id": p.id, "full_name": p.full_name,
+         "member_number": p.member_number, "status": None}
+        for role, p in people
+    ]
+
+    def skip(result, reason):
+        result.update(status="skipped", reason=reason)
+
+    # ── 会員・本日の既存レコードを一括取得 ──────────────
+    numbers = sorted({(p.member_number or "").strip() for _, p in people} - {""})
+    snaps = {}
+    if numbers:
+        for snap in db.session.execute(text("""
+            SELECT member_id, uuid, member_number, license_status, repack_status
+            FROM member_snapshot
+            WHERE member_number = ANY(:numbers)
+        """), {"numbers": numbers}):
+            snaps[snap.member_number] = snap
+
+    existing = {}
+    if snaps:
+        for r in db.session.execute(text("""
+            SELECT id, CAST(uuid AS text) AS uuid, out_time
+            FROM io_flight
+            WHERE entry_date = :entry_date AND uuid = ANY(CAST(:uuids AS uuid[]))
+        """), {"entry_date": today, "uuids": [s.uuid for s in snaps.values()]}):
+            existing[r.uuid] = r
+
+    # ── 対象者の判定 ──────────────────────────────
+    targets = {}   # uuid → (result, 分類)
+    for (role, p), result in zip(people, results):
+        number = (p.member_number or "").strip()
+        snap   = snaps.get(number)
+        current = existing.get(snap.uuid) if snap else None
+        if not number:
+            skip(result, "未登録（会員番号なし）")
+        elif not snap:
+            skip(result, "会員が見つかりません")
+        elif snap.uuid in targets:
+            skip(result, "重複（同じ会員が既に含まれています）")
+        elif action == "checkin" and current is not None:
+            skip(result, "本日は下山済みです" if current.out_time else "入山済みです")
+        elif action == "checkin" and snap.license_status == "expired":
+            skip(result, "登録期限が切れています")
+        elif action == "checkin" and snap.repack_status == "expired":
+            skip(result, "リパック期限が切れています")
+        elif action == "checkout" and current is None:
+            skip(result, "入山記録がありません")
+        elif action == "checkout" and current.out_time:
+            skip(result, "下山済みです")
+        else:
+            targets[snap.uuid] = (result, (p.member_type or None), snap.member_id)
+
+    # ── 一括反映 ──────────────────────────────
+    done = {}
+    if targets and action == "checkin":
+        returned = db.session.execute(_TOUR_CHECKIN_SQL, {
+            "rows": json.dumps([{"member_id": member_id, "member_class": member_class}
+                                for _, member_class, member_id in targets.values()]),
+            "insurance_type": data.get("insurance_type") or None,
+            "radio_type":     data.get("radio_type") or None,
+            "entry_date":     today,
+            "at":             now,
+        }).fetchall()
+        # ORM を経由しないため集計・人物表・ライブボード通知は直接行う
+        _track_new_flights(returned)
+        done = {str(r.uuid): r.id for r in returned}
+    elif targets:
+        returned = db.session.execute(_TOUR_CHECKOUT_SQL, {
+            "at": now, "entry_date": today, "uuids": list(targets),
+        }).fetchall()
+        done = {str(r.uuid): r.id for r in returned}
+    notify_io_changes(done.values())
+    db.session.commit()
+
+    for member_uuid, (result, _, _) in targets.items():
+        if member_uuid in done:
+            result.update(status="ok", action=action, io_flight_id=done[member_uuid])
+        else:
+            # 判定後に別の端末で記録された
+            skip(result, "入山済みです" if action == "checkin" else "入山記録がありません")
+
+    ok_count = sum(1 for r in results if r["status"] == "ok")
+    return jsonify({
+        "status":        "ok",
+        "booking_no":    booking.booking_no,
+        "action":        action,
+        "time":          now.strftime("%H:%M"),
+        "ok_count":      ok_count,
+        "skipped_count": len(results) - ok_count,
+        "results":       results,
     })
 
 
@@ -342,35 +875,16 @@ def api_io_member_suggest():
     if not q_str:
         return jsonify({"members": []})
 
-    # io_flight から氏名部分一致で uuid・分類を取得（重複排除）
-    rows = (
-        db.session.query(
-            IoFlight.full_name,
-            IoFlight.uuid,
-            IoFlight.member_number,
-            IoFlight.member_class,
-        )
-        .filter(IoFlight.full_name.ilike(f"%{q_str}%"))
-        .distinct(IoFlight.uuid)
-        .order_by(IoFlight.uuid, IoFlight.full_name)
-        .limit(20)
-        .all()
-    )
-
-    # uuid ごとに1件に絞る（同一人物の重複を排除）
-    seen_uuid = set()
-    members   = []
-    for row in rows:
-        key = str(row.uuid) if row.uuid else row.full_name
-        if key in seen_uuid:
-            continue
-        seen_uuid.add(key)
-        members.append({
+    # 人物表（io_person）から氏名部分一致・最近よく来る順
+    members = [
+        {
             "full_name":     row.full_name,
-            "uuid":          str(row.uuid) if row.uuid else "",
+            "uuid":          str(row.uuid),
             "member_number": row.member_number or "",
             "member_class":  row.member_class  or "",
-        })
+        }
+        for row in suggest_io_persons(q_str, limit=20)
+    ]
 
     return jsonify({"members": members})
 
@@ -386,9 +900,11 @@ def api_io_daily():
     except ValueError:
         target_date = date.today()
 
-    q = IoFlight.query.filter_by(entry_date=target_date)
-    q = _apply_class_filter(q, class_filter)
-    records = q.order_by(IoFlight.in_time).all()
+    F = _flights_since(target_date)   # アーカイブ済みの期間を含む場合のみ UNION ALL
+
+    q = db.session.query(F).filter_by(entry_date=target_date)
+    q = _apply_class_filter(q, class_filter, F)
+    records = q.order_by(F.in_time).all()
 
     total     = len(records)
     in_count  = sum(1 for r in records if not r.out_time)
@@ -403,6 +919,52 @@ def api_io_daily():
     })
 
 
+# ─── 日別ライブボード（SSE） ──────────────
+# GET /api/io/info/live?date=YYYY-MM-DD&filter=分類
+# 接続時に event: snapshot（/api/io/info/daily と同じ形）を1回送り、
+# 以降は event: upsert（レコード）/ delete（{"id": ...}）で差分のみ送る。
+@io_bp.route("/api/io/info/live")
+def api_io_live():
+    date_str     = request.args.get("date")
+    class_filter = request.args.get("filter", "all")
+
+    try:
+        target_date = date.fromisoformat(date_str) if date_str else date.today()
+    except ValueError:
+        target_date = date.today()
+    day = target_date.isoformat()
+
+    def load_snapshot():
+        q = _apply_class_filter(IoFlight.query.filter_by(entry_date=target_date), class_filter)
+        records = q.order_by(IoFlight.in_time).all()
+        in_count = sum(1 for r in records if not r.out_time)
+        return {
+            "date":      day,
+            "total":     len(records),
+            "in_count":  in_count,
+            "out_count": len(records) - in_count,
+            "records":   _record_to_dict.many(records),
+        }
+
+    def match(record):
+        if record["entry_date"] != day:
+            return False
+        return class_filter in ("", "all") or class_filter.lower() in (record["member_class"] or "").lower()
+
+    return Response(
+        stream_with_context(stream_live_board(
+            current_app._get_current_object(), _load_live_records, load_snapshot, match,
+        )),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _load_live_records(ids):
+    """ライブボード用：変更された io_flight を dict で返す（リスナースレッドから呼ばれる）"""
+    return _record_to_dict.many(IoFlight.query.filter(IoFlight.id.in_(ids)).all())
+
+
 # ─── 月別カレンダーデータ（フィルター対応） ──
 @io_bp.route("/api/io/info/calendar")
 def api_io_calendar():
@@ -417,60 +979,63 @@ def api_io_calendar():
     try:
         year  = int(request.args.get("year",  today.year))
         month = int(request.args.get("month", today.month))
+        month_start = date(year, month, 1)
     except ValueError:
         year, month = today.year, today.month
+        month_start = date(year, month, 1)
+    month_end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
 
     class_filter = request.args.get("filter", "all")
     filter_type  = request.args.get("type",   "all")
     period       = request.args.get("period", "3m")
     member_query = (request.args.get("query", "") or "").strip()
 
-    # 月範囲の基本フィルター
-    q = IoFlight.query.filter(
-        extract("year",  IoFlight.entry_date) == year,
-        extract("month", IoFlight.entry_date) == month,
-    )
-
-    # 特殊フィルター適用
-    if filter_type == "yamachin":
-        q = q.filter(IoFlight.yamachin == True)  # noqa: E712
-    elif filter_type == "comment":
-        q = q.filter(IoFlight.comment.isnot(None), IoFlight.comment != "")
-    elif filter_type == "member":
-        q = _apply_class_filter(q, class_filter)
+    if filter_type != "member":
+        # 分類・山チン・備考フィルターは日別集計表（io_flight_daily_stats）から返す
+        # 山チン・備考は従来どおり分類フィルターを適用しない（全分類の件数）
+        rows = read_daily_stats(
+            month_start, month_end,
+            "all" if filter_type in ("yamachin", "comment") else class_filter,
+        )
+        if filter_type == "yamachin":
+            counts = [(r.entry_date, r.yamachin_cnt, r.yamachin_cnt) for r in rows]
+        elif filter_type == "comment":
+            counts = [(r.entry_date, r.comment_cnt, r.yamachin_comment_cnt) for r in rows]
+        else:
+            counts = [(r.entry_date, r.total_cnt, r.yamachin_cnt) for r in rows]
+    else:
+        # 個人フィルターは日付範囲（インデックス）で1回だけ集計する
+        F = _flights_since(month_start)
+        q = db.session.query(
+            F.entry_date,
+            func.count(F.id),
+            func.count(F.id).filter(F.yamachin == True),  # noqa: E712
+        ).filter(
+            F.entry_date >= month_start,
+            F.entry_date <  month_end,
+        )
+        q = _apply_class_filter(q, class_filter, F)
         if member_query:
             try:
                 uuid_obj = uuidlib.UUID(member_query)
-                q = q.filter(IoFlight.uuid == uuid_obj)
+                q = q.filter(F.uuid == uuid_obj)
             except ValueError:
-                q = q.filter(IoFlight.member_number == member_query)
+                q = q.filter(F.member_number == member_query)
         cutoff = _period_cutoff(period)
         if cutoff:
-            q = q.filter(IoFlight.entry_date >= cutoff)
-    else:
-        q = _apply_class_filter(q, class_filter)
-
-    id_subq = [r.id for r in q.with_entities(IoFlight.id)]
-
-    rows = (
-        db.session.query(
-            IoFlight.entry_date,
-            func.count(IoFlight.id).label("cnt"),
-            func.sum(func.cast(IoFlight.yamachin, db.Integer)).label("yamachin_cnt"),
-        )
-        .filter(IoFlight.id.in_(id_subq))
-        .group_by(IoFlight.entry_date)
-        .all()
-    )
+            q = q.filter(F.entry_date >= cutoff)
+        counts = q.group_by(F.entry_date).all()
 
     days = {}
     month_total = 0
-    for row in rows:
-        days[row.entry_date.isoformat()] = {
-            "count":        row.cnt,
-            "yamachin_cnt": int(row.yamachin_cnt or 0),
+    for entry_date, cnt, yamachin_cnt in counts:
+        if not cnt:
+            continue
+        days[entry_date.isoformat()] = {
+            "count":        int(cnt),
+            "yamachin_cnt": int(yamachin_cnt or 0),
         }
-        month_total += row.cnt
+        month_total += int(cnt)
 
     return jsonify({
         "year":        year,
@@ -493,24 +1058,26 @@ def api_io_date_members():
     except ValueError:
         target_date = date.today()
 
-    q = IoFlight.query.filter_by(entry_date=target_date)
+    F = _flights_since(target_date)   # アーカイブ済みの期間を含む場合のみ UNION ALL
+
+    q = db.session.query(F).filter_by(entry_date=target_date)
 
     if filter_type == "yamachin":
-        q = q.filter(IoFlight.yamachin == True)  # noqa: E712
+        q = q.filter(F.yamachin == True)  # noqa: E712
     elif filter_type == "comment":
-        q = q.filter(IoFlight.comment.isnot(None), IoFlight.comment != "")
+        q = q.filter(F.comment.isnot(None), F.comment != "")
     elif filter_type == "member":
-        q = _apply_class_filter(q, class_filter)
+        q = _apply_class_filter(q, class_filter, F)
         if member_query:
             try:
                 uuid_obj = uuidlib.UUID(member_query)
-                q = q.filter(IoFlight.uuid == uuid_obj)
+                q = q.filter(F.uuid == uuid_obj)
             except ValueError:
-                q = q.filter(IoFlight.member_number == member_query)
+                q = q.filter(F.member_number == member_query)
     else:
-        q = _apply_class_filter(q, class_filter)
+        q = _apply_class_filter(q, class_filter, F)
 
-    records = q.order_by(IoFlight.in_time).all()
+    records = q.order_by(F.in_time).all()
 
     return jsonify({
         "date":    target_date.isoformat(),
@@ -541,6 +1108,13 @@ def api_io_update_record(record_id):
 
 
 # ─── 特殊フィルター（山チン・備考・個人） ─
+# GET /api/io/info/special
+# クエリ: type / period / filter / query / uuid（絞り込み）
+#         limit=N&after=<YYYY-MM-DD:id>  → keyset ページング（entry_date 降順・id 降順）
+#                 { "type", "period", "count": 総件数, "records": [...],
+#                   "has_more": bool, "next_after": "YYYY-MM-DD:id"|null }
+#         format=csv | ndjson            → 該当行（after 指定時はその続き）をストリーミングで書き出す
+#         指定なし                       → 従来どおり全件の JSON
 @io_bp.route("/api/io/info/special")
 def api_io_special():
     filter_type  = request.args.get("type",   "yamachin")
@@ -551,17 +1125,19 @@ def api_io_special():
 
     cutoff = _period_cutoff(period)  # None = 全期間
 
-    q = IoFlight.query
+    F = _flights_since(cutoff)   # アーカイブ済みの期間を含む場合のみ UNION ALL
+
+    q = db.session.query(F)
     if cutoff:
-        q = q.filter(IoFlight.entry_date >= cutoff)
+        q = q.filter(F.entry_date >= cutoff)
 
     if filter_type == "yamachin":
         # 山チン：全期間・全員
-        q = q.filter(IoFlight.yamachin == True)  # noqa: E712
+        q = q.filter(F.yamachin == True)  # noqa: E712
 
     elif filter_type == "comment":
         # 備考あり：全期間・全員
-        q = q.filter(IoFlight.comment.isnot(None), IoFlight.comment != "")
+        q = q.filter(F.comment.isnot(None), F.comment != "")
 
     elif filter_type.startswith("member"):
         # 個人系フィルター：特定の人物に絞る
@@ -569,32 +1145,126 @@ def api_io_special():
         if member_uuid:
             try:
                 uuid_obj = uuidlib.UUID(member_uuid)
-                q = q.filter(IoFlight.uuid == uuid_obj)
+                q = q.filter(F.uuid == uuid_obj)
             except ValueError:
                 pass
         elif member_query:
-            q = q.filter(IoFlight.full_name.ilike(f"%{member_query}%"))
+            q = q.filter(F.full_name.ilike(f"%{member_query}%"))
         else:
             return jsonify({"error": "氏名を入力してください"}), 400
 
         # subtype による追加絞り込み
         if filter_type == "member_yamachin":
-            q = q.filter(IoFlight.yamachin == True)  # noqa: E712
+            q = q.filter(F.yamachin == True)  # noqa: E712
         elif filter_type == "member_comment":
-            q = q.filter(IoFlight.comment.isnot(None), IoFlight.comment != "")
+            q = q.filter(F.comment.isnot(None), F.comment != "")
         elif filter_type == "member_yama_comment":
             from sqlalchemy import or_
             q = q.filter(or_(
-                IoFlight.yamachin == True,  # noqa: E712
-                (IoFlight.comment.isnot(None) & (IoFlight.comment != "")),
+                F.yamachin == True,  # noqa: E712
+                (F.comment.isnot(None) & (F.comment != "")),
             ))
         # "member" のみ（チェックなし）は追加フィルターなし
 
-    records = q.order_by(IoFlight.entry_date.desc(), IoFlight.in_time).all()
+    export_format = request.args.get("format")
+    limit         = request.args.get("limit", type=int)
+    after         = request.args.get("after")
+
+    if not (export_format or limit or after):
+        records = q.order_by(F.entry_date.desc(), F.in_time).all()
+
+        return jsonify({
+            "type":    filter_type,
+            "period":  period,
+            "count":   len(records),
+            "records": _record_to_dict.many(records),
+        })
+
+    if export_format and export_format not in ("csv", "ndjson"):
+        return jsonify({"error": f"format は csv / ndjson のいずれかです: {export_format}"}), 400
+    try:
+        cursor = _parse_special_cursor(after) if after else None
+    except ValueError:
+        return jsonify({"error": "after の形式が不正です（YYYY-MM-DD:id）"}), 400
+
+    # 総件数はページ位置によらない（カーソル適用前に数える）
+    total = None if export_format else _special_total(q, filter_type, cutoff)
+
+    # ── keyset：(entry_date, id) 降順・after = 前ページ最後の (entry_date, id) ──
+    q = q.order_by(F.entry_date.desc(), F.id.desc())
+    if cursor:
+        q = q.filter(tuple_(F.entry_date, F.id) < tuple_(*cursor))
+
+    if export_format:
+        filename = f"io_{filter_type}_{period}.{export_format}"
+        return Response(
+            stream_with_context(
+                _stream_special_csv(q) if export_format == "csv" else _stream_special_ndjson(q)
+            ),
+            mimetype="text/csv" if export_format == "csv" else "application/x-ndjson",
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+
+    limit    = max(1, min(limit or _SPECIAL_PAGE_MAX, _SPECIAL_PAGE_MAX))
+    records  = q.limit(limit + 1).all()   # 1件多く取得して次ページ有無を判定
+    has_more = len(records) > limit
+    records  = records[:limit]
 
     return jsonify({
-        "type":    filter_type,
-        "period":  period,
-        "count":   len(records),
-        "records": [_record_to_dict(r) for r in records],
+        "type":       filter_type,
+        "period":     period,
+        "count":      total,
+        "records":    _record_to_dict.many(records),
+        "has_more":   has_more,
+        "next_after": f"{records[-1].entry_date.isoformat()}:{records[-1].id}" if has_more else None,
     })
+
+
+# /api/io/info/special のページング上限・ストリーミング時のフェッチ単位
+_SPECIAL_PAGE_MAX     = 500
+_SPECIAL_STREAM_CHUNK = 500
+_SPECIAL_FLUSH_BYTES  = 64 * 1024
+
+# 全員対象のフィルター → 日別集計（io_flight_daily_stats）の列
+_SPECIAL_TOTAL_COLUMN = {"yamachin": "yamachin_cnt", "comment": "comment_cnt"}
+
+
+def _special_total(query, filter_type: str, cutoff: date | None) -> int:
+    """
+    特殊フィルターの総件数。
+    山チン / 備考ありは日別集計の合計（io_flight を数えない）、
+    個人系は対象者の行だけなので絞り込み済みのクエリで COUNT する。
+    """
+    column = _SPECIAL_TOTAL_COLUMN.get(filter_type)
+    if column:
+        return count_daily_stats(column, since=cutoff)
+    return query.order_by(None).count()
+
+
+def _parse_special_cursor(value: str) -> tuple:
+    """'YYYY-MM-DD:id' → (date, id)。不正な形式は ValueError"""
+    day, _, record_id = value.partition(":")
+    return date.fromisoformat(day), int(record_id)
+
+
+def _stream_special_csv(query):
+    """yield_per で少しずつ読み、CSV（UTF-8 BOM 付き・列は _record_to_dict と同じ）を返す"""
+    buf    = io.StringIO()
+    writer = csv.writer(buf)
+    buf.write("\ufeff")   # Excel 用 BOM
+    writer.writerow(_record_to_dict.fields)
+
+    for r in query.yield_per(_SPECIAL_STREAM_CHUNK):
+        writer.writerow(_record_to_dict(r).values())
+        if buf.tell() >= _SPECIAL_FLUSH_BYTES:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def _stream_special_ndjson(query):
+    """yield_per で少しずつ読み、1行1レコードの JSON（NDJSON）を返す"""
+    dumps = current_app.json.dumps
+    for r in query.yield_per(_SPECIAL_STREAM_CHUNK):
+        yield dumps(_record_to_dict(r)) + "\n"
@@ -0,0 +1,170 @@
+"""
+app/routes/io_flight_stats.py
+入下山 日別集計（io_flight_daily_stats）
+新規追加（2026-10-18）
+
+用途:
+    入下山管理のカレンダー（/api/io/info/calendar）は月表示のたびに
+    extract(year/month) で io_flight を全件走査し、該当 id を Python の
+    リストに展開してから IN (...) で再度 GROUP BY していた（2回の全件走査）。
+    io_flight_daily_stats は (entry_date, member_class) ごとの件数を保持し、
+    カレンダーは月の範囲でこの小さな表を読むだけで済む。
+
+保持する値（entry_date, member_class ごと。member_class が NULL の行は ''）:
+    total_cnt            : 入山件数
+    yamachin_cnt         : 山チンあり
+    comment_cnt          : 備考あり（NULL・空文字以外）
+    yamachin_comment_cnt : 山チンあり かつ 備考あり（備考フィルター時の山チン件数）
+    unpaid_cnt           : 入山料 未入金（entrance_fee_paid = FALSE）
+
+更新タイミング:
+    ・io_flight を含む flush の直後（after_flush）に、変更前 / 変更後の
+      寄与の差分を加算する（入山・下山・山チン / 備考 / 入金の更新・削除）。
+      加算（total_cnt = total_cnt + 差分）なので同時受付でも値が崩れない
+    ・ORM を経由しない UPDATE は add_daily_stats() で差分を反映する
+    ・起動時に全件を再集計（差分の取りこぼし対策）
+    ・アーカイブ（io_flight_archive）へ移した行も件数に含める
+      （retention の移動は ORM を経由しないので差分は発生しない）
+"""
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.db import db
+from app.models.io_flight import IoFlight
+from app.routes.flush_history import flush_deltas
+
+
+_COUNT_COLS = ["total_cnt", "yamachin_cnt", "comment_cnt", "yamachin_comment_cnt", "unpaid_cnt"]
+
+# 1行あたりの寄与を集計する SQL 式（_COUNT_COLS と同じ順）
+_COUNT_EXPRS = [
+    "COUNT(*)",
+    "COUNT(*) FILTER (WHERE yamachin)",
+    "COUNT(*) FILTER (WHERE COALESCE(comment, '') <> '')",
+    "COUNT(*) FILTER (WHERE yamachin AND COALESCE(comment, '') <> '')",
+    "COUNT(*) FILTER (WHERE NOT entrance_fee_paid)",
+]
+
+
+# 起動時マイグレーション（io_flight_routes の record_once から実行）
+DAILY_STATS_DDL = [
+    f"""CREATE TABLE IF NOT EXISTS io_flight_daily_stats (
+        entry_date    DATE NOT NULL,
+        member_class  VARCHAR(20) NOT NULL DEFAULT '',
+        {", ".join(f"{c} INTEGER NOT NULL DEFAULT 0" for c in _COUNT_COLS)},
+        PRIMARY KEY (entry_date, member_class)
+    )""",
+    # 絞り込みありカレンダー・日別一覧の範囲検索用
+    "CREATE INDEX IF NOT EXISTS ix_io_flight_entry_date ON io_flight (entry_date)",
+]
+
+
+# =========================================
+# 再集計
+# =========================================
+
+def rebuild_daily_stats() -> None:
+    """io_flight（アーカイブ含む）から全件を再集計する。commit は呼び出し側で行う。"""
+    cols = "entry_date, member_class, yamachin, comment, entrance_fee_paid"
+    db.session.execute(text("DELETE FROM io_flight_daily_stats"))
+    db.session.execute(text(f"""
+        INSERT INTO io_flight_daily_stats (entry_date, member_class, {", ".join(_COUNT_COLS)})
+        SELECT entry_date, COALESCE(member_class, ''), {", ".join(_COUNT_EXPRS)}
+        FROM (
+            SELECT {cols} FROM io_flight
+            UNION ALL
+            SELECT {cols} FROM io_flight_archive
+        ) f
+        GROUP BY entry_date, COALESCE(member_class, '')
+    """))
+
+
+# =========================================
+# 差分更新
+# =========================================
+
+_UPSERT_SQL = text(f"""
+    INSERT INTO io_flight_daily_stats (entry_date, member_class, {", ".join(_COUNT_COLS)})
+    VALUES (:entry_date, :member_class, {", ".join(":" + c for c in _COUNT_COLS)})
+    ON CONFLICT (entry_date, member_class) DO UPDATE SET
+    {", ".join(f"{c} = io_flight_daily_stats.{c} + EXCLUDED.{c}" for c in _COUNT_COLS)}
+""")
+
+
+def _contribution(entry_date, member_class, yamachin, comment, entrance_fee_paid):
+    """1レコードの寄与 → ((entry_date, member_class), [件数...])"""
+    has_comment = bool(comment)
+    return (entry_date, member_class or ""), [
+        1,
+        1 if yamachin else 0,
+        1 if has_comment else 0,
+        1 if yamachin and has_comment else 0,
+        0 if entrance_fee_paid else 1,
+    ]
+
+
+_TRACKED = ("entry_date", "member_class", "yamachin", "comment", "entrance_fee_paid")
+
+
+def add_daily_stats(deltas, connection=None) -> None:
+    """
+    {(entry_date, member_class): {"total_cnt": 差分, ...}} を集計表に加算する。
+    省略した列は 0。差分がすべて 0 のキーは書き込まない。commit は呼び出し側で行う。
+    """
+    params = [
+        {"entry_date": key[0], "member_class": key[1] or "",
+         **{c: counts.get(c, 0) for c in _COUNT_COLS}}
+        for key, counts in deltas.items()
+        if key[0] is not None and any(counts.values())
+    ]
+    if params:
+        conn = connection if connection is not None else db.session
+        conn.execute(_UPSERT_SQL, params)
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_daily_stats_after_flush(session, flush_context):
+    """io_flight を含む flush の後、変更前後の寄与の差分を集計表に加算する"""
+    deltas = flush_deltas(session, IoFlight, _TRACKED, _contribution, len(_COUNT_COLS))
+    if deltas:
+        add_daily_stats(
+            {key: dict(zip(_COUNT_COLS, counts)) for key, counts in deltas.items()},
+            connection=session.connection(),
+        )
+
+
+# =========================================
+# 参照
+# =========================================
+
+def read_daily_stats(start, end, class_filter: str = "all"):
+    """
+    [start, end) の日別合計を返す（member_class は分類フィルターで絞り込み）。
+    行: entry_date, total_cnt, yamachin_cnt, comment_cnt, yamachin_comment_cnt, unpaid_cnt
+    """
+    where, params = "entry_date >= :start AND entry_date < :end", {"start": start, "end": end}
+    if class_filter and class_filter != "all":
+        # _apply_class_filter（ilike '%分類%'）と同じ判定
+        where += " AND member_class ILIKE :cls"
+        params["cls"] = f"%{class_filter}%"
+
+    return db.session.execute(text(f"""
+        SELECT entry_date, {", ".join(f"SUM({c}) AS {c}" for c in _COUNT_COLS)}
+        FROM io_flight_daily_stats
+        WHERE {where}
+        GROUP BY entry_date
+        HAVING SUM(total_cnt) > 0
+        ORDER BY entry_date
+    """), params).fetchall()
+
+
+def count_daily_stats(column: str, since=None) -> int:
+    """since 以降（None = 全期間）の column の合計（特殊フィルターの総件数用）"""
+    if column not in _COUNT_COLS:
+        raise ValueError(f"集計列がありません: {column}")
+    where, params = "", {}
+    if since is not None:
+        where, params = "WHERE entry_date >= :since", {"since": since}
+    return db.session.execute(
+        text(f"SELECT COALESCE(SUM({column}), 0) FROM io_flight_daily_stats {where}"), params,
+    ).scalar()
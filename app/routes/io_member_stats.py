@@ -0,0 +1,159 @@
+"""
+app/routes/io_member_stats.py
+入下山 会員別集計（io_member_season_stats）
+新規追加（2026-10-18）
+
+用途:
+    「このビジターは今シーズン何日飛んだか」「最後に来たのはいつか」は
+    これまで io_flight を個人フィルター（type=member）で全件走査しないと
+    分からなかった。io_member_season_stats は (uuid, シーズン) ごとの件数を
+    保持し、ゲートのルックアップ（/api/io/lookup）でも1行の参照で返せる。
+
+保持する値（uuid, season ごと。season = 入山日の年）:
+    flight_days  : 入山日数（io_flight は1人1日1レコード）
+    yamachin_cnt : 山チンあり
+    unpaid_cnt   : 入山料 未入金
+
+    通算の日数・件数は全シーズンの合計、最後の入山日は io_person.last_seen。
+
+更新タイミング（io_flight_stats の日別集計と同じ方式）:
+    ・io_flight を含む flush の直後（after_flush）に、変更前 / 変更後の寄与の
+      差分を加算する（山チン / 入金の更新・削除）
+    ・ORM を経由しない入山（checkin / sync）・入金確認は add_member_stats() で反映する
+    ・起動時に全件を再集計（アーカイブ含む。差分の取りこぼし対策）
+    ・uuid のない記録は対象外
+"""
+
+from datetime import date
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.db import db
+from app.models.io_flight import IoFlight
+from app.routes.flush_history import flush_deltas
+
+
+_COUNT_COLS = ["flight_days", "yamachin_cnt", "unpaid_cnt"]
+
+
+# 起動時マイグレーション（io_flight_routes の record_once から実行）
+MEMBER_STATS_DDL = [
+    f"""CREATE TABLE IF NOT EXISTS io_member_season_stats (
+        uuid    UUID     NOT NULL,
+        season  SMALLINT NOT NULL,
+        {", ".join(f"{c} INTEGER NOT NULL DEFAULT 0" for c in _COUNT_COLS)},
+        PRIMARY KEY (uuid, season)
+    )""",
+]
+
+
+# =========================================
+# 再集計
+# =========================================
+
+def rebuild_member_stats() -> None:
+    """io_flight（アーカイブ含む）から全件を再集計する。commit は呼び出し側で行う。"""
+    cols = "uuid, entry_date, yamachin, entrance_fee_paid"
+    db.session.execute(text("DELETE FROM io_member_season_stats"))
+    db.session.execute(text(f"""
+        INSERT INTO io_member_season_stats (uuid, season, {", ".join(_COUNT_COLS)})
+        SELECT uuid, EXTRACT(YEAR FROM entry_date),
+               COUNT(*),
+               COUNT(*) FILTER (WHERE yamachin),
+               COUNT(*) FILTER (WHERE NOT entrance_fee_paid)
+        FROM (
+            SELECT {cols} FROM io_flight
+            UNION ALL
+            SELECT {cols} FROM io_flight_archive
+        ) f
+        WHERE uuid IS NOT NULL
+        GROUP BY uuid, EXTRACT(YEAR FROM entry_date)
+    """))
+
+
+# =========================================
+# 差分更新
+# =========================================
+
+_UPSERT_SQL = text(f"""
+    INSERT INTO io_member_season_stats (uuid, season, {", ".join(_COUNT_COLS)})
+    VALUES (CAST(:uuid AS uuid), :season, {", ".join(":" + c for c in _COUNT_COLS)})
+    ON CONFLICT (uuid, season) DO UPDATE SET
+    {", ".join(f"{c} = io_member_season_stats.{c} + EXCLUDED.{c}" for c in _COUNT_COLS)}
+""")
+
+
+def member_stats_key(member_uuid, entry_date):
+    """(uuid, entry_date) → 集計表のキー (uuid 文字列, season)。uuid がなければ None"""
+    if member_uuid is None or entry_date is None:
+        return None
+    return str(member_uuid), entry_date.year
+
+
+def add_member_stats(deltas, connection=None) -> None:
+    """
+    {(uuid, season): {"flight_days": 差分, ...}} を集計表に加算する。
+    キーが None のもの・差分がすべて 0 のものは書き込まない。commit は呼び出し側で行う。
+    """
+    params = [
+        {"uuid": key[0], "season": key[1], **{c: counts.get(c, 0) for c in _COUNT_COLS}}
+        for key, counts in deltas.items()
+        if key is not None and any(counts.values())
+    ]
+    if params:
+        conn = connection if connection is not None else db.session
+        conn.execute(_UPSERT_SQL, params)
+
+
+_TRACKED = ("uuid", "entry_date", "yamachin", "entrance_fee_paid")
+
+
+def _contribution(member_uuid, entry_date, yamachin, entrance_fee_paid):
+    return member_stats_key(member_uuid, entry_date), [
+        1,
+        1 if yamachin else 0,
+        0 if entrance_fee_paid else 1,
+    ]
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_member_stats_after_flush(session, flush_context):
+    """io_flight を含む flush の後、変更前後の寄与の差分を会員別集計に加算する"""
+    deltas = flush_deltas(session, IoFlight, _TRACKED, _contribution, len(_COUNT_COLS))
+    if deltas:
+        add_member_stats(
+            {key: dict(zip(_COUNT_COLS, counts)) for key, counts in deltas.items()},
+            connection=session.connection(),
+        )
+
+
+# =========================================
+# 参照
+# =========================================
+
+_READ_SQL = text("""
+    SELECT
+        COALESCE(SUM(flight_days)  FILTER (WHERE season = :season), 0) AS season_flight_days,
+        COALESCE(SUM(yamachin_cnt) FILTER (WHERE season = :season), 0) AS season_yamachin_cnt,
+        COALESCE(SUM(flight_days),  0)                                 AS total_flight_days,
+        COALESCE(SUM(yamachin_cnt), 0)                                 AS yamachin_cnt,
+        COALESCE(SUM(unpaid_cnt),   0)                                 AS unpaid_cnt,
+        (SELECT last_seen FROM io_person WHERE uuid = CAST(:uuid AS uuid)) AS last_entry_date
+    FROM io_member_season_stats
+    WHERE uuid = CAST(:uuid AS uuid)
+""")
+
+
+def read_member_stats(member_uuid, today: date = None) -> dict:
+    """会員1人分の集計（今シーズン・通算・最後の入山日）を返す"""
+    season = (today or date.today()).year
+    row = db.session.execute(_READ_SQL, {"uuid": str(member_uuid), "season": season}).first()
+    return {
+        "season":              season,
+        "season_flight_days":  row.season_flight_days,
+        "season_yamachin_cnt": row.season_yamachin_cnt,
+        "total_flight_days":   row.total_flight_days,
+        "yamachin_cnt":        row.yamachin_cnt,
+        "unpaid_cnt":          row.unpaid_cnt,
+        "last_entry_date":     row.last_entry_date.isoformat() if row.last_entry_date else None,
+    }
@@ -0,0 +1,183 @@
+"""
+app/routes/io_person.py
+入下山 人物ディメンション（io_person）
+新規追加（2026-10-18）
+
+用途:
+    入下山管理の氏名サジェスト（/api/io/info/member_suggest）は入力のたびに
+    io_flight（アーカイブ含む）の全履歴を ILIKE '%q%' で走査し、DISTINCT ON (uuid)
+    で人物を取り出していた。io_person は uuid ごとに1行だけを持つ小さな表で、
+    サジェストはこの表を trigram インデックスで引き、最近よく来る人から並べる。
+
+保持する値（uuid ごと）:
+    member_number / full_name / member_class : 最後に入山したときの値
+    last_seen                                : 最後の入山日
+    visit_count                              : 入山日数（io_flight は1人1日1レコード）
+
+更新タイミング:
+    ・入山（INSERT）のたびに touch_io_persons() で加算する
+      /api/io/checkin・/api/io/sync は RETURNING の行から直接、
+      ORM 経由の追加・削除は after_flush で反映する
+    ・起動時、表が空なら io_flight + io_flight_archive から1回だけ作成する
+      （retention のアーカイブ移動は行を消さないので件数は変わらない）
+    ・uuid のない記録は対象外
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.db import db
+from app.models.io_flight import IoFlight
+
+
+# 起動時マイグレーション（io_flight_routes の record_once から実行）
+IO_PERSON_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """CREATE TABLE IF NOT EXISTS io_person (
+        uuid          UUID PRIMARY KEY,
+        member_number VARCHAR(20),
+        full_name     VARCHAR(100),
+        member_class  VARCHAR(20),
+        last_seen     DATE NOT NULL,
+        visit_count   INTEGER NOT NULL DEFAULT 0
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_io_person_full_name_trgm "
+    "ON io_person USING gin (full_name gin_trgm_ops)",
+]
+
+
+# =========================================
+# 初回バックフィル
+# =========================================
+
+def backfill_io_persons() -> bool:
+    """
+    io_person が空なら io_flight（アーカイブ含む）から作成する。
+    作成した場合 True。commit は呼び出し側で行う。
+    """
+    if db.session.execute(text("SELECT EXISTS (SELECT 1 FROM io_person)")).scalar():
+        return False
+    cols = "uuid, member_number, full_name, member_class, entry_date, id"
+    db.session.execute(text(f"""
+        INSERT INTO io_person (uuid, member_number, full_name, member_class, last_seen, visit_count)
+        SELECT DISTINCT ON (uuid)
+               uuid, member_number, full_name, member_class, entry_date,
+               COUNT(*) OVER (PARTITION BY uuid)
+        FROM (
+            SELECT {cols} FROM io_flight
+            UNION ALL
+            SELECT {cols} FROM io_flight_archive
+        ) f
+        WHERE uuid IS NOT NULL
+        ORDER BY uuid, entry_date DESC, id DESC
+    """))
+    return True
+
+
+# =========================================
+# 差分更新
+# =========================================
+
+# 入山日が最後の入山日以降なら氏名・分類・会員番号を更新する
+_TOUCH_SQL = text("""
+    INSERT INTO io_person (uuid, member_number, full_name, member_class, last_seen, visit_count)
+    VALUES (CAST(:uuid AS uuid), :member_number, :full_name, :member_class, :entry_date, :visits)
+    ON CONFLICT (uuid) DO UPDATE SET
+        member_number = CASE WHEN EXCLUDED.last_seen >= io_person.last_seen
+                             THEN COALESCE(EXCLUDED.member_number, io_person.member_number)
+                             ELSE io_person.member_number END,
+        full_name     = CASE WHEN EXCLUDED.last_seen >= io_person.last_seen
+                             THEN COALESCE(EXCLUDED.full_name, io_person.full_name)
+                             ELSE io_person.full_name END,
+        member_class  = CASE WHEN EXCLUDED.last_seen >= io_person.last_seen
+                             THEN COALESCE(EXCLUDED.member_class, io_person.member_class)
+                             ELSE io_person.member_class END,
+        last_seen     = GREATEST(io_person.last_seen, EXCLUDED.last_seen),
+        visit_count   = io_person.visit_count + EXCLUDED.visit_count
+""")
+
+_FORGET_SQL = text("""
+    UPDATE io_person SET visit_count = GREATEST(visit_count - :visits, 0)
+    WHERE uuid = CAST(:uuid AS uuid)
+""")
+
+
+def touch_io_persons(rows, connection=None) -> None:
+    """
+    入山した行（uuid / member_number / full_name / member_class / entry_date を持つ
+    dict または行）を io_person に反映する。commit は呼び出し側で行う。
+    """
+    visits = defaultdict(int)
+    latest = {}
+    for r in rows:
+        r = r if isinstance(r, dict) else r._mapping
+        if r["uuid"] is None or r["entry_date"] is None:
+            continue
+        key = str(r["uuid"])
+        visits[key] += 1
+        if key not in latest or r["entry_date"] >= latest[key]["entry_date"]:
+            latest[key] = r
+
+    params = [
+        {"uuid": key, "member_number": r["member_number"], "full_name": r["full_name"],
+         "member_class": r["member_class"], "entry_date": r["entry_date"], "visits": visits[key]}
+        for key, r in latest.items()
+    ]
+    if params:
+        conn = connection if connection is not None else db.session
+        conn.execute(_TOUCH_SQL, params)
+
+
+def forget_io_persons(uuids, connection=None) -> None:
+    """削除された入山記録の分だけ visit_count を減らす。commit は呼び出し側で行う。"""
+    visits = defaultdict(int)
+    for u in uuids:
+        if u is not None:
+            visits[str(u)] += 1
+    if visits:
+        conn = connection if connection is not None else db.session
+        conn.execute(_FORGET_SQL, [{"uuid": k, "visits": n} for k, n in visits.items()])
+
+
+def _person_values(record: IoFlight) -> dict:
+    return {
+        "uuid":          record.uuid,
+        "member_number": record.member_number,
+        "full_name":     record.full_name,
+        "member_class":  record.member_class,
+        "entry_date":    record.entry_date,
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_io_person_after_flush(session, flush_context):
+    """io_flight の追加・削除を含む flush の後、io_person に反映する"""
+    added   = [_person_values(o) for o in session.new if isinstance(o, IoFlight)]
+    removed = [o.uuid for o in session.deleted if isinstance(o, IoFlight)]
+    if added:
+        touch_io_persons(added, connection=session.connection())
+    if removed:
+        forget_io_persons(removed, connection=session.connection())
+
+
+# =========================================
+# 参照
+# =========================================
+
+# 並び順: 入山日数を最後の入山からの経過（30日単位）で割った値の大きい順
+#         （最近よく来る人が先頭。同点は最後の入山日が新しい順）
+_SUGGEST_SQL = text("""
+    SELECT full_name, uuid, member_number, member_class, last_seen, visit_count
+    FROM io_person
+    WHERE full_name ILIKE :pattern
+    ORDER BY visit_count / (1.0 + (CURRENT_DATE - last_seen) / 30.0) DESC,
+             last_seen DESC, full_name
+    LIMIT :limit
+""")
+
+
+def suggest_io_persons(q: str, limit: int = 20):
+    """氏名の部分一致で人物を返す（最近・よく来る順）"""
+    pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    return db.session.execute(_SUGGEST_SQL, {"pattern": pattern, "limit": limit}).fetchall()
@@ -0,0 +1,530 @@
+"""
+app/routes/member_bulk.py
+会員一括インポート / エクスポート（CSV・PostgreSQL COPY）
+新規追加（2026-10-18）
+
+用途:
+    JHF/JPA 名簿・スプレッドシートからの会員移行と、全会員名簿の書き出し。
+    1人ずつ POST /api/members すると会員ごとに get_or_create が走るため、
+    CSV を COPY で一時テーブル（ステージング）に流し込み、集合演算で
+    members / member_contacts / member_flyers / member_courses に反映する。
+
+インポート:
+    POST /api/members/import    multipart: file=<CSV>  （?dry_run=1 で検証のみ）
+    flask members import <CSV> [--dry-run]
+
+    ・1行目はヘッダー（列名は IMPORT_COLUMNS。順不同・一部のみ可。member_number は必須）
+    ・member_number が既存ならその会員を更新、なければ新規登録
+    ・空欄のセルは既存値を維持（新規登録時は NULL）
+    ・日付は YYYY-MM-DD / YYYY/MM/DD / YYYY-MM（1日扱い）
+    ・uuid は新規登録時のみ使用（空欄なら採番）。既存会員の uuid は変更しない
+    ・member_type があり現在コースと異なる場合、現在コースを終了して新コースを追加
+      （開始日は course_start_date、空欄なら当日）
+    ・文字コードは UTF-8（BOM 可）/ Shift_JIS（cp932）
+    ・検証エラーの行は取り込まず、レスポンスの rejected に行番号と理由を返す
+
+エクスポート:
+    GET /api/members/export     text/csv（UTF-8 BOM 付き）
+    flask members export <CSV>
+
+    member_snapshot を COPY TO で書き出す。列はインポートと同じ（そのまま再取込可）。
+    出力は一時ファイル（8MB まではメモリ）に受けてから分割送信する。
+
+ORM を経由しないため、取込後に次を明示的に行う:
+    search_key のバックフィル / member_snapshot の再構築 /
+    ルックアップキャッシュの破棄 / member_number_seq の同期
+"""
+
+import csv
+import io
+import tempfile
+
+import click
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from sqlalchemy import text
+from app.db import db
+from app.routes.member_name_search import backfill_search_keys
+from app.routes.member_snapshot import refresh_member_snapshots
+from app.routes import member_lookup_cache
+from app.routes.member_routes import MEMBER_NUMBER_SEQ_RESYNC_SQL
+
+member_bulk_bp = Blueprint("member_bulk", __name__, cli_group="members")
+
+
+# ── 列定義（列名: 型） ────────────────────────────────────────────
+_MEMBER_IMPORT_COLS = {
+    "member_number": "text", "uuid": "text",
+    "full_name": "text", "furigana": "text", "gender": "text", "blood_type": "text",
+    "birthday": "date", "weight": "text", "guardian_name": "text", "relationship": "text",
+    "application_date": "date", "agreement_date": "date", "signature_name": "text",
+    "course_find": "text", "member_class": "text", "member_status": "text",
+    "confirmed_at": "date", "contract": "bool", "is_leader": "bool",
+    "instructor_role": "text", "payment_confirmed": "bool", "from_experience": "bool",
+    "exp_resv_no": "text",
+}
+_CONTACT_IMPORT_COLS = {
+    "zip_code": "text", "address": "text", "mobile_phone": "text", "home_phone": "text",
+    "email": "text", "company_name": "text", "company_phone": "text",
+    "emergency_name": "text", "emergency_phone": "text", "medical_history": "text",
+}
+_FLYER_IMPORT_COLS = {
+    "organization": "text", "reg_no": "text", "reglimit_date": "date",
+    "next_reglimit_date": "date", "license": "text", "repack_date": "date",
+    "glider_name": "text", "glider_color": "text", "home_area": "text",
+    "experience": "text", "leader": "text", "visitor_fee": "text",
+}
+_COURSE_IMPORT_COLS = {
+    "member_type": "text", "course_name": "text", "course_fee": "text",
+    "course_start_date": "date",
+}
+
+IMPORT_COLUMNS = {
+    **_MEMBER_IMPORT_COLS, **_CONTACT_IMPORT_COLS,
+    **_FLYER_IMPORT_COLS, **_COURSE_IMPORT_COLS,
+}
+
+_MEMBER_STATUSES = ("pending", "active", "visitor", "renewal_waiting")
+_TRUE_WORDS  = ("1", "true", "t", "yes", "y", "on", "○")
+_FALSE_WORDS = ("0", "false", "f", "no", "n", "off", "×")
+
+_STAGE = "member_import_stage"
+
+
+class CsvImportError(ValueError):
+    """CSV 自体を受け付けられない場合（ヘッダー不正など）"""
+
+
+# =========================================
+# SQL ヘルパー
+# =========================================
+
+def _v(col: str) -> str:
+    """ステージング列の値（空白除去・空欄は NULL・型変換済み）の SQL 式"""
+    raw = f"NULLIF(btrim(s.{col}), '')"
+    kind = IMPORT_COLUMNS[col]
+    if kind == "date":
+        return f"pg_temp.member_import_date({raw})"
+    if kind == "bool":
+        return f"(lower({raw}) IN ({', '.join(repr(w) for w in _TRUE_WORDS)}))"
+    return raw
+
+
+def _set_clause(table_cols, present, target):
+    """ON CONFLICT 更新句。CSV にある列のみ・空欄は既存値を維持"""
+    return ", ".join(
+        f"{c} = COALESCE(EXCLUDED.{c}, {target}.{c})" for c in table_cols if c in present
+    )
+
+
+def _prepare_stage(columns) -> None:
+    """ステージング用の一時テーブルと日付変換関数を作る（commit / rollback で消える）"""
+    db.session.execute(text("""
+        CREATE OR REPLACE FUNCTION pg_temp.member_import_date(v text) RETURNS date
+        LANGUAGE plpgsql IMMUTABLE AS $$
+        BEGIN
+            v := replace(v, '/', '-');
+            IF v ~ '^[0-9]{4}-[0-9]{1,2}$' THEN   -- YYYY-MM（リパック日など）は1日扱い
+                v := v || '-01';
+            END IF;
+            RETURN v::date;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END $$
+    """))
+    cols_sql = ", ".join(f"{c} text" for c in columns)
+    db.session.execute(text(f"""
+        CREATE TEMP TABLE {_STAGE} (
+            row_no    bigserial,
+            {cols_sql},
+            member_id integer,
+            is_new    boolean,
+            reason    text
+        ) ON COMMIT DROP
+    """))
+
+
+def _copy_into_stage(columns, csv_text: str) -> None:
+    """CSV テキストを COPY FROM STDIN でステージングに流し込む"""
+    cur = db.session.connection().connection.cursor()
+    cur.copy_expert(
+        f"COPY {_STAGE} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, HEADER true)",
+        io.StringIO(csv_text),
+    )
+
+
+def _reject(reason_sql: str, condition: str, params=None) -> None:
+    db.session.execute(text(f"""
+        UPDATE {_STAGE} s SET reason = {reason_sql}
+        WHERE s.reason IS NULL AND ({condition})
+    """), params or {})
+
+
+def _validate(columns) -> None:
+    """検証エラーの行に reason を付ける（最初に見つかった理由のみ）"""
+    _reject("'member_number が空です'", "NULLIF(btrim(s.member_number), '') IS NULL")
+
+    _reject("'member_number がファイル内で重複しています'", f"""
+        btrim(s.member_number) IN (
+            SELECT btrim(member_number) FROM {_STAGE}
+            GROUP BY btrim(member_number) HAVING count(*) > 1
+        )
+    """)
+
+    for col in columns:
+        kind = IMPORT_COLUMNS[col]
+        raw  = f"NULLIF(btrim(s.{col}), '')"
+        if kind == "date":
+            _reject(f"'日付の形式が不正です: {col}'",
+                    f"{raw} IS NOT NULL AND pg_temp.member_import_date({raw}) IS NULL")
+        elif kind == "bool":
+            words = ", ".join(repr(w) for w in _TRUE_WORDS + _FALSE_WORDS)
+            _reject(f"'真偽値が不正です: {col}（1/0・true/false）'",
+                    f"{raw} IS NOT NULL AND lower({raw}) NOT IN ({words})")
+
+    if "member_status" in columns:
+        _reject("'member_status が不正です'",
+                "NULLIF(btrim(s.member_status), '') IS NOT NULL "
+                "AND btrim(s.member_status) <> ALL(:statuses)",
+                {"statuses": list(_MEMBER_STATUSES)})
+
+    if "uuid" in columns:
+        _reject("'uuid の形式が不正です'",
+                "NULLIF(btrim(s.uuid), '') IS NOT NULL AND btrim(s.uuid) !~* "
+                "'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$'")
+        _reject("'uuid がファイル内で重複しています'", f"""
+            lower(NULLIF(btrim(s.uuid), '')) IN (
+                SELECT lower(btrim(uuid)) FROM {_STAGE}
+                WHERE NULLIF(btrim(uuid), '') IS NOT NULL
+                GROUP BY lower(btrim(uuid)) HAVING count(*) > 1
+            )
+        """)
+        _reject("'uuid が他の会員で使用されています'", """
+            NULLIF(btrim(s.uuid), '') IS NOT NULL AND EXISTS (
+                SELECT 1 FROM members m
+                WHERE m.uuid = lower(btrim(s.uuid))
+                  AND m.member_number <> btrim(s.member_number)
+            )
+        """)
+
+    # 新規登録には氏名が必要
+    name_missing = ("NULLIF(btrim(s.full_name), '') IS NULL"
+                    if "full_name" in columns else "true")
+    _reject("'新規会員の full_name が空です'", f"""
+        {name_missing} AND NOT EXISTS (
+            SELECT 1 FROM members m WHERE m.member_number = btrim(s.member_number)
+        )
+    """)
+
+
+def _apply(columns) -> dict:
+    """検証済みの行を各テーブルに反映し、件数を返す"""
+    present = set(columns)
+
+    # ── members ──────────────────────────────────────────────────
+    member_cols = [c for c in _MEMBER_IMPORT_COLS if c in present and c not in ("member_number", "uuid")]
+    insert_cols = ["member_number", "uuid", "member_status", "contract", "is_leader",
+                   "payment_confirmed", "from_experience", "created_at"]
+    insert_vals = [
+        "btrim(s.member_number)",
+        "COALESCE(lower(" + _v("uuid") + "), gen_random_uuid()::text)" if "uuid" in present
+        else "gen_random_uuid()::text",
+        f"COALESCE({_v('member_status')}, 'pending')" if "member_status" in present else "'pending'",
+    ]
+    for flag in ("contract", "is_leader", "payment_confirmed", "from_experience"):
+        insert_vals.append(f"COALESCE({_v(flag)}, false)" if flag in present else "false")
+    insert_vals.append("now()")
+    for c in member_cols:
+        if c in insert_cols:
+            continue
+        insert_cols.append(c)
+        insert_vals.append(_v(c))
+
+    # 既存会員の判定（更新前に記録）
+    db.session.execute(text(f"""
+        UPDATE {_STAGE} s SET member_id = m.id, is_new = false
+        FROM members m
+        WHERE s.reason IS NULL AND m.member_number = btrim(s.member_number)
+    """))
+
+    # 真偽値の空欄は既存値を維持するため、更新時は NULL を渡す
+    def _update_val(c):
+        if IMPORT_COLUMNS[c] == "bool":
+            return f"CASE WHEN NULLIF(btrim(s.{c}), '') IS NULL THEN NULL ELSE {_v(c)} END"
+        return _v(c)
+
+    if member_cols:
+        db.session.execute(text(f"""
+            UPDATE members m SET
+                {", ".join(f"{c} = COALESCE({_update_val(c)}, m.{c})" for c in member_cols)},
+                search_key = NULL,
+                updated_at = now()
+            FROM {_STAGE} s
+            WHERE s.reason IS NULL AND s.member_id = m.id
+        """))
+
+    db.session.execute(text(f"""
+        INSERT INTO members ({", ".join(insert_cols)})
+        SELECT {", ".join(insert_vals)}
+        FROM {_STAGE} s
+        WHERE s.reason IS NULL AND s.member_id IS NULL
+    """))
+    db.session.execute(text(f"""
+        UPDATE {_STAGE} s SET member_id = m.id, is_new = true
+        FROM members m
+        WHERE s.reason IS NULL AND s.member_id IS NULL
+          AND m.member_number = btrim(s.member_number)
+    """))
+
+    # ── member_contacts / member_flyers（1会員1行） ─────────────────
+    for table, table_cols in (("member_contacts", _CONTACT_IMPORT_COLS),
+                              ("member_flyers",   _FLYER_IMPORT_COLS)):
+        cols = [c for c in table_cols if c in present]
+        if not cols:
+            continue
+        db.session.execute(text(f"""
+            INSERT INTO {table} (member_id, {", ".join(cols)}, updated_at)
+            SELECT s.member_id, {", ".join(_v(c) for c in cols)}, now()
+            FROM {_STAGE} s
+            WHERE s.reason IS NULL
+              AND ({" OR ".join(f"NULLIF(btrim(s.{c}), '') IS NOT NULL" for c in cols)})
+            ON CONFLICT (member_id) DO UPDATE SET
+                {_set_clause(table_cols, present, table)},
+                updated_at = now()
+        """))
+
+    # ── member_courses（現在コースと異なる場合のみ切り替え） ─────────
+    courses_started = 0
+    if "member_type" in present:
+        start = f"COALESCE({_v('course_start_date')}, CURRENT_DATE)" \
+            if "course_start_date" in present else "CURRENT_DATE"
+        name  = _v("course_name") if "course_name" in present else "NULL"
+        fee   = _v("course_fee")  if "course_fee"  in present else "NULL"
+        changed = f"""
+            s.reason IS NULL AND {_v('member_type')} IS NOT NULL
+            AND NOT EXISTS (
+                SELECT 1 FROM member_courses cur
+                WHERE cur.member_id = s.member_id
+                  AND cur.status = 'active' AND cur.end_date IS NULL
+                  AND cur.member_type = {_v('member_type')}
+                  AND cur.course_name IS NOT DISTINCT FROM {name}
+            )
+        """
+        db.session.execute(text(f"""
+            UPDATE member_courses mc
+            SET status = 'expired', end_date = {start}, updated_at = now()
+            FROM {_STAGE} s
+            WHERE mc.member_id = s.member_id
+              AND mc.status = 'active' AND mc.end_date IS NULL
+              AND {changed}
+        """))
+        courses_started = db.session.execute(text(f"""
+            INSERT INTO member_courses
+                (member_id, member_type, course_name, course_fee, start_date,
+                 status, confirmed_by, created_at)
+            SELECT s.member_id, {_v('member_type')}, {name}, {fee}, {start},
+                   'active', 'import', now()
+            FROM {_STAGE} s
+            WHERE {changed}
+        """)).rowcount
+
+    counts = db.session.execute(text(f"""
+        SELECT count(*) FILTER (WHERE reason IS NULL AND is_new)      AS inserted,
+               count(*) FILTER (WHERE reason IS NULL AND NOT is_new)  AS updated,
+               count(*) FILTER (WHERE reason IS NOT NULL)             AS rejected
+        FROM {_STAGE}
+    """)).one()
+    return {
+        "inserted":        counts.inserted,
+        "updated":         counts.updated,
+        "rejected_count":  counts.rejected,
+        "courses_started": courses_started,
+    }
+
+
+def _read_header(csv_text: str) -> list:
+    """ヘッダー行を検証して列名リストを返す"""
+    header = next(csv.reader(io.StringIO(csv_text)), None)
+    if not header:
+        raise CsvImportError("CSV が空です")
+    columns = [h.strip() for h in header]
+    unknown = [c for c in columns if c not in IMPORT_COLUMNS]
+    if unknown:
+        raise CsvImportError(f"不明な列があります: {', '.join(unknown)}")
+    if len(set(columns)) != len(columns):
+        raise CsvImportError("列名が重複しています")
+    if "member_number" not in columns:
+        raise CsvImportError("member_number 列は必須です")
+    return columns
+
+
+def decode_csv(data: bytes) -> str:
+    """UTF-8（BOM 可）→ Shift_JIS（cp932）の順でデコードする"""
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("cp932")
+
+
+def import_members_csv(csv_text: str, dry_run: bool = False) -> dict:
+    """
+    CSV テキストを取り込み、結果レポートを返す。
+    dry_run=True の場合は検証のみ行い、すべてロールバックする。
+    ヘッダー不正時は CsvImportError を送出する。
+    """
+    columns = _read_header(csv_text)
+    try:
+        _prepare_stage(columns)
+        _copy_into_stage(columns, csv_text)
+        _validate(columns)
+
+        rejected = [
+            {"row": r.row_no, "member_number": r.member_number, "reason": r.reason}
+            for r in db.session.execute(text(
+                f"SELECT row_no, member_number, reason FROM {_STAGE} "
+                f"WHERE reason IS NOT NULL ORDER BY row_no"
+            ))
+        ]
+
+        if dry_run:
+            total = db.session.execute(text(f"SELECT count(*) FROM {_STAGE}")).scalar()
+            db.session.rollback()
+            return {"dry_run": True, "total": total,
+                    "valid": total - len(rejected), "rejected": rejected}
+
+        report = _apply(columns)
+        member_ids = [r[0] for r in db.session.execute(text(
+            f"SELECT member_id FROM {_STAGE} WHERE reason IS NULL"
+        ))]
+
+        # ORM 外で書き込んだため、派生データを明示的に更新する
+        refresh_member_snapshots(member_ids)
+        db.session.execute(text(MEMBER_NUMBER_SEQ_RESYNC_SQL))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    backfill_search_keys()
+    member_lookup_cache.invalidate(member_ids)
+
+    report["rejected"] = rejected
+    return report
+
+
+# =========================================
+# エクスポート
+# =========================================
+
+def _export_sql() -> str:
+    cols = ", ".join(IMPORT_COLUMNS)
+    return (f"COPY (SELECT {cols} FROM member_snapshot ORDER BY member_number) "
+            f"TO STDOUT WITH (FORMAT csv, HEADER true)")
+
+
+def export_members_csv(fileobj) -> None:
+    """全会員を CSV（インポートと同じ列）で fileobj（バイナリ）に書き出す"""
+    cur = db.session.connection().connection.cursor()
+    cur.copy_expert(_export_sql(), fileobj)
+    db.session.commit()
+
+
+# =========================================
+# API
+# =========================================
+
+# POST /api/members/import
+# multipart/form-data: file=<CSV>
+# クエリ: dry_run=1 で検証のみ
+# レスポンス JSON:
+#   { "inserted": n, "updated": n, "rejected_count": n, "courses_started": n,
+#     "rejected": [ { "row": 3, "member_number": "00012", "reason": "..." }, ... ] }
+@member_bulk_bp.route("/api/members/import", methods=["POST"])
+def api_import_members():
+    upload = request.files.get("file")
+    if not upload:
+        return jsonify({"error": "file が指定されていません"}), 400
+
+    try:
+        csv_text = decode_csv(upload.read())
+    except UnicodeDecodeError:
+        return jsonify({"error": "文字コードを判別できません（UTF-8 / Shift_JIS）"}), 400
+
+    try:
+        report = import_members_csv(csv_text, dry_run=request.args.get("dry_run") == "1")
+    except CsvImportError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": f"インポートに失敗しました: {str(e)}"}), 500
+
+    return jsonify(report)
+
+
+# GET /api/members/export
+# 全会員の CSV（UTF-8 BOM 付き・インポートと同じ列）を返す
+_EXPORT_CHUNK = 64 * 1024
+
+
+@member_bulk_bp.route("/api/members/export", methods=["GET"])
+def api_export_members():
+    spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024, mode="w+b")
+    try:
+        export_members_csv(spool)
+    except Exception as e:
+        spool.close()
+        db.session.rollback()
+        return jsonify({"error": f"エクスポートに失敗しました: {str(e)}"}), 500
+    spool.seek(0)
+
+    def generate():
+        try:
+            yield "\ufeff".encode("utf-8")   # Excel 用 BOM
+            while True:
+                chunk = spool.read(_EXPORT_CHUNK)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            spool.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment; filename=members.csv"},
+    )
+
+
+# =========================================
+# CLI（flask members import / export）
+# =========================================
+
+@member_bulk_bp.cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--dry-run", is_flag=True, help="検証のみ行い、取り込まない")
+def cli_import(path, dry_run):
+    """CSV から会員を一括登録・更新する"""
+    with open(path, "rb") as f:
+        csv_text = decode_csv(f.read())
+    try:
+        report = import_members_csv(csv_text, dry_run=dry_run)
+    except CsvImportError as e:
+        raise click.ClickException(str(e))
+
+    for r in report["rejected"]:
+        click.echo(f"  行{r['row']} [{r['member_number'] or '-'}] {r['reason']}")
+    if dry_run:
+        click.echo(f"検証: 全{report['total']}行 / 有効 {report['valid']} / 除外 {len(report['rejected'])}")
+    else:
+        click.echo(
+            f"新規 {report['inserted']} / 更新 {report['updated']} / "
+            f"除外 {report['rejected_count']} / コース切替 {report['courses_started']}"
+        )
+
+
+@member_bulk_bp.cli.command("export")
+@click.argument("path", type=click.Path(dir_okay=False, writable=True))
+def cli_export(path):
+    """全会員を CSV に書き出す"""
+    with open(path, "wb") as f:
+        f.write("\ufeff".encode("utf-8"))
+        export_members_csv(f)
+    click.echo(f"書き出しました: {path}")
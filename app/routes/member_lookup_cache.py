@@ -0,0 +1,168 @@
+"""
+app/routes/member_lookup_cache.py
+会員ルックアップキャッシュ（QRスキャン・会員番号入力の高速化）
+新規追加（2026-10-18）
+
+用途:
+    朝の受付集中時、/api/io/lookup・/api/cont/lookup・/api/work/lookup は
+    同じ UUID / 会員番号を何度も引く。member_snapshot の行をプロセス内に
+    LRU + TTL で保持し、2回目以降のスキャンは dict 参照で返す。
+
+キー:
+    uuid / member_number のどちらでも引ける（内部では member_id 単位で保持）
+
+無効化:
+    ・members / member_contacts / member_flyers / member_courses の flush 時
+      （member_snapshot.touched_member_ids と同じ判定）に該当会員を破棄し、
+      commit 後にもう一度破棄する（flush〜commit 間に旧データを再取得した場合の対策）
+    ・gunicorn の他ワーカーでの更新は届かないため、TTL（既定60秒）で上限を設ける
+
+統計:
+    stats() で hits / misses / size を返す（GET /api/members/lookup_cache）
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.routes.member_snapshot import get_snapshot, touched_member_ids
+
+
+_CACHE_MAX_SIZE = 2048
+_CACHE_TTL_SEC  = 60
+
+
+class _MemberLookupCache:
+    """member_id → (期限, スナップショット行) の LRU。uuid / 会員番号は索引で引く。"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl      = ttl
+        self._lock    = threading.Lock()
+        self._rows    = OrderedDict()   # member_id → (expires_at, row)
+        self._keys    = {}              # ("uuid", v) / ("member_number", v) → member_id
+        self.hits     = 0
+        self.misses   = 0
+
+    def get(self, key):
+        with self._lock:
+            member_id = self._keys.get(key)
+            entry = self._rows.get(member_id) if member_id is not None else None
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(member_id)
+                self.misses += 1
+                return None
+            self._rows.move_to_end(member_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, row) -> None:
+        with self._lock:
+            self._drop(row.member_id)
+            self._rows[row.member_id] = (time.monotonic() + self.ttl, row)
+            self._keys[("uuid", str(row.uuid))] = row.member_id
+            self._keys[("member_number", row.member_number)] = row.member_id
+            while len(self._rows) > self.max_size:
+                self._drop(next(iter(self._rows)))
+
+    def invalidate(self, member_ids) -> None:
+        with self._lock:
+            for member_id in member_ids:
+                self._drop(member_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+            self._keys.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits":     self.hits,
+                "misses":   self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else None,
+                "size":     len(self._rows),
+                "max_size": self.max_size,
+                "ttl_sec":  self.ttl,
+            }
+
+    def _drop(self, member_id) -> None:
+        entry = self._rows.pop(member_id, None)
+        if entry is None:
+            return
+        row = entry[1]
+        for key in (("uuid", str(row.uuid)), ("member_number", row.member_number)):
+            if self._keys.get(key) == member_id:
+                del self._keys[key]
+
+
+_cache = _MemberLookupCache(_CACHE_MAX_SIZE, _CACHE_TTL_SEC)
+
+
+# =========================================
+# 参照
+# =========================================
+
+def lookup_member(uuid=None, member_number=None):
+    """
+    uuid または member_number で member_snapshot の行を返す（キャッシュ経由）。
+    見つからなければ None（未登録はキャッシュしない）。
+    """
+    if uuid is not None:
+        key, kwargs = ("uuid", str(uuid)), {"uuid": uuid}
+    elif member_number is not None:
+        key, kwargs = ("member_number", member_number), {"member_number": member_number}
+    else:
+        return None
+
+    row = _cache.get(key)
+    if row is None:
+        row = get_snapshot(**kwargs)
+        if row is not None:
+            _cache.put(row)
+    return row
+
+
+def invalidate(member_ids) -> None:
+    """指定会員のキャッシュを破棄する"""
+    _cache.invalidate(member_ids)
+
+
+def clear() -> None:
+    _cache.clear()
+
+
+def stats() -> dict:
+    return _cache.stats()
+
+
+# =========================================
+# 無効化フック
+# =========================================
+
+_PENDING_KEY = "member_lookup_cache_ids"
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_after_flush(session, flush_context):
+    upsert_ids, delete_ids = touched_member_ids(session)
+    ids = upsert_ids | delete_ids
+    if ids:
+        _cache.invalidate(ids)
+        session.info.setdefault(_PENDING_KEY, set()).update(ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    ids = session.info.pop(_PENDING_KEY, None)
+    if ids:
+        _cache.invalidate(ids)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
@@ -14,7 +14,6 @@ member_routes.py から分離（E: ファイル分割）
 """
 
 from flask import Blueprint, request, jsonify
-from app.db import db
 from app.models.member import Member
 from app.models.member_application import MemberApplication
 from app.models.member_course   import MemberCourse
@@ -26,7 +25,7 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.header import Header
-from sqlalchemy import text
+from app.routes.config_cache import config_value, config_values
 
 member_mail_bp = Blueprint("member_mail", __name__)
 
@@ -89,17 +88,11 @@ def _do_send_mail(from_email: str, to_email: str, subject: str, body: str) -> No
 
 def _get_mail_config_values(item_name):
     """config_master カテゴリ「メール関連」から item_name に一致する
-    config_values を sort_order 順で返す"""
-    rows = db.session.execute(text("""
-        SELECT cv.value, cv.label, cv.sort_order
-        FROM config_master cm
-        JOIN config_values cv ON cv.master_id = cm.id
-        WHERE cm.category = 'メール関連'
-          AND cm.item_name = :item_name
-          AND cv.is_active = TRUE
-        ORDER BY cv.sort_order, cv.id
-    """), {"item_name": item_name}).fetchall()
-    return [dict(r._mapping) for r in rows]
+    config_values を sort_order 順で返す（設定キャッシュ経由）"""
+    return [
+        {"value": v.value, "label": v.label, "sort_order": v.sort_order}
+        for v in config_values("メール関連", item_name, active_master=False)
+    ]
 
 
 def _build_mail_preview(member_id):
@@ -327,19 +320,7 @@ def get_course_fee():
     if not course_name:
         return jsonify({"error": "course パラメータが必要です"}), 400
 
-    row = db.session.execute(text("""
-        SELECT cv.value
-        FROM config_master cm
-        JOIN config_values cv ON cv.master_id = cm.id
-        WHERE cm.item_name = :item_name
-          AND cv.is_active = TRUE
-        ORDER BY cv.sort_order, cv.id
-        LIMIT 1
-    """), {"item_name": course_name}).fetchone()
-
-    if not row:
-        return jsonify({"fee": None, "course": course_name})
-
-    return jsonify({"fee": row[0], "course": course_name})
+    fee = config_value(None, course_name, active_master=False)
+    return jsonify({"fee": fee, "course": course_name})
 
 
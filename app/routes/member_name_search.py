@@ -0,0 +1,118 @@
+"""
+app/routes/member_name_search.py
+会員 氏名検索（pg_trgm + 正規化検索キー）
+新規追加（2026-10-18）
+
+用途:
+    氏名検索 API（会員管理・入下山・請負・ツアー申込）で共通に使う。
+    これまで各所で Member.full_name.ilike('%name%') を直接書いていたため、
+    ・全件シーケンシャルスキャン
+    ・ふりがな / 全角半角 / 空白の揺れに未対応
+    だった。
+
+検索キー（members.search_key）:
+    normalize_name(full_name) + " " + normalize_name(furigana)
+      - NFKC 正規化（全角英数→半角、半角カナ→全角カナ）
+      - 空白除去・小文字化
+      - カタカナ → ひらがな
+    Member の INSERT / UPDATE 時に before_insert / before_update で自動更新する。
+
+インデックス:
+    CREATE INDEX ix_members_search_key_trgm ON members USING gin (search_key gin_trgm_ops)
+    部分一致（LIKE '%key%'）と word_similarity（<% 演算子）の両方で使われる。
+
+使い方:
+    q = Member.query.filter(Member.member_status.in_(["active", "visitor"]))
+    members = filter_by_name(q, name).limit(10).all()   # 類似度の高い順
+"""
+
+import unicodedata
+
+from sqlalchemy import event, func, literal, or_, text
+from app.db import db
+from app.models.member import Member
+
+
+# 起動時マイグレーション（member_routes の record_once から実行）
+NAME_SEARCH_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "ALTER TABLE members ADD COLUMN IF NOT EXISTS search_key TEXT",
+    "CREATE INDEX IF NOT EXISTS ix_members_search_key_trgm "
+    "ON members USING gin (search_key gin_trgm_ops)",
+]
+
+_BACKFILL_BATCH = 500
+
+
+# =========================================
+# 正規化
+# =========================================
+
+def normalize_name(value) -> str:
+    """氏名・ふりがなを検索用に正規化する（幅統一・空白除去・カナ→ひらがな）"""
+    if not value:
+        return ""
+    s = unicodedata.normalize("NFKC", str(value))
+    s = "".join(ch for ch in s if not ch.isspace()).lower()
+    # カタカナ（ァ〜ヶ）→ ひらがな（ぁ〜ゖ）
+    return "".join(chr(ord(ch) - 0x60) if "ァ" <= ch <= "ヶ" else ch for ch in s)
+
+
+def build_search_key(full_name, furigana) -> str:
+    """members.search_key の値を組み立てる"""
+    return " ".join(k for k in (normalize_name(full_name), normalize_name(furigana)) if k)
+
+
+@event.listens_for(Member, "before_insert")
+@event.listens_for(Member, "before_update")
+def _refresh_search_key(mapper, connection, target):
+    target.search_key = build_search_key(target.full_name, target.furigana)
+
+
+# =========================================
+# 検索
+# =========================================
+
+def filter_by_name(query, name: str):
+    """
+    Member の Query に氏名検索条件と類似度順の並びを付けて返す。
+    部分一致（正規化キー）または word_similarity が閾値以上の会員がヒットする。
+    """
+    key = normalize_name(name)
+    if not key:
+        return query.filter(db.false())
+
+    similarity = func.word_similarity(key, Member.search_key)
+    return (
+        query
+        .filter(or_(
+            Member.search_key.contains(key, autoescape=True),
+            literal(key).op("<%")(Member.search_key),
+        ))
+        .order_by(similarity.desc(), Member.full_name)
+    )
+
+
+# =========================================
+# 初回バックフィル
+# =========================================
+
+def backfill_search_keys() -> int:
+    """search_key が未設定の会員を一括で埋める。処理件数を返す。"""
+    total = 0
+    while True:
+        rows = db.session.execute(text("""
+            SELECT id, full_name, furigana FROM members
+            WHERE search_key IS NULL
+            ORDER BY id
+            LIMIT :n
+        """), {"n": _BACKFILL_BATCH}).fetchall()
+        if not rows:
+            break
+        db.session.execute(
+            text("UPDATE members SET search_key = :key WHERE id = :id"),
+            [{"id": r.id, "key": build_search_key(r.full_name, r.furigana)} for r in rows],
+        )
+        db.session.commit()
+        total += len(rows)
+    return total
@@ -0,0 +1,114 @@
+"""
+app/routes/member_projection.py
+会員一覧用 射影クエリ（members + member_flyers + 現在コース）
+新規追加（2026-10-18）
+
+用途:
+    一覧系 API（GET /api/members・スタッフ管理ダッシュボード等）で
+    会員ごとに m.flyer / MemberCourse.get_current() を辿ると
+    会員数ぶん SELECT が発行される（N+1）。
+    ここでは members に member_flyers / member_contacts / 現在有効なコースを
+    LEFT JOIN した
+    「カラムのみの行」を1クエリで返す。ORM オブジェクトは生成しない。
+
+使い方:
+    q = member_projection_query()
+    q = q.filter(Member.member_status == 'active')   # Member / MemberFlyer のカラムで絞り込み可
+    rows = q.order_by(Member.id.desc()).all()
+    items = [member_row_to_list_dict(r) for r in rows]
+
+行のカラム名:
+    members         : id, uuid, member_number, full_name, member_status,
+                      instructor_role, application_date, confirmed_at
+    member_flyers   : license, glider_name, organization, reg_no,
+                      reglimit_date, repack_date
+    member_contacts : email, mobile_phone
+    member_courses  : member_type, course_name, course_fee, course_start_date
+"""
+
+from sqlalchemy import select
+from app.db import db
+from app.models.member import Member
+from app.models.member_course  import MemberCourse
+from app.models.member_contact import MemberContact
+from app.models.member_flyer   import MemberFlyer
+from app.serializers import Serializer, as_str, iso
+
+
+def current_course_subquery():
+    """
+    会員ごとの現在有効コースを返すサブクエリ。
+    ux_member_courses_current（部分一意インデックス）で1会員1件が保証されるため
+    並び替え・LIMIT は不要で、members とは直接 JOIN できる。
+    """
+    return (
+        select(
+            MemberCourse.member_id,
+            MemberCourse.member_type,
+            MemberCourse.course_name,
+            MemberCourse.course_fee,
+            MemberCourse.start_date,
+        )
+        .where(MemberCourse.current_filter())
+        .subquery("current_course")
+    )
+
+
+def member_projection_query():
+    """
+    members / member_flyers / member_contacts / 現在コース を1クエリで結合した
+    カラムのみの Query を返す。絞り込み・並び替えは呼び出し側で行う。
+    """
+    cur = current_course_subquery()
+    return (
+        db.session.query(
+            # ── members ──
+            Member.id,
+            Member.uuid,
+            Member.member_number,
+            Member.full_name,
+            Member.member_status,
+            Member.instructor_role,
+            Member.application_date,
+            Member.confirmed_at,
+            # ── member_flyers ──
+            MemberFlyer.license,
+            MemberFlyer.glider_name,
+            MemberFlyer.organization,
+            MemberFlyer.reg_no,
+            MemberFlyer.reglimit_date,
+            MemberFlyer.repack_date,
+            # ── member_contacts ──
+            MemberContact.email,
+            MemberContact.mobile_phone,
+            # ── member_courses（現在有効） ──
+            cur.c.member_type,
+            cur.c.course_name,
+            cur.c.course_fee,
+            cur.c.start_date.label("course_start_date"),
+        )
+        .select_from(Member)
+        .outerjoin(MemberFlyer,   MemberFlyer.member_id   == Member.id)
+        .outerjoin(MemberContact, MemberContact.member_id == Member.id)
+        .outerjoin(cur, cur.c.member_id == Member.id)
+    )
+
+
+# GET /api/members（一覧）専用の軽量 dict。
+# renderList()・renderQrBulkList() が使うフィールドのみ返す。
+# uuid / member_status / reg_no は QRカード一括作成ビューで必要。
+member_row_to_list_dict = Serializer({
+    "id":              None,
+    "uuid":            as_str,
+    "member_number":   None,
+    "full_name":       None,
+    "member_status":   None,
+    "member_type":     None,
+    "license":         None,
+    "glider_name":     None,
+    "organization":    None,
+    "reg_no":          None,
+    "reglimit_date":   iso,
+    "repack_date":     iso,
+    "instructor_role": None,
+})
@@ -1,7 +1,34 @@
 """
 app/routes/member_routes.py
 会員管理 Flask ルート & REST API
-DB構成V2 対応（2026-03-23）改定５→改定９（2026/04/11）
+DB構成V2 対応（2026-03-23）改定５→改定１２（2026/10/18）
+
+改定１２変更点:
+  1. GET /api/members を member_projection の射影クエリに変更
+       members + member_flyers + 現在コースを1クエリで結合し、
+       会員ごとの m.flyer（backref）参照による N+1 を解消
+  2. _member_to_list_dict() を member_projection.member_row_to_list_dict() に移動
+  3. GET /api/members に keyset ページング（limit / after）と
+       ストリーミング出力（stream=1）を追加。既存の絞り込みと併用可
+  4. lookup_by_name() を member_name_search.filter_by_name() に変更
+       （pg_trgm インデックス・ふりがな/全角半角対応・類似度順）
+  5. _generate_member_number() をシーケンス（member_number_seq）採番に変更
+       全件走査による最大値探索を廃止。nextval で複数ワーカー間でも重複しない
+       シーケンスは起動時に既存の数字のみ会員番号の最大値へ同期する
+  6. 会員詳細 GET（id / 会員番号 / UUID）を member_snapshot の1行参照に変更
+       書き込み時のスナップショット更新は member_snapshot の after_flush で行う
+  7. 現在コースの一意性を部分一意インデックス（ux_member_courses_current）で保証
+       起動時に重複する current を最新1件に整理してからインデックスを作成
+       コース切り替え（申請承認・ビジター即時変更・手動追加）は
+       MemberCourse.start_new() に統一。update_course の一意違反は 400 を返す
+  8. GET /api/members/lookup_cache を追加（会員ルックアップキャッシュの統計）
+       破棄は DELETE /api/members/lookup_cache（GET は参照のみ）
+  9. POST /api/applications/batch を追加（申請の一括承認 / 却下）
+       承認処理本体を _approve_one() に分離し approve_application と共用
+       申請ごとに SAVEPOINT を切り、失敗した申請のみ巻き戻す
+ 10. JSON 出力を app.serializers に統一
+       member_row_to_list_dict() は事前コンパイル済み Serializer、
+       ストリーミング出力も app.json（orjson プロバイダ）でエンコード
 
 改定９変更点:
   1. _member_to_dict() に is_leader / instructor_role を追加（GETで返るように）
@@ -30,23 +57,106 @@ DB構成V2 対応（2026-03-23）改定５→改定９（2026/04/11）
        pending だけでなく最新の approved / rejected も返す。
 """
 
-from flask import Blueprint, render_template, request, jsonify, abort, send_from_directory
+from flask import Blueprint, render_template, request, jsonify, abort, send_from_directory, Response, stream_with_context, current_app
 from app.db import db
 from app.models.member import Member
 from app.models.member_application import MemberApplication
-from app.models.member_course   import MemberCourse
+from app.models.member_course   import MemberCourse, CURRENT_NOT_LOADED
 from app.models.member_contact  import MemberContact
 from app.models.member_flyer    import MemberFlyer
+from app.routes.member_projection import member_projection_query, member_row_to_list_dict
+from app.routes.member_name_search import NAME_SEARCH_DDL, backfill_search_keys, filter_by_name
+from app.routes.member_snapshot import SNAPSHOT_DDL, refresh_member_snapshots, get_snapshot, snapshot_to_dict
+from app.routes import member_lookup_cache
 from datetime import datetime, date, timedelta
 import uuid
-import json
 import os
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 
 member_bp = Blueprint("member", __name__)
 
 
+# =========================================
+# 起動時マイグレーション
+# =========================================
+
+# 会員番号シーケンス
+#   次の払い出し値を「発行済み番号・既存の数字のみ会員番号」の最大値+1 に合わせる（値は戻さない）
+#   手入力で大きな番号が登録されていても、再起動時に追い越して重複を防ぐ
+#   MEMBER_NUMBER_SEQ_RESYNC_SQL は一括インポート（member_bulk）の後にも実行する
+MEMBER_NUMBER_SEQ_RESYNC_SQL = r"""
+    SELECT setval('member_number_seq', GREATEST(
+        (SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END
+           FROM member_number_seq),
+        COALESCE((
+            SELECT MAX(member_number::bigint) FROM members
+            WHERE member_number ~ '^\d{1,18}$'
+        ), 0)
+    ) + 1, false)
+"""
+
+_MEMBER_NUMBER_SEQ_DDL = [
+    "CREATE SEQUENCE IF NOT EXISTS member_number_seq",
+    MEMBER_NUMBER_SEQ_RESYNC_SQL,
+]
+
+
+# 現在コース一意化
+#   既存データで current が複数ある会員は、最新（start_date 降順・id 降順）の1件を残し
+#   それ以外を最新コースの開始日で終了させてから部分一意インデックスを作成する
+_CURRENT_COURSE_DDL = [
+    """
+    UPDATE member_courses mc
+    SET status = 'expired', end_date = r.keep_start, updated_at = now()
+    FROM (
+        SELECT id,
+               row_number()             OVER w AS rn,
+               first_value(start_date)  OVER w AS keep_start
+        FROM member_courses
+        WHERE status = 'active' AND end_date IS NULL
+        WINDOW w AS (PARTITION BY member_id ORDER BY start_date DESC, id DESC)
+    ) r
+    WHERE mc.id = r.id AND r.rn > 1
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_member_courses_current "
+    "ON member_courses (member_id) WHERE status = 'active' AND end_date IS NULL",
+]
+
+
+@member_bp.record_once
+def _on_register(state):
+    with state.app.app_context():
+        for sql in (_MEMBER_NUMBER_SEQ_DDL + _CURRENT_COURSE_DDL + NAME_SEARCH_DDL):
+            try:
+                db.session.execute(text(sql))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+        # member_snapshot は会員の書き込み（after_flush）と参照系 API すべてが
+        # 前提にするため、作成に失敗したらエラーとして記録する
+        for sql in SNAPSHOT_DDL:
+            try:
+                db.session.execute(text(sql))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                state.app.logger.exception("[member_snapshot] DDL failed: %s", sql.splitlines()[0])
+        # 氏名検索キーの初回バックフィル（未設定の会員のみ）
+        try:
+            backfill_search_keys()
+        except Exception:
+            db.session.rollback()
+        # 会員スナップショットの全件再構築（ORM 外の変更を取り込む）
+        try:
+            refresh_member_snapshots()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            state.app.logger.exception("[member_snapshot] rebuild failed")
+
+
 # =========================================
 # ページルート
 # =========================================
@@ -119,32 +229,6 @@ def _parse_date(value, fmt="%Y-%m-%d"):
         return None
 
 
-def _member_to_list_dict(m, course=None) -> dict:
-    """
-    GET /api/members（一覧）専用の軽量 dict。
-    renderList()・renderQrBulkList() が使うフィールドのみ返す。
-    uuid / member_status / reg_no は QRカード一括作成ビューで必要。
-    """
-    def fd(d):
-        return d.isoformat() if d else None
-    f = m.flyer  # backref 経由
-    return {
-        "id":              m.id,
-        "uuid":            str(m.uuid) if m.uuid else None,
-        "member_number":   m.member_number,
-        "full_name":       m.full_name,
-        "member_status":   m.member_status,
-        "member_type":     course.member_type if course else None,
-        "license":         f.license           if f else None,
-        "glider_name":     f.glider_name       if f else None,
-        "organization":    f.organization      if f else None,
-        "reg_no":          f.reg_no            if f else None,
-        "reglimit_date":   fd(f.reglimit_date)  if f else None,
-        "repack_date":     fd(f.repack_date)    if f else None,
-        "instructor_role": m.instructor_role,
-    }
-
-
 def _member_to_dict(m: Member) -> dict:
     """
     members + member_contacts + member_flyers + member_courses（現在）
@@ -264,14 +348,14 @@ def _apply_fields_from_json(member: Member, data: dict) -> None:
     # ── member_contacts ───────────────────────────────────────────
     contact_data = {k: v for k, v in data.items() if k in _CONTACT_FIELDS}
     if contact_data:
-        contact = MemberContact.get_or_create(member.id)
+        contact = member.contact or MemberContact.get_or_create(member.id)
         contact.apply_dict(contact_data)
 
     # ── member_flyers ─────────────────────────────────────────────
     flyer_keys = set(_FLYER_STR_FIELDS) | set(_FLYER_DATE_FIELDS) | {"repack_date"}
     flyer_data = {k: v for k, v in data.items() if k in flyer_keys}
     if flyer_data:
-        flyer = MemberFlyer.get_or_create(member.id)
+        flyer = member.flyer or MemberFlyer.get_or_create(member.id)
         flyer.apply_dict(flyer_data, parse_date_fn=_parse_date)
 
 
@@ -282,24 +366,13 @@ def _apply_fields_from_json(member: Member, data: dict) -> None:
 
 def _generate_member_number() -> str:
     """
-    数字のみの会員番号の最大値+1を5桁ゼロ埋めで返す。
-    既存の4桁番号も含めて最大値を探すため、既存データへの影響なし。
+    member_number_seq から次の番号を取得し、5桁ゼロ埋めで返す。
+    nextval はトランザクション外で確定するため、同時申込でも重複しない
+    （ロールバック時は欠番になる）。
     例: 既存最大が0038 -> 次は00039
     """
-    existing = (
-        db.session.query(Member.member_number)
-        .filter(Member.member_number.op("~")(r"^\d+$"))
-        .all()
-    )
-    max_num = 0
-    for (num_str,) in existing:
-        try:
-            n = int(num_str)
-            if n > max_num:
-                max_num = n
-        except ValueError:
-            pass
-    return f"{max_num + 1:05d}"
+    n = db.session.execute(text("SELECT nextval('member_number_seq')")).scalar()
+    return f"{n:05d}"
 
 
 def _register_member():
@@ -469,9 +542,16 @@ def apply_member_cnt():
 # 管理画面用 CRUD API（JSON）
 # =========================================
 
+# GET /api/members
+# クエリ: name / member_type / glider_name / reglimit_soon=1 / repack_soon=1（絞り込み）
+#         limit=N&after=<id>  → keyset ページング
+#                               { "members": [...], "has_more": bool, "next_after": id|null }
+#         stream=1            → JSON 配列をストリーミングで返す（形式は従来と同じ）
+#         指定なし            → 従来どおり全件の JSON 配列
 @member_bp.route("/api/members", methods=["GET"])
 def list_members():
-    query = Member.query
+    # members + flyers + 現在コースを1クエリで結合（カラムのみの行）
+    query = member_projection_query()
 
     name = request.args.get("name", "").strip()
     if name:
@@ -518,44 +598,91 @@ def list_members():
         ).subquery()
         query = query.filter(Member.id.in_(flyer_ids_rp))
 
-    members = query.order_by(Member.id.desc()).all()
+    query = query.order_by(Member.id.desc())
 
-    if not members:
-        return jsonify([])
+    # ── keyset ページング：after = 前ページ最後の id（id 降順なので id < after） ──
+    after = request.args.get("after", type=int)
+    if after:
+        query = query.filter(Member.id < after)
+
+    limit = request.args.get("limit", type=int)
+    if limit:
+        limit = max(1, min(limit, _MEMBER_PAGE_MAX))
+        rows  = query.limit(limit + 1).all()   # 1件多く取得して次ページ有無を判定
+        has_more = len(rows) > limit
+        rows     = rows[:limit]
+        return jsonify({
+            "members":    [member_row_to_list_dict(r) for r in rows],
+            "has_more":   has_more,
+            "next_after": rows[-1].id if has_more else None,
+        })
 
-    # ── N+1防止：active コースを1クエリで一括取得 ──────────────────
-    member_ids = [m.id for m in members]
-    active_courses = MemberCourse.query.filter(
-        MemberCourse.member_id.in_(member_ids),
-        MemberCourse.status == 'active',
-        MemberCourse.end_date.is_(None),
-    ).all()
-    course_map = {c.member_id: c for c in active_courses}
+    # ── ストリーミング：行を読みながら JSON 配列を書き出す ──────────
+    if request.args.get("stream") == "1":
+        return Response(
+            stream_with_context(_stream_member_list(query)),
+            mimetype="application/json",
+        )
 
     # 一覧は軽量 dict のみ返す。詳細は GET /api/members/<id> で取得
-    return jsonify([_member_to_list_dict(m, course_map.get(m.id)) for m in members])
+    return jsonify([member_row_to_list_dict(r) for r in query.all()])
 
 
+# GET /api/members のページング上限・ストリーミング時のフェッチ単位
+_MEMBER_PAGE_MAX     = 500
+_MEMBER_STREAM_CHUNK = 200
+
+
+def _stream_member_list(query):
+    """射影クエリを yield_per で少しずつ読み、JSON 配列を文字列片として返すジェネレータ"""
+    yield "["
+    first = True
+    for row in query.yield_per(_MEMBER_STREAM_CHUNK):
+        if not first:
+            yield ","
+        yield current_app.json.dumps(member_row_to_list_dict(row))
+        first = False
+    yield "]"
+
+
+# GET /api/members/lookup_cache
+# 会員ルックアップキャッシュ（QRスキャン用）の統計をこのワーカー分だけ返す。
+@member_bp.route("/api/members/lookup_cache", methods=["GET"])
+def lookup_cache_stats():
+    return jsonify(member_lookup_cache.stats())
+
+
+# DELETE /api/members/lookup_cache
+# このワーカーの会員ルックアップキャッシュを破棄する（統計はリセットしない）。
+@member_bp.route("/api/members/lookup_cache", methods=["DELETE"])
+def clear_lookup_cache():
+    member_lookup_cache.clear()
+    return jsonify(member_lookup_cache.stats())
+
+
+# 会員詳細（member_snapshot の1行参照）
 @member_bp.route("/api/members/<int:member_id>", methods=["GET"])
 def get_member(member_id):
-    member = Member.query.get_or_404(member_id)
-    return jsonify(_member_to_dict(member))
+    row = get_snapshot(member_id=member_id)
+    if not row:
+        abort(404)
+    return jsonify(snapshot_to_dict(row))
 
 
 @member_bp.route("/api/members/by-member-number/<string:member_number>", methods=["GET"])
 def get_member_by_number(member_number):
-    member = Member.query.filter_by(member_number=member_number).first()
-    if not member:
+    row = get_snapshot(member_number=member_number)
+    if not row:
         abort(404, description="会員番号が見つかりません")
-    return jsonify(_member_to_dict(member))
+    return jsonify(snapshot_to_dict(row))
 
 
 @member_bp.route("/api/members/by-uuid/<string:member_uuid>", methods=["GET"])
 def get_member_by_uuid(member_uuid):
-    member = Member.query.filter_by(uuid=member_uuid).first()
-    if not member:
+    row = get_snapshot(uuid=member_uuid)
+    if not row:
         abort(404, description="QRコード（UUID）が見つかりません")
-    return jsonify(_member_to_dict(member))
+    return jsonify(snapshot_to_dict(row))
 
 
 @member_bp.route("/api/members", methods=["POST"])
@@ -687,22 +814,15 @@ def apply_update_member(member_id):
 
         # ★ 改定８：ビジターへの変更は確認不要で即時登録
         if new_member_type == "ビジター":
-            today = date.today()
-            # 現在コースを終了
-            if current_course:
-                current_course.expire(end_date=today)
-            # ビジターコースを追加
-            new_course = MemberCourse(
-                member_id    = member_id,
-                member_type  = "ビジター",
+            # 現在コースを終了してビジターコースを追加
+            MemberCourse.start_new(
+                member_id,
+                "ビジター",
+                date.today(),
                 course_name  = course_changes.get("course_name") or None,
                 course_fee   = course_changes.get("course_fee")  or None,
-                start_date   = today,
-                end_date     = None,
-                status       = "active",
                 confirmed_by = "member",
             )
-            db.session.add(new_course)
             member.updated_at = datetime.utcnow()
             visitor_instant   = True
             course_applied    = True
@@ -757,8 +877,26 @@ def approve_application(app_id):
     app_rec  = MemberApplication.query.get_or_404(app_id)
     member   = Member.query.get_or_404(app_rec.member_id)
     req_data = request.get_json(silent=True) or {}
-    today    = date.today()
 
+    confirmed_member_type = _approve_one(
+        app_rec, member, req_data.get("confirmed_by", "staff"), date.today()
+    )
+    db.session.commit()
+
+    return jsonify({
+        "status":                "ok",
+        "confirmed_member_type": confirmed_member_type,
+    })
+
+
+def _approve_one(app_rec: MemberApplication, member: Member,
+                 confirmed_by: str, today: date,
+                 current_course=CURRENT_NOT_LOADED) -> str | None:
+    """
+    申請1件を承認する（commit はしない）。承認後の member_type を返す。
+    approve_application() と一括承認（batch_applications）で共用。
+    current_course は一括承認で先読みした現在コース（members 行をロック済み。なければ None）。
+    """
     changes = app_rec.get_changes()
 
     # ── ① course / reglimit フィールドを抽出 ──────────────────────
@@ -779,7 +917,7 @@ def approve_application(app_id):
 
     if new_limit_str:
         new_limit = _parse_date(new_limit_str)
-        flyer = MemberFlyer.get_or_create(member.id)
+        flyer = member.flyer or MemberFlyer.get_or_create(member.id)
         if flyer.reglimit_date and flyer.reglimit_date > today:
             flyer.next_reglimit_date = new_limit
         else:
@@ -789,48 +927,34 @@ def approve_application(app_id):
     member.updated_at = datetime.utcnow()
 
     # ── ③ member_courses にコース履歴レコードを追加 ───────────────
-    if new_member_type:
-        confirmed_by   = req_data.get("confirmed_by", "staff")
+    preloaded = current_course
+    if current_course is CURRENT_NOT_LOADED:
         current_course = MemberCourse.get_current(member.id)
-
+    if new_member_type:
         # ★ 改定１１: コース種別に応じた start_date を計算
         new_start = _calc_new_course_start(
             new_member_type, new_course_name, current_course, today
         )
 
-        # 現在有効なコースを終了
-        if current_course:
-            current_course.expire(end_date=new_start)
-
-        # 新コースレコードを追加
-        new_course = MemberCourse(
-            member_id      = member.id,
-            member_type    = new_member_type,
+        # 現在有効なコースを終了して新コースレコードを追加
+        current_course = MemberCourse.start_new(
+            member.id,
+            new_member_type,
+            new_start,
             course_name    = new_course_name,
             course_fee     = new_course_fee,
-            start_date     = new_start,
-            end_date       = None,
-            status         = 'active',
             confirmed_by   = confirmed_by,
             application_id = app_rec.id,
+            current        = preloaded,
         )
-        db.session.add(new_course)
 
     # ── ④ 申請レコードを承認済みに更新 ───────────────────────────
     app_rec.app_status   = 'approved'
     app_rec.confirmed_at = datetime.utcnow()
-    app_rec.confirmed_by = req_data.get("confirmed_by", "staff")
-
-    db.session.commit()
+    app_rec.confirmed_by = confirmed_by
 
     # フロント側で分類欄を更新できるよう confirmed_member_type を返す
-    confirmed_course      = MemberCourse.get_current(member.id)
-    confirmed_member_type = confirmed_course.member_type if confirmed_course else new_member_type
-
-    return jsonify({
-        "status":                "ok",
-        "confirmed_member_type": confirmed_member_type,
-    })
+    return current_course.member_type if current_course else new_member_type
 
 
 # POST /api/applications/<id>/reject
@@ -847,6 +971,113 @@ def reject_application(app_id):
     return jsonify({"status": "ok"})
 
 
+# POST /api/applications/batch
+# 複数の申請をまとめて承認 / 却下する（シーズン開始時の一括処理用）。
+# リクエスト JSON:
+#   { "action": "approve" | "reject", "ids": [1, 2, 3],
+#     "confirmed_by": "staff_name", "notes": "却下理由（reject のみ）" }
+# レスポンス JSON:
+#   { "status": "ok", "ok_count": 2, "error_count": 1,
+#     "results": [ { "id": 1, "status": "ok", "confirmed_member_type": "年会員" },
+#                  { "id": 3, "status": "error", "message": "..." }, ... ] }
+#
+# 1トランザクションで処理し、申請ごとに SAVEPOINT を切る。
+# 失敗した申請だけ巻き戻し、他の申請の結果は維持して最後に commit する。
+# 会員・連絡先・フライヤーは事前に一括取得する（申請ごとの SELECT を避ける）。
+_BATCH_MAX = 200
+
+
+@member_bp.route("/api/applications/batch", methods=["POST"])
+def batch_applications():
+    req_data     = request.get_json(silent=True) or {}
+    action       = req_data.get("action")
+    confirmed_by = req_data.get("confirmed_by", "staff")
+    notes        = req_data.get("notes", "")
+
+    if action not in ("approve", "reject"):
+        abort(400, description="action は approve / reject のいずれかです")
+    try:
+        ids = list(dict.fromkeys(int(i) for i in req_data.get("ids") or []))
+    except (TypeError, ValueError):
+        abort(400, description="ids は申請IDの配列で指定してください")
+    if not ids:
+        abort(400, description="ids が指定されていません")
+    if len(ids) > _BATCH_MAX:
+        abort(400, description=f"一度に処理できるのは {_BATCH_MAX} 件までです")
+
+    # ── 申請・会員（連絡先・フライヤー込み）・現在コースを一括取得 ─────
+    #   会員行はまとめてロック（id 順）し、その後に現在コースを読むので
+    #   承認ごとの start_new() はロックと現在コースの再取得を省ける
+    apps = {
+        a.id: a for a in
+        MemberApplication.query.filter(MemberApplication.id.in_(ids)).all()
+    }
+    members, courses = {}, {}
+    if action == "approve":
+        member_ids = {a.member_id for a in apps.values()}
+        if member_ids:
+            members = {
+                m.id: m for m in
+                Member.query
+                .options(selectinload(Member.contact), selectinload(Member.flyer))
+                .filter(Member.id.in_(member_ids))
+                .order_by(Member.id)
+                .with_for_update(of=Member)
+                .all()
+            }
+            courses = MemberCourse.get_current_many(member_ids)
+    approved_members = set()
+
+    today   = date.today()
+    results = []
+    for app_id in ids:
+        app_rec = apps.get(app_id)
+        if not app_rec:
+            results.append({"id": app_id, "status": "error", "message": "申請が見つかりません"})
+            continue
+        if app_rec.app_status != 'pending':
+            results.append({"id": app_id, "status": "error",
+                            "message": f"処理済みの申請です（{app_rec.app_status}）"})
+            continue
+
+        ok = {"id": app_id, "status": "ok"}
+        try:
+            with db.session.begin_nested():
+                if action == "approve":
+                    member = members.get(app_rec.member_id)
+                    if not member:
+                        raise LookupError("会員が見つかりません")
+                    # 同じ会員の2件目以降は先読みした現在コースが古いので取り直す
+                    current = (CURRENT_NOT_LOADED if member.id in approved_members
+                               else courses.get(member.id))
+                    approved_members.add(member.id)
+                    ok["confirmed_member_type"] = _approve_one(
+                        app_rec, member, confirmed_by, today, current_course=current
+                    )
+                else:
+                    app_rec.app_status   = 'rejected'
+                    app_rec.confirmed_at = datetime.utcnow()
+                    app_rec.confirmed_by = confirmed_by
+                    app_rec.notes        = notes
+        except Exception as e:
+            # SAVEPOINT まで巻き戻し済み（ブロック終了時の flush・RELEASE の失敗を含む）。
+            # この申請だけエラーとして返す
+            results.append({"id": app_id, "status": "error", "message": str(e)})
+        else:
+            # SAVEPOINT を RELEASE できたものだけ ok
+            results.append(ok)
+
+    db.session.commit()
+
+    ok_count = sum(1 for r in results if r["status"] == "ok")
+    return jsonify({
+        "status":      "ok",
+        "ok_count":    ok_count,
+        "error_count": len(results) - ok_count,
+        "results":     results,
+    })
+
+
 # GET /api/members/<id>/pending_application  改定５版（フライヤー申請対応）
 #
 # 会員更新ページの申請状態バッジ表示に使う。
@@ -1085,22 +1316,15 @@ def add_member_course(member_id):
 
     confirmed_by = data.get("confirmed_by", "staff")
 
-    # 現在有効なコースを終了させる
-    current = MemberCourse.get_current(member_id)
-    if current:
-        current.expire(end_date=start_date)
-
-    new_course = MemberCourse(
-        member_id    = member_id,
-        member_type  = member_type,
+    # 現在有効なコースを終了させて新コースを追加
+    new_course = MemberCourse.start_new(
+        member_id,
+        member_type,
+        start_date,
         course_name  = data.get("course_name") or None,
         course_fee   = data.get("course_fee")  or None,
-        start_date   = start_date,
-        end_date     = None,
-        status       = 'active',
         confirmed_by = confirmed_by,
     )
-    db.session.add(new_course)
 
     # updated_at のみ更新（member_type/course_name は member_courses で管理）
     member = Member.query.get(member_id)
@@ -1136,7 +1360,12 @@ def update_course(course_id):
         course.confirmed_by = data["confirmed_by"] or None
 
     course.updated_at = datetime.utcnow()
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # ux_member_courses_current 違反（現在有効なコースが2件になる）
+        db.session.rollback()
+        abort(400, description="この会員には既に現在有効なコースがあります")
     return jsonify(course.to_dict())
 
 
@@ -1155,9 +1384,9 @@ def update_course(course_id):
 #   }
 #
 # 検索条件:
-#   - full_name の部分一致（ilike）
-#   - member_status が 'active' または 'visitor' の会員のみ
-#   - 最大20件に制限
+#   - 氏名・ふりがなの正規化キーで部分一致 / 類似検索（member_name_search）
+#   - member_status が 'active' / 'visitor' / 'pending' の会員のみ
+#   - 類似度の高い順・最大20件に制限
 @member_bp.route("/api/members/lookup_by_name", methods=["POST"])
 def lookup_by_name():
     data = request.get_json(silent=True) or {}
@@ -1167,12 +1396,10 @@ def lookup_by_name():
         return jsonify({"error": "氏名を入力してください"}), 400
 
     members = (
-        Member.query
-        .filter(
-            Member.full_name.ilike(f"%{name}%"),
-            Member.member_status.in_(["active", "visitor", "pending"]),
+        filter_by_name(
+            Member.query.filter(Member.member_status.in_(["active", "visitor", "pending"])),
+            name,
         )
-        .order_by(Member.full_name)
         .limit(20)
         .all()
     )
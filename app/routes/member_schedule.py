@@ -5,7 +5,7 @@ member_routes.py から分離（E: ファイル分割）
 
 含む処理:
     _send_course_change_mail() : コース変更通知メール
-    _daily_member_check()      : 毎日00:05 コース期限切れ自動処理
+    _daily_member_check()      : 毎日00:05 コース期限切れ自動処理・スナップショット期限状態の再計算
     init_member_scheduler()    : スケジューラ起動（__init__.py から呼ぶ）
 """
 
@@ -18,10 +18,12 @@ from app.models.member_flyer    import MemberFlyer
 from datetime import datetime, date, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from sqlalchemy.orm import selectinload
 import os
 
 # _do_send_mail は member_mail_routes.py に移動
 from app.routes.member_mail_routes import _do_send_mail
+from app.routes.member_snapshot import refresh_snapshot_statuses
 
 _member_flask_app = None
 
@@ -108,7 +110,21 @@ def _daily_member_check():
         return
     with _member_flask_app.app_context():
         today   = date.today()
-        targets = Member.query.filter(Member.member_status == 'active').all()
+        targets = (
+            Member.query
+            .options(selectinload(Member.flyer))
+            .filter(Member.member_status == 'active')
+            .all()
+        )
+
+        # 現在コースを一括取得（会員ごとの get_current を避ける）
+        current_map = {
+            c.member_id: c for c in
+            MemberCourse.query
+            .join(Member, Member.id == MemberCourse.member_id)
+            .filter(Member.member_status == 'active', MemberCourse.current_filter())
+            .all()
+        }
 
         changed = 0
         for m in targets:
@@ -129,7 +145,7 @@ def _daily_member_check():
                 continue  # 以下の期限切れ判定はスキップ
 
             # ★ 改定８：コース期限切れ判定
-            current_course = MemberCourse.get_current(m.id)
+            current_course = current_map.get(m.id)
             if not current_course:
                 continue
 
@@ -148,14 +164,7 @@ def _daily_member_check():
             # ── 期限切れ処理 ──────────────────────────────────────
             if mt in ("年会員", "冬季会員"):
                 # → ビジターに自動変更＋メール送信
-                current_course.expire(end_date=today)
-                db.session.add(MemberCourse(
-                    member_id    = m.id,
-                    member_type  = "ビジター",
-                    start_date   = today,
-                    status       = "active",
-                    confirmed_by = "system",
-                ))
+                MemberCourse.start_new(m.id, "ビジター", today, confirmed_by="system")
                 m.updated_at = datetime.utcnow()
                 changed += 1
                 _send_course_change_mail(m, "ビジター")
@@ -170,6 +179,11 @@ def _daily_member_check():
             db.session.commit()
         print(f"[daily_member_check] {today} 処理件数: {changed}")
 
+        # 会員スナップショットの期限状態（license_status / repack_status）を再計算
+        refreshed = refresh_snapshot_statuses()
+        db.session.commit()
+        print(f"[daily_member_check] {today} スナップショット状態更新: {refreshed}")
+
 
 def init_member_scheduler(app):
     global _member_flask_app
@@ -0,0 +1,290 @@
+"""
+app/routes/member_snapshot.py
+会員スナップショット（読み取り専用モデル member_snapshot）
+新規追加（2026-10-18）
+
+用途:
+    QRスキャン・入山受付・会員詳細などの参照系 API は、毎回
+    members + member_contacts + member_flyers + 現在コース（MemberCourse.get_current）
+    を組み立てており、1リクエストで4〜5回 SELECT していた。
+    member_snapshot はこれらを1会員1行に展開したテーブルで、
+    参照系は主キー / 一意インデックスの1回の検索で済む。
+
+保持する値:
+    members / member_contacts / member_flyers の各カラム
+    現在コース（member_type / course_name / course_fee / course_start_date）
+    計算値:
+      repack_limit   : リパック日 + 1年
+      license_status : フライヤー登録期限（reglimit_date）の状態
+      repack_status  : リパック期限（repack_limit）の状態
+      ※ 状態は 'none' / 'expired' / 'warning'（31日以内） / 'ok'
+
+更新タイミング:
+    ・members / member_contacts / member_flyers / member_courses を含む flush の直後
+      （after_flush。_apply_fields_from_json・approve_application・コース追加/変更・
+        日次バッチ等、ORM 経由の書き込みはすべて同じトランザクション内で反映される）
+    ・日次バッチ（_daily_member_check）で refresh_snapshot_statuses() を呼び、
+      日付の経過で変わる license_status / repack_status を再計算する
+    ・起動時に全件を再構築（ORM を経由しない変更の取り込み）
+
+使い方:
+    row = get_snapshot(member_number="00039")
+    if row:
+        return jsonify(snapshot_to_dict(row))
+"""
+
+from datetime import date
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from app.db import db
+from app.models.member import Member
+from app.models.member_contact import MemberContact
+from app.models.member_course  import MemberCourse
+from app.models.member_flyer   import MemberFlyer
+
+
+_MEMBER_COLS = [
+    "uuid", "member_number", "full_name", "furigana", "gender", "blood_type",
+    "birthday", "weight", "guardian_name", "relationship",
+    "application_date", "agreement_date", "signature_name", "course_find",
+    "member_class", "member_status", "confirmed_at", "contract", "is_leader",
+    "instructor_role", "payment_confirmed", "from_experience", "exp_resv_no",
+    "updated_at",
+]
+_CONTACT_COLS = [
+    "zip_code", "address", "mobile_phone", "home_phone", "email",
+    "company_name", "company_phone", "emergency_name", "emergency_phone",
+    "medical_history",
+]
+_FLYER_COLS = [
+    "organization", "reg_no", "reglimit_date", "next_reglimit_date", "license",
+    "repack_date", "glider_name", "glider_color", "home_area", "experience",
+    "leader", "visitor_fee",
+]
+_COURSE_COLS = ["member_type", "course_name", "course_fee", "course_start_date"]
+_CALC_COLS   = ["repack_limit", "license_status", "repack_status"]
+
+_ALL_COLS = ["member_id"] + _MEMBER_COLS + _CONTACT_COLS + _FLYER_COLS + _COURSE_COLS + _CALC_COLS
+
+
+def _status_sql(col: str) -> str:
+    """期限日の状態判定 SQL 式（なし / 期限切れ / 31日以内 / 有効）"""
+    return f"""CASE
+            WHEN {col} IS NULL THEN 'none'
+            WHEN {col} < CAST(:today AS date) THEN 'expired'
+            WHEN {col} <= CAST(:today AS date) + 31 THEN 'warning'
+            ELSE 'ok'
+        END"""
+
+
+# 1会員1行に展開する SELECT（{where} に絞り込み条件を差し込む）
+# repack_limit は「リパック日 + 1年」（2/29 は 2/28 になる）
+_SNAPSHOT_SELECT = f"""
+    SELECT
+        m.id AS member_id,
+        {", ".join("m." + c for c in _MEMBER_COLS)},
+        {", ".join("c." + c for c in _CONTACT_COLS)},
+        {", ".join("f." + c for c in _FLYER_COLS)},
+        cc.member_type, cc.course_name, cc.course_fee,
+        COALESCE(cc.start_date, m.confirmed_at) AS course_start_date,
+        rl.repack_limit,
+        {_status_sql("f.reglimit_date")} AS license_status,
+        {_status_sql("rl.repack_limit")} AS repack_status
+    FROM members m
+    LEFT JOIN member_contacts c ON c.member_id = m.id
+    LEFT JOIN member_flyers   f ON f.member_id = m.id
+    LEFT JOIN member_courses  cc ON cc.member_id = m.id
+                                AND cc.status = 'active'
+                                AND cc.end_date IS NULL   -- ux_member_courses_current で1件
+    CROSS JOIN LATERAL (
+        SELECT CAST(f.repack_date + INTERVAL '1 year' AS date) AS repack_limit
+    ) rl
+    {{where}}
+"""
+
+_UPSERT_SQL = (
+    f"INSERT INTO member_snapshot ({', '.join(_ALL_COLS)}, refreshed_at) "
+    f"SELECT s.*, now() FROM ({_SNAPSHOT_SELECT}) s "
+    f"ON CONFLICT (member_id) DO UPDATE SET "
+    + ", ".join(f"{c} = EXCLUDED.{c}" for c in _ALL_COLS[1:])
+    + ", refreshed_at = EXCLUDED.refreshed_at"
+)
+
+
+# 列の型（記載のない列は TEXT）。members / member_contacts / member_flyers /
+# member_courses のモデル定義に合わせる
+_COL_TYPES = {
+    "member_id":          "INTEGER NOT NULL",
+    "uuid":               "VARCHAR(36)",
+    "birthday":           "DATE",
+    "application_date":   "DATE",
+    "agreement_date":     "DATE",
+    "member_status":      "VARCHAR(20)",
+    "confirmed_at":       "DATE",
+    "contract":           "BOOLEAN",
+    "is_leader":          "BOOLEAN",
+    "payment_confirmed":  "BOOLEAN",
+    "from_experience":    "BOOLEAN",
+    "exp_resv_no":        "VARCHAR(20)",
+    "updated_at":         "TIMESTAMP",
+    "organization":       "VARCHAR(10)",
+    "reglimit_date":      "DATE",
+    "next_reglimit_date": "DATE",
+    "repack_date":        "DATE",
+    "course_start_date":  "DATE",
+    "repack_limit":       "DATE",
+    "refreshed_at":       "TIMESTAMP",
+}
+
+
+def _col_type(col: str) -> str:
+    return _COL_TYPES.get(col, "TEXT")
+
+
+# 起動時マイグレーション（member_routes の record_once から実行）
+#   列は明示的に定義し、後から増やした列は ADD COLUMN IF NOT EXISTS で追加する
+SNAPSHOT_DDL = [
+    "CREATE TABLE IF NOT EXISTS member_snapshot (\n    "
+    + ",\n    ".join(f"{c} {_col_type(c)}" for c in _ALL_COLS + ["refreshed_at"])
+    + "\n)",
+] + [
+    f"ALTER TABLE member_snapshot ADD COLUMN IF NOT EXISTS {c} "
+    f"{_col_type(c).replace(' NOT NULL', '')}"
+    for c in _ALL_COLS[1:] + ["refreshed_at"]
+] + [
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_member_snapshot_member_id ON member_snapshot (member_id)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_member_snapshot_uuid ON member_snapshot (uuid)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ux_member_snapshot_member_number ON member_snapshot (member_number)",
+]
+
+
+# =========================================
+# 再構築
+# =========================================
+
+def refresh_member_snapshots(member_ids=None, connection=None) -> None:
+    """
+    指定会員（None の場合は全会員）のスナップショットを再構築する。
+    connection 指定時はそのコネクションで実行する（flush 中など）。
+    commit は呼び出し側で行う。
+    """
+    params = {"today": date.today()}
+    if member_ids is None:
+        where = ""
+    else:
+        member_ids = sorted(set(member_ids))
+        if not member_ids:
+            return
+        where = "WHERE m.id = ANY(:ids)"
+        params["ids"] = member_ids
+
+    conn = connection if connection is not None else db.session
+    conn.execute(text(_UPSERT_SQL.format(where=where)), params)
+    if member_ids is None:
+        conn.execute(text(
+            "DELETE FROM member_snapshot s "
+            "WHERE NOT EXISTS (SELECT 1 FROM members m WHERE m.id = s.member_id)"
+        ))
+
+
+def refresh_snapshot_statuses() -> int:
+    """
+    日付の経過で変わる license_status / repack_status を再計算する（日次バッチ用）。
+    変化した行数を返す。commit は呼び出し側で行う。
+    """
+    result = db.session.execute(text(f"""
+        UPDATE member_snapshot SET
+            license_status = {_status_sql("reglimit_date")},
+            repack_status  = {_status_sql("repack_limit")}
+        WHERE license_status IS DISTINCT FROM {_status_sql("reglimit_date")}
+           OR repack_status  IS DISTINCT FROM {_status_sql("repack_limit")}
+    """), {"today": date.today()})
+    return result.rowcount
+
+
+def touched_member_ids(session):
+    """
+    flush 対象の会員関連オブジェクトから (更新された会員ID, 削除された会員ID) を返す。
+    after_flush 内で呼ぶこと（new / dirty / deleted が flush 前の状態を保持している）。
+    """
+    upsert_ids, delete_ids = set(), set()
+
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Member):
+            upsert_ids.add(obj.id)
+        elif isinstance(obj, (MemberContact, MemberFlyer, MemberCourse)):
+            upsert_ids.add(obj.member_id)
+    for obj in session.deleted:
+        if isinstance(obj, Member):
+            delete_ids.add(obj.id)
+        elif isinstance(obj, (MemberContact, MemberFlyer, MemberCourse)):
+            upsert_ids.add(obj.member_id)
+
+    upsert_ids.discard(None)
+    upsert_ids -= delete_ids
+    return upsert_ids, delete_ids
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_snapshot_after_flush(session, flush_context):
+    """会員関連テーブルを含む flush の後、該当会員のスナップショットを更新する"""
+    upsert_ids, delete_ids = touched_member_ids(session)
+    if not upsert_ids and not delete_ids:
+        return
+
+    conn = session.connection()
+    if upsert_ids:
+        refresh_member_snapshots(upsert_ids, connection=conn)
+    if delete_ids:
+        conn.execute(
+            text("DELETE FROM member_snapshot WHERE member_id = ANY(:ids)"),
+            {"ids": sorted(delete_ids)},
+        )
+
+
+# =========================================
+# 参照
+# =========================================
+
+def get_snapshot(member_id=None, uuid=None, member_number=None):
+    """
+    member_id / uuid / member_number のいずれかでスナップショット1行を返す。
+    見つからなければ None。
+    """
+    if member_id is not None:
+        where, value = "member_id = :v", member_id
+    elif uuid is not None:
+        where, value = "uuid = :v", str(uuid)
+    elif member_number is not None:
+        where, value = "member_number = :v", member_number
+    else:
+        return None
+    return db.session.execute(
+        text(f"SELECT * FROM member_snapshot WHERE {where}"), {"v": value}
+    ).first()
+
+
+def snapshot_to_dict(row) -> dict:
+    """
+    スナップショット行を member_routes._member_to_dict() と同じ形の dict に変換する。
+    計算値（repack_limit / license_status / repack_status）も含む。
+    """
+    def fd(d):
+        return d.isoformat() if d else None
+
+    d = {"id": row.member_id}
+    for col in _MEMBER_COLS + _CONTACT_COLS + _FLYER_COLS + _COURSE_COLS + _CALC_COLS:
+        d[col] = getattr(row, col)
+
+    for col in ("birthday", "application_date", "agreement_date", "confirmed_at",
+                "reglimit_date", "next_reglimit_date", "repack_date",
+                "course_start_date", "repack_limit"):
+        d[col] = fd(d[col])
+    for col in ("contract", "is_leader", "payment_confirmed", "from_experience"):
+        d[col] = bool(d[col])
+
+    d["uuid"]        = str(row.uuid) if row.uuid else None
+    d["updated_at"]  = row.updated_at.strftime("%Y-%m-%d %H:%M") if row.updated_at else None
+    d["course_type"] = row.member_type   # 互換用
+    return d
@@ -0,0 +1,301 @@
+"""
+app/routes/retention.py
+履歴テーブルの保持期間管理（ホット / アーカイブ分割・期限切れ削除）
+新規追加（2026-10-18）
+
+用途:
+    io_flight などの履歴テーブルは増え続け、全期間の検索（period=all 等）が
+    毎回全履歴を走査していた。日々の運用で触るのは直近のシーズンだけなので、
+    保持期間を過ぎた行をアーカイブ表へ移す（または削除する）。
+
+ポリシー（POLICIES）:
+    name          : ポリシー名（= 対象テーブル名）
+    date_column   : 期限判定に使う日付列
+    unit / keep   : 保持単位（"year" / "month"）と保持数
+                    cutoff = 当年（当月）の初日から keep 単位さかのぼった初日
+                      例) io_flight    year  1 → 前年1/1 より前をアーカイブ
+                          work_contract month 2 → 2か月前の1日より前を削除
+    archive_table : 移動先（None の場合は削除のみ）
+    settled       : 移す / 削除してよい行の条件（SQL。None = 期限切れの行すべて）
+                      io_flight は入山料・山チンとも入金確認済みの行だけを移す。
+                      未確認の行は期限を過ぎてもホット表に残り、入金確認待ち一覧・
+                      記録の更新（いずれも io_flight だけを読む）から外れない。
+                      確認済みになった行は次回の実行で移る
+
+    keep は config_master（カテゴリ「データ保持」・項目名 = ポリシー名）の
+    有効な先頭の値で上書きできる。
+
+アーカイブ:
+    ・移動先は対象テーブルと同じ列構成（LIKE）。列名の共通部分だけを移す
+    ・retention_state.archived_before に「ここより前はアーカイブにもある」日付を記録。
+      移動の前に更新するので、移動中も archived_before を見る参照は欠けない
+      （settled を満たさない古い行はホット表に残るので、境界より前はホット表 +
+      アーカイブの両方を読む。1行はどちらか一方にしかない）
+    ・参照側は io_flight_routes._flights_since() のように archived_before と比較して、
+      アーカイブを含む期間のときだけ UNION ALL する（直近の期間はホット表のみ）
+    ・_MOVE_BATCH 行ずつ DELETE ... RETURNING → INSERT で移し、バッチごとに commit
+
+実行:
+    毎日 00:30（JST）に全ポリシーを実行（対象がなければ何もしない）
+    POST /api/retention/run?name=io_flight   /   flask retention run [NAME]
+    GET  /api/retention                       （ポリシー・cutoff・archived_before）
+"""
+
+from collections import namedtuple
+from datetime import date
+
+import click
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+from flask import Blueprint, jsonify, request
+from sqlalchemy import text
+from app.db import db
+from app.routes.config_cache import config_value
+
+retention_bp = Blueprint("retention", __name__, cli_group="retention")
+
+
+RetentionPolicy = namedtuple(
+    "RetentionPolicy", "name date_column unit keep archive_table key_column settled",
+)
+
+# 入金確認待ち（staff_manage_routes.PAYMENT_PENDING_*_SQL）のどちらにも当たらない行
+_IO_FLIGHT_SETTLED = (
+    "entrance_fee_paid = TRUE AND (yamachin IS NOT TRUE OR yamachin_confirmed = TRUE)"
+)
+
+POLICIES = {
+    p.name: p for p in [
+        RetentionPolicy("io_flight",     "entry_date", "year",  1, "io_flight_archive", "id",
+                        _IO_FLIGHT_SETTLED),
+        RetentionPolicy("work_contract", "work_date",  "month", 2, None,                "id",
+                        None),
+    ]
+}
+
+_CONFIG_CATEGORY = "データ保持"
+_MOVE_BATCH      = 5000
+
+
+# 起動時マイグレーション（record_once から実行）
+RETENTION_DDL = [
+    """CREATE TABLE IF NOT EXISTS retention_state (
+        table_name      TEXT PRIMARY KEY,
+        archived_before DATE,
+        last_run_at     TIMESTAMP,
+        last_moved      INTEGER
+    )""",
+] + [
+    sql
+    for p in POLICIES.values() if p.archive_table
+    for sql in (
+        f"CREATE TABLE IF NOT EXISTS {p.archive_table} "
+        f"(LIKE {p.name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+        f"CREATE INDEX IF NOT EXISTS ix_{p.archive_table}_{p.date_column} "
+        f"ON {p.archive_table} ({p.date_column})",
+    )
+]
+
+
+@retention_bp.record_once
+def _on_register(state):
+    with state.app.app_context():
+        for sql in RETENTION_DDL:
+            try:
+                db.session.execute(text(sql))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+
+
+# =========================================
+# 期限の計算
+# =========================================
+
+def _keep(policy: RetentionPolicy) -> int:
+    """config_master の設定があればそれを、なければポリシーの既定値を返す"""
+    try:
+        value = config_value(_CONFIG_CATEGORY, policy.name)
+        return max(0, int(value)) if value is not None else policy.keep
+    except (TypeError, ValueError):
+        return policy.keep
+
+
+def retention_cutoff(policy: RetentionPolicy, today: date = None) -> date:
+    """この日付より前の行が保持期間切れ"""
+    today = today or date.today()
+    keep = _keep(policy)
+    if policy.unit == "year":
+        return date(today.year - keep, 1, 1)
+    months = today.year * 12 + (today.month - 1) - keep
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def archived_before(name: str):
+    """アーカイブ済みの境界日（これより前の行はアーカイブ表にある）。未実行なら None"""
+    row = db.session.execute(
+        text("SELECT archived_before FROM retention_state WHERE table_name = :name"),
+        {"name": name},
+    ).first()
+    return row.archived_before if row else None
+
+
+# =========================================
+# 実行
+# =========================================
+
+def _common_columns(policy: RetentionPolicy) -> list:
+    rows = db.session.execute(text("""
+        SELECT a.column_name
+        FROM information_schema.columns a
+        JOIN information_schema.columns b
+          ON b.table_schema = a.table_schema
+         AND b.table_name   = :archive
+         AND b.column_name  = a.column_name
+        WHERE a.table_schema = current_schema()
+          AND a.table_name   = :table
+        ORDER BY a.ordinal_position
+    """), {"table": policy.name, "archive": policy.archive_table}).fetchall()
+    return [r.column_name for r in rows]
+
+
+def apply_retention(name: str, today: date = None) -> dict:
+    """ポリシーを1つ実行し、{"name", "cutoff", "moved" or "deleted"} を返す"""
+    policy = POLICIES[name]
+    cutoff = retention_cutoff(policy, today)
+    params = {"cutoff": cutoff, "n": _MOVE_BATCH}
+    where = f"{policy.date_column} < :cutoff"
+    if policy.settled:
+        where += f" AND ({policy.settled})"
+    expired = (
+        f"SELECT {policy.key_column} FROM {policy.name} "
+        f"WHERE {where} ORDER BY {policy.key_column} LIMIT :n"
+    )
+
+    if policy.archive_table is None:
+        deleted = db.session.execute(text(
+            f"DELETE FROM {policy.name} WHERE {where}"
+        ), params).rowcount
+        _record_run(policy, None, deleted)
+        db.session.commit()
+        return {"name": name, "cutoff": cutoff.isoformat(), "deleted": deleted}
+
+    # 境界を先に進めてから移す（移動中の参照もアーカイブを含めて読む）
+    previous = archived_before(name)
+    boundary = max(cutoff, previous) if previous else cutoff
+    _record_run(policy, boundary, 0)
+    db.session.commit()
+
+    cols = ", ".join(_common_columns(policy))
+    move = text(f"""
+        WITH moved AS (
+            DELETE FROM {policy.name}
+            WHERE {policy.key_column} IN ({expired})
+            RETURNING {cols}
+        )
+        INSERT INTO {policy.archive_table} ({cols}) SELECT {cols} FROM moved
+    """)
+    moved = 0
+    while True:
+        n = db.session.execute(move, params).rowcount
+        db.session.commit()
+        moved += n
+        if n < _MOVE_BATCH:
+            break
+
+    _record_run(policy, boundary, moved)
+    db.session.commit()
+    return {"name": name, "cutoff": cutoff.isoformat(), "moved": moved}
+
+
+def _record_run(policy: RetentionPolicy, boundary, count: int) -> None:
+    db.session.execute(text("""
+        INSERT INTO retention_state (table_name, archived_before, last_run_at, last_moved)
+        VALUES (:name, :boundary, now(), :count)
+        ON CONFLICT (table_name) DO UPDATE SET
+            archived_before = COALESCE(EXCLUDED.archived_before, retention_state.archived_before),
+            last_run_at     = EXCLUDED.last_run_at,
+            last_moved      = EXCLUDED.last_moved
+    """), {"name": policy.name, "boundary": boundary, "count": count})
+
+
+def apply_all(today: date = None) -> list:
+    results = []
+    for name in POLICIES:
+        try:
+            results.append(apply_retention(name, today))
+        except Exception as e:
+            db.session.rollback()
+            results.append({"name": name, "error": str(e)})
+    return results
+
+
+# =========================================
+# スケジューラ
+# =========================================
+
+_retention_flask_app = None
+
+
+def _daily_retention():
+    if _retention_flask_app is None:
+        return
+    with _retention_flask_app.app_context():
+        for r in apply_all():
+            print(f"[retention] {r}")
+
+
+def init_retention_scheduler(app):
+    global _retention_flask_app
+    _retention_flask_app = app
+
+    scheduler = BackgroundScheduler(timezone="Asia/Tokyo")
+    scheduler.add_job(
+        _daily_retention,
+        trigger=CronTrigger(hour=0, minute=30, timezone="Asia/Tokyo"),
+        id="daily_retention",
+        replace_existing=True,
+    )
+    scheduler.start()
+    return scheduler
+
+
+# =========================================
+# API / CLI
+# =========================================
+
+@retention_bp.route("/api/retention", methods=["GET"])
+def retention_status():
+    items = []
+    for p in POLICIES.values():
+        boundary = archived_before(p.name) if p.archive_table else None
+        items.append({
+            "name":            p.name,
+            "date_column":     p.date_column,
+            "unit":            p.unit,
+            "keep":            _keep(p),
+            "archive_table":   p.archive_table,
+            "settled":         p.settled,
+            "cutoff":          retention_cutoff(p).isoformat(),
+            "archived_before": boundary.isoformat() if boundary else None,
+        })
+    return jsonify(items)
+
+
+@retention_bp.route("/api/retention/run", methods=["POST"])
+def retention_run():
+    name = request.args.get("name")
+    if name and name not in POLICIES:
+        return jsonify({"error": f"ポリシーがありません: {name}"}), 404
+    results = [apply_retention(name)] if name else apply_all()
+    return jsonify({"status": "ok", "results": results})
+
+
+@retention_bp.cli.command("run")
+@click.argument("name", required=False)
+def cli_run(name):
+    """保持期間切れの行をアーカイブ / 削除する（NAME 省略時は全ポリシー）"""
+    if name and name not in POLICIES:
+        raise click.ClickException(f"ポリシーがありません: {name}")
+    for r in ([apply_retention(name)] if name else apply_all()):
+        click.echo(r)
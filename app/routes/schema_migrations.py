@@ -0,0 +1,339 @@
+"""
+app/routes/schema_migrations.py
+インデックス マイグレーション（バージョン管理）と実行計画チェック
+新規追加（2026-10-18）
+
+用途:
+    絞り込みに使う列（入金確認待ち・請負の月次集計・体験予約の日付 / 種別・
+    申請ステータス・会員ステータス）にインデックスがなく、各画面の一覧が
+    毎回テーブル全体を読んでいた。ルートのクエリの形に合わせた複合 /
+    部分 / 式インデックスをバージョン付きでまとめて作成する。
+
+バージョン管理:
+    MIGRATIONS を先頭から順に適用し、適用済みのバージョンを schema_migrations に
+    記録する（1バージョン = 1トランザクション。失敗したらそこで止める）。
+    起動時（record_once）に未適用分を自動で適用する。複数ワーカーの同時起動は
+    アドバイザリロックで1つずつ実行する。
+    既存の起動時 DDL（io_flight の entry_date / (uuid, entry_date) など）は
+    各モジュールに残し、ここでは重複して作らない。
+
+    ・対象テーブルがない環境ではそのインデックスを作らない
+    ・leading を指定したものは、同じ先頭列のインデックス（一意制約など）が
+      既にあれば作らない
+
+実行計画チェック:
+    hot_queries() は各画面のクエリと同じ形の SQL と、使われるべきインデックス。
+    flask schema explain で EXPLAIN を取り、計画にそのインデックスが
+    含まれなければ失敗（終了コード 1）にする。テストデータが少ない環境でも
+    判定できるよう、トランザクション内で enable_seqscan = off にして実行する。
+    tests/test_schema_explain.py も同じ判定を行う（PostgreSQL の DATABASE_URL が必要）。
+
+CLI:
+    flask schema status    適用状況
+    flask schema upgrade   未適用分を適用
+    flask schema explain   実行計画チェック
+"""
+
+import json
+import uuid as uuidlib
+from collections import namedtuple
+from datetime import date
+
+import click
+from flask import Blueprint
+from sqlalchemy import text
+from app.db import db
+
+schema_bp = Blueprint("schema", __name__, cli_group="schema")
+
+
+Migration = namedtuple("Migration", "version description statements")
+HotQuery  = namedtuple("HotQuery", "name sql params index")
+
+_LOCK_KEY = 20261018   # pg_advisory_xact_lock のキー（マイグレーション専用）
+
+
+def _index(name: str, table: str, definition: str, leading=None) -> str:
+    """
+    CREATE INDEX を「対象テーブルがあるときだけ」実行する DO ブロックを返す。
+    leading（列名のタプル）を指定した場合、先頭列が同じ通常インデックスが
+    既にあれば作らない。
+    """
+    cond = f"to_regclass('{table}') IS NOT NULL"
+    if leading:
+        cols = ", ".join(f"'{c}'" for c in leading)
+        cond += f"""
+            AND NOT EXISTS (
+                SELECT 1 FROM pg_index i
+                WHERE i.indrelid = to_regclass('{table}')
+                  AND i.indpred IS NULL
+                  AND (
+                      SELECT array_agg(a.attname::text ORDER BY k.n)
+                      FROM unnest(i.indkey) WITH ORDINALITY AS k(attnum, n)
+                      JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+                  )[1:{len(leading)}] = ARRAY[{cols}]
+            )"""
+    return f"""
+        DO $$
+        BEGIN
+            IF {cond} THEN
+                CREATE INDEX IF NOT EXISTS {name} ON {table} {definition};
+            END IF;
+        END $$"""
+
+
+def _month(column: str) -> str:
+    """EXTRACT(YEAR/MONTH) の絞り込みに一致する式インデックスの列"""
+    return f"(EXTRACT(YEAR FROM {column})), (EXTRACT(MONTH FROM {column}))"
+
+
+# =========================================
+# マイグレーション（追加のみ。適用済みのものは変更しない）
+# =========================================
+
+MIGRATIONS = [
+    Migration("20261018_01", "io_flight 入金確認待ち（部分インデックス）", [
+        # staff_manage_routes.PAYMENT_PENDING_*_SQL と同じ条件
+        _index("ix_io_flight_unpaid", "io_flight",
+               "(entry_date DESC) WHERE (entrance_fee_paid IS NULL OR entrance_fee_paid = FALSE)"),
+        _index("ix_io_flight_yamachin_unconfirmed", "io_flight",
+               "(entry_date DESC) WHERE yamachin = TRUE "
+               "AND (yamachin_confirmed IS NULL OR yamachin_confirmed = FALSE)"),
+    ]),
+    Migration("20261018_02", "rep_contract 会員別・月別", [
+        # 当日の記録（uuid + flight_date）・個人の月別一覧
+        _index("ix_rep_contract_uuid_flight_date", "rep_contract",
+               "(uuid, flight_date)", leading=("uuid", "flight_date")),
+        # 月次集計（extract(year / month) で絞り込み）
+        _index("ix_rep_contract_flight_month", "rep_contract",
+               f"({_month('flight_date')})"),
+    ]),
+    Migration("20261018_03", "work_contract 出勤可能日", [
+        _index("ix_work_contract_uuid_work_date", "work_contract",
+               "(uuid, work_date)", leading=("uuid", "work_date")),
+        # 当日 / 当月の出勤可能パイロット（UPPER(status) = 'OK'）
+        _index("ix_work_contract_ok_work_date", "work_contract",
+               "(work_date) WHERE UPPER(status) = 'OK'"),
+    ]),
+    Migration("20261018_04", "exp_reservation 日付・種別・通し番号", [
+        # 当日の予約（reservation_date = :d [AND reservation_type = :t]）
+        _index("ix_exp_reservation_date_type", "exp_reservation",
+               "(reservation_date, reservation_type)"),
+        # 月別一覧・カレンダー
+        _index("ix_exp_reservation_type_month", "exp_reservation",
+               f"(reservation_type, {_month('reservation_date')})"),
+        # 次の通し番号（MAX(reservation_no) WHERE reservation_type = :t）
+        _index("ix_exp_reservation_type_no", "exp_reservation",
+               "(reservation_type, reservation_no)"),
+        # 一覧の LEFT JOIN・申込件数のサブクエリ
+        _index("ix_exp_para_detail_reservation_id", "exp_para_detail",
+               "(reservation_id)", leading=("reservation_id",)),
+        _index("ix_exp_camp_detail_reservation_id", "exp_camp_detail",
+               "(reservation_id)", leading=("reservation_id",)),
+        _index("ix_experience_resv_no", "experience",
+               "(resv_no)", leading=("resv_no",)),
+    ]),
+    Migration("20261018_05", "member_applications 会員別・未処理", [
+        # filter_by(member_id, app_status[, application_type]).order_by(applied_at desc)
+        _index("ix_member_applications_member_status", "member_applications",
+               "(member_id, app_status, application_type, applied_at DESC)"),
+        # スタッフ画面の未処理一覧
+        _index("ix_member_applications_pending", "member_applications",
+               "(applied_at DESC) WHERE app_status = 'pending'"),
+    ]),
+    Migration("20261018_06", "members 会員ステータス", [
+        _index("ix_members_member_status", "members",
+               "(member_status, id)", leading=("member_status",)),
+    ]),
+]
+
+
+# 起動時マイグレーション（record_once から実行）
+SCHEMA_MIGRATIONS_DDL = [
+    """CREATE TABLE IF NOT EXISTS schema_migrations (
+        version     TEXT PRIMARY KEY,
+        description TEXT,
+        applied_at  TIMESTAMP NOT NULL DEFAULT now()
+    )""",
+]
+
+
+@schema_bp.record_once
+def _on_register(state):
+    with state.app.app_context():
+        for sql in SCHEMA_MIGRATIONS_DDL:
+            try:
+                db.session.execute(text(sql))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+        try:
+            for version in apply_migrations():
+                print(f"[schema] applied {version}")
+        except Exception as e:
+            db.session.rollback()
+            print(f"[schema] {e}")
+
+
+# =========================================
+# 適用
+# =========================================
+
+def applied_versions() -> set:
+    rows = db.session.execute(text("SELECT version FROM schema_migrations")).fetchall()
+    return {r.version for r in rows}
+
+
+def apply_migrations() -> list:
+    """未適用のマイグレーションを順に適用し、適用したバージョンを返す"""
+    applied = []
+    for m in MIGRATIONS:
+        db.session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _LOCK_KEY})
+        if m.version in applied_versions():
+            db.session.rollback()
+            continue
+        try:
+            for sql in m.statements:
+                db.session.execute(text(sql))
+            db.session.execute(
+                text("INSERT INTO schema_migrations (version, description) VALUES (:v, :d)"),
+                {"v": m.version, "d": m.description},
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise RuntimeError(f"マイグレーション {m.version} に失敗しました: {e}") from e
+        applied.append(m.version)
+    return applied
+
+
+# =========================================
+# 実行計画チェック
+# =========================================
+
+def hot_queries() -> list:
+    """各画面のクエリと同じ形の SQL と、使われるべきインデックス"""
+    from app.routes.staff_manage_routes import (
+        PAYMENT_PENDING_ENTRANCE_SQL, PAYMENT_PENDING_YAMACHIN_SQL,
+    )
+    today = date.today()
+    some_uuid = str(uuidlib.uuid4())
+    ym = {"yr": today.year, "mo": today.month}
+
+    return [
+        HotQuery("入金確認待ち（入山料）", PAYMENT_PENDING_ENTRANCE_SQL.text, {},
+                 "ix_io_flight_unpaid"),
+        HotQuery("入金確認待ち（山チン）", PAYMENT_PENDING_YAMACHIN_SQL.text, {},
+                 "ix_io_flight_yamachin_unconfirmed"),
+        HotQuery("入下山 日別一覧",
+                 "SELECT * FROM io_flight WHERE entry_date = :d ORDER BY in_time",
+                 {"d": today}, "ix_io_flight_entry_date"),
+        HotQuery("入下山 個人カレンダー",
+                 "SELECT entry_date FROM io_flight WHERE uuid = CAST(:u AS uuid) "
+                 "AND entry_date >= :start AND entry_date < :end",
+                 {"u": some_uuid, "start": today.replace(day=1), "end": today},
+                 "ux_io_flight_uuid_entry_date"),
+        HotQuery("請負 当日の記録",
+                 "SELECT * FROM rep_contract WHERE uuid = :u AND flight_date = :d",
+                 {"u": some_uuid, "d": today}, "ix_rep_contract_uuid_flight_date"),
+        HotQuery("請負 月次集計",
+                 "SELECT uuid, COUNT(*) FROM rep_contract "
+                 "WHERE EXTRACT(year FROM flight_date) = :yr "
+                 "AND EXTRACT(month FROM flight_date) = :mo GROUP BY uuid",
+                 ym, "ix_rep_contract_flight_month"),
+        HotQuery("出勤可能パイロット（当日）",
+                 "SELECT uuid FROM work_contract WHERE work_date = :d AND UPPER(status) = 'OK'",
+                 {"d": today}, "ix_work_contract_ok_work_date"),
+        HotQuery("体験予約 当日",
+                 "SELECT id FROM exp_reservation WHERE reservation_date = :d AND cancelled = FALSE",
+                 {"d": today}, "ix_exp_reservation_date_type"),
+        HotQuery("体験予約 カレンダー",
+                 "SELECT reservation_date, COUNT(*) FROM exp_reservation "
+                 "WHERE reservation_type = :rtype "
+                 "AND EXTRACT(YEAR FROM reservation_date) = :yr "
+                 "AND EXTRACT(MONTH FROM reservation_date) = :mo "
+                 "AND cancelled = FALSE GROUP BY reservation_date",
+                 {"rtype": "para", **ym}, "ix_exp_reservation_type_month"),
+        HotQuery("体験予約 次の通し番号",
+                 "SELECT COALESCE(MAX(reservation_no), 0) + 1 FROM exp_reservation "
+                 "WHERE reservation_type = :t",
+                 {"t": "para"}, "ix_exp_reservation_type_no"),
+        HotQuery("会員の申請（course_change）",
+                 "SELECT id FROM member_applications WHERE member_id = :m "
+                 "AND application_type = 'course_change' AND app_status = 'pending' "
+                 "ORDER BY applied_at DESC LIMIT 1",
+                 {"m": 1}, "ix_member_applications_member_status"),
+        HotQuery("未処理の申請一覧",
+                 "SELECT id FROM member_applications WHERE app_status = 'pending' "
+                 "ORDER BY applied_at DESC",
+                 {}, "ix_member_applications_pending"),
+        HotQuery("新規申込（pending 会員）",
+                 "SELECT id FROM members WHERE member_status = 'pending' ORDER BY id DESC",
+                 {}, "ix_members_member_status"),
+    ]
+
+
+def _plan_indexes(plan: dict) -> set:
+    """EXPLAIN (FORMAT JSON) の計画ノードから使われているインデックス名を集める"""
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= _plan_indexes(child)
+    return names
+
+
+def explain_hot_queries() -> list:
+    """
+    hot_queries() を EXPLAIN し、{"name", "index", "used", "indexes"} のリストを返す。
+    計画の取得だけでクエリ自体は実行しない。
+    """
+    results = []
+    for q in hot_queries():
+        try:
+            db.session.execute(text("SET LOCAL enable_seqscan = off"))
+            raw = db.session.execute(text("EXPLAIN (FORMAT JSON) " + q.sql), q.params).scalar()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+            used = _plan_indexes(plan)
+            results.append({"name": q.name, "index": q.index,
+                            "used": q.index in used, "indexes": sorted(used)})
+        except Exception as e:
+            results.append({"name": q.name, "index": q.index, "used": False, "error": str(e)})
+        finally:
+            db.session.rollback()
+    return results
+
+
+# =========================================
+# CLI
+# =========================================
+
+@schema_bp.cli.command("status")
+def cli_status():
+    """マイグレーションの適用状況を表示する"""
+    done = applied_versions()
+    for m in MIGRATIONS:
+        click.echo(f"{'済' if m.version in done else '未'}  {m.version}  {m.description}")
+
+
+@schema_bp.cli.command("upgrade")
+def cli_upgrade():
+    """未適用のマイグレーションを適用する"""
+    try:
+        applied = apply_migrations()
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    click.echo("\n".join(applied) if applied else "適用するマイグレーションはありません")
+
+
+@schema_bp.cli.command("explain")
+def cli_explain():
+    """各画面のクエリが想定したインデックスを使うか確認する"""
+    failed = 0
+    for r in explain_hot_queries():
+        if r["used"]:
+            click.echo(f"OK    {r['name']}  ({r['index']})")
+            continue
+        failed += 1
+        detail = r.get("error") or f"使用: {', '.join(r['indexes']) or 'なし'}"
+        click.echo(f"NG    {r['name']}  ({r['index']})  {detail}")
+    if failed:
+        raise click.ClickException(f"{failed} 件のクエリが想定したインデックスを使っていません")
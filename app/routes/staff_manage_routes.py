@@ -20,9 +20,12 @@ from app.db import db
 from app.models.member import Member
 from app.models.member_application import MemberApplication   # ★ 追加
 from app.models.member_course   import MemberCourse             # ★ 改定６追加
-from app.models.member_contact  import MemberContact            # ★ スリム化追加
 from app.models.member_flyer    import MemberFlyer              # ★ スリム化追加
 from app.models.tour_booking    import TourBooking              # ★ 改定４追加
+from app.routes.member_projection import member_projection_query  # ★ N+1防止（射影クエリ）
+from app.routes.io_flight_stats import add_daily_stats            # 入下山 日別集計（未入金件数）
+from app.routes.io_flight_live  import notify_io_changes          # 入下山 ライブボード通知
+from app.routes.io_member_stats import add_member_stats, member_stats_key  # 入下山 会員別集計（未入金件数）
 from datetime import date, datetime, timedelta
 from calendar import monthrange
 import traceback
@@ -70,12 +73,19 @@ def confirm_payment(io_id):
         col = "entrance_fee_paid"
 
     try:
+        # 未確認 → 確認済みに変わった行のみ返す（日別 / 会員別集計の未入金件数を減らすため）
         sql = db.text(f"""
             UPDATE io_flight
             SET {col} = TRUE
-            WHERE id = :io_id
+            WHERE id = :io_id AND {col} IS NOT TRUE
+            RETURNING entry_date, member_class, uuid
         """)
-        db.session.execute(sql, {"io_id": io_id})
+        row = db.session.execute(sql, {"io_id": io_id}).first()
+        if row:
+            if col == "entrance_fee_paid":
+                add_daily_stats({(row.entry_date, row.member_class): {"unpaid_cnt": -1}})
+                add_member_stats({member_stats_key(row.uuid, row.entry_date): {"unpaid_cnt": -1}})
+            notify_io_changes([io_id])                                  # 入下山ライブボードへ通知
         db.session.commit()
         return jsonify({"status": "ok", "id": io_id, "type": confirm_type})
     except Exception:
@@ -131,17 +141,14 @@ def confirm_member(member_id):
                 init_type = "ビジター"
                 init_name = None
                 init_fee  = None
-            initial_course = MemberCourse(
-                member_id    = member_id,
-                member_type  = init_type,
+            MemberCourse.start_new(
+                member_id,
+                init_type,
+                today,
                 course_name  = init_name,
                 course_fee   = init_fee,
-                start_date   = today,
-                end_date     = None,
-                status       = 'active',
                 confirmed_by = 'staff',
             )
-            db.session.add(initial_course)
         elif existing:
             # 既存レコードの start_date を確認日に合わせて更新
             try:
@@ -223,27 +230,18 @@ def _get_flyer_pending():
     ★ 判定を updated_at IS NULL → member_status = 'pending' に変更
     """
     try:
-        members = (
-            Member.query
+        # ── N+1防止：現在コースを結合した射影で1クエリ取得 ────────
+        rows = (
+            member_projection_query()
             .filter(Member.member_status == 'pending')   # ★ 変更
             .order_by(Member.id.desc())
             .all()
         )
 
-        # ── N+1防止：active コースを1クエリで一括取得 ────────────
-        m_ids = [m.id for m in members]
-        courses = MemberCourse.query.filter(
-            MemberCourse.member_id.in_(m_ids),
-            MemberCourse.status == 'active',
-            MemberCourse.end_date.is_(None),
-        ).all() if m_ids else []
-        course_map = {cc.member_id: cc for cc in courses}
-
         by_type: dict[str, int] = {}
         items = []
-        for m in members:
-            current_course = course_map.get(m.id)
-            mtype = current_course.member_type if current_course else "不明"
+        for m in rows:
+            mtype = m.member_type or "不明"
             by_type[mtype] = by_type.get(mtype, 0) + 1
             items.append({
                 "id":               m.id,
@@ -301,6 +299,27 @@ def _get_exp_pending():
         return {"total": 0, "items": [], "error": "取得失敗"}
 
 
+# 入金確認待ちの取得 SQL
+#   WHERE 句は schema_migrations の部分インデックス（ix_io_flight_unpaid /
+#   ix_io_flight_yamachin_unconfirmed）の条件と同じ形にしておくこと
+PAYMENT_PENDING_ENTRANCE_SQL = db.text("""
+    SELECT id, entry_date, member_class, full_name, member_number
+    FROM io_flight
+    WHERE (entrance_fee_paid IS NULL OR entrance_fee_paid = FALSE)
+    ORDER BY entry_date DESC
+    LIMIT 200
+""")
+
+PAYMENT_PENDING_YAMACHIN_SQL = db.text("""
+    SELECT id, entry_date, member_class, full_name, member_number
+    FROM io_flight
+    WHERE yamachin = TRUE
+      AND (yamachin_confirmed IS NULL OR yamachin_confirmed = FALSE)
+    ORDER BY entry_date DESC
+    LIMIT 200
+""")
+
+
 def _get_payment_pending():
     """
     入山申請の入金確認待ち。
@@ -310,25 +329,10 @@ def _get_payment_pending():
     """
     try:
         # ── 入山料未確認（全レコード対象） ──
-        sql_nyuzan = db.text("""
-            SELECT id, entry_date, member_class, full_name, member_number
-            FROM io_flight
-            WHERE (entrance_fee_paid IS NULL OR entrance_fee_paid = FALSE)
-            ORDER BY entry_date DESC
-            LIMIT 200
-        """)
-        rows_nyuzan = db.session.execute(sql_nyuzan).fetchall()
+        rows_nyuzan = db.session.execute(PAYMENT_PENDING_ENTRANCE_SQL).fetchall()
 
         # ── 山チン未確認（yamachin=TRUE のみ） ──
-        sql_yamachin = db.text("""
-            SELECT id, entry_date, member_class, full_name, member_number
-            FROM io_flight
-            WHERE yamachin = TRUE
-              AND (yamachin_confirmed IS NULL OR yamachin_confirmed = FALSE)
-            ORDER BY entry_date DESC
-            LIMIT 200
-        """)
-        rows_yamachin = db.session.execute(sql_yamachin).fetchall()
+        rows_yamachin = db.session.execute(PAYMENT_PENDING_YAMACHIN_SQL).fetchall()
 
         def to_item(r, confirm_type):
             return {
@@ -500,44 +504,26 @@ def _get_expiry_alerts():
         today  = date.today()
         alerts = []
 
-        # active な会員を全取得
-        members = (
-            Member.query
+        # ── N+1防止：active な会員をフライヤー・連絡先・現在コース込みで1クエリ取得 ──
+        rows = (
+            member_projection_query()
             .filter(Member.member_status == 'active')
             .all()
         )
 
-        # ── N+1防止：コース・連絡先を一括取得 ────────────────────
-        active_member_ids = [m.id for m in members]
-        ea_courses = MemberCourse.query.filter(
-            MemberCourse.member_id.in_(active_member_ids),
-            MemberCourse.status == 'active',
-            MemberCourse.end_date.is_(None),
-        ).all() if active_member_ids else []
-        ea_course_map = {cc.member_id: cc for cc in ea_courses}
-
-        ea_contacts = MemberContact.query.filter(
-            MemberContact.member_id.in_(active_member_ids)
-        ).all() if active_member_ids else []
-        ea_contact_map = {cc.member_id: cc for cc in ea_contacts}
-
-        for m in members:
-            flyer  = m.flyer
-            course = ea_course_map.get(m.id)
-
-            contact = ea_contact_map.get(m.id)
+        for m in rows:
             member_info = {
                 "member_id":     m.id,
                 "full_name":     m.full_name or "（不明）",
                 "member_number": m.member_number or "—",
-                "license":       flyer.license if flyer else None,
-                "email":         contact.email if contact else None,
+                "license":       m.license,
+                "email":         m.email,
             }
 
             # ── 項1: コース期限 ───────────────────────────────────
-            if course and course.member_type in ("年会員", "スクール", "冬季会員"):
-                mtype      = course.member_type
-                start_date = course.start_date
+            if m.member_type in ("年会員", "スクール", "冬季会員"):
+                mtype      = m.member_type
+                start_date = m.course_start_date
 
                 if mtype in ("年会員", "スクール"):
                     # 開始日から1年後
@@ -565,8 +551,8 @@ def _get_expiry_alerts():
 
                 if status:
                     course_label = mtype
-                    if course.course_name:
-                        course_label = f"{mtype}（{course.course_name}）"
+                    if m.course_name:
+                        course_label = f"{mtype}（{m.course_name}）"
                     alerts.append({
                         **member_info,
                         "item":      "コース",
@@ -577,8 +563,8 @@ def _get_expiry_alerts():
                     })
 
             # ── 項2: フライヤー登録期限 ───────────────────────────
-            if flyer and flyer.reglimit_date:
-                exp_date  = flyer.reglimit_date
+            if m.reglimit_date:
+                exp_date  = m.reglimit_date
                 warn_date = _add_months(exp_date, -1)
                 if today > exp_date:
                     status = "expired"
@@ -598,9 +584,8 @@ def _get_expiry_alerts():
                     })
 
             # ── 項3: リパック日（年会員・スクールのみ） ───────────
-            if (flyer and flyer.repack_date
-                    and course and course.member_type in ("年会員", "スクール")):
-                exp_date  = _repack_expiry(flyer.repack_date)
+            if m.repack_date and m.member_type in ("年会員", "スクール"):
+                exp_date  = _repack_expiry(m.repack_date)
                 warn_date = _add_months(exp_date, -1)
                 if today > exp_date:
                     status = "expired"
@@ -23,6 +23,8 @@ from app.models.tour_booking import TourBooking, TourLeader, TourParticipant
 from app.models.member import Member
 from app.models.member_flyer import MemberFlyer
 from app.models.member_course import MemberCourse
+from app.routes.member_name_search import filter_by_name
+from app.routes.config_cache import config_value
 from sqlalchemy import text
 from datetime import datetime, date
 import re
@@ -104,7 +106,7 @@ def _member_search_result(member: Member) -> dict:
 def tour_search_member():
     """
     GET /api/tour/search_member?name=山田太郎&phone=090xxxx
-    氏名（部分一致）＋電話番号（部分一致）でメンバーを検索して返す。
+    氏名（ふりがな・全角半角対応の類似検索）＋電話番号（部分一致）でメンバーを検索して返す。
     """
     name  = request.args.get("name",  "").strip()
     phone = request.args.get("phone", "").strip()
@@ -114,9 +116,6 @@ def tour_search_member():
 
     query = Member.query
 
-    if name:
-        query = query.filter(Member.full_name.ilike(f"%{name}%"))
-
     if phone:
         from app.models.member_contact import MemberContact
         contact_ids = (
@@ -129,7 +128,13 @@ def tour_search_member():
         )
         query = query.filter(Member.id.in_(contact_ids))
 
-    members = query.order_by(Member.full_name).limit(20).all()
+    # 氏名あり → 類似度順、電話番号のみ → 氏名順
+    if name:
+        query = filter_by_name(query, name)
+    else:
+        query = query.order_by(Member.full_name)
+
+    members = query.limit(20).all()
 
     if not members:
         return jsonify({"status": "not_found", "results": []})
@@ -147,23 +152,10 @@ def tour_search_member():
 @tour_bp.route("/api/tour/visitor_fee", methods=["GET"])
 def get_visitor_fee():
     def _fetch_fee(item_name: str) -> int:
-        row = db.session.execute(
-            text("""
-                SELECT cv.value
-                FROM config_master cm
-                JOIN config_values cv ON cv.master_id = cm.id
-                WHERE cm.category  = 'パラ'
-                  AND cm.item_name = :item_name
-                  AND cm.is_active = true
-                  AND cv.is_active = true
-                ORDER BY cv.sort_order, cv.id
-                LIMIT 1
-            """),
-            {"item_name": item_name},
-        ).fetchone()
-        if row:
+        value = config_value("パラ", item_name)
+        if value is not None:
             try:
-                return int(re.sub(r"[^\d]", "", str(row[0])))
+                return int(re.sub(r"[^\d]", "", str(value)))
             except (ValueError, TypeError):
                 pass
         return 0
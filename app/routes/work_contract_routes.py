@@ -7,11 +7,11 @@ from flask import Blueprint, render_template, request, jsonify
 from app.db import db
 from app.models.work_contract import WorkContract
 from app.models.member import Member
+from app.routes.member_lookup_cache import lookup_member
 from datetime import date, datetime, timedelta
 from typing import Optional
 import uuid as uuidlib
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
+from app.routes.retention import apply_retention
 
 work_bp = Blueprint("work_contract", __name__)
 
@@ -58,14 +58,12 @@ def api_lookup():
     if not query:
         return jsonify({"error": "会員番号を入力してください"}), 400
 
-    # 会員番号で検索、なければUUID（QR）で検索
-    member = Member.query.filter_by(member_number=query).first()
+    # 会員番号で検索、なければUUID（QR）で検索（member_lookup_cache 経由）
+    member = lookup_member(member_number=query)
     if not member:
         try:
             uuidlib.UUID(query)
-            member = Member.query.filter(
-                Member.uuid.cast(db.String) == query
-            ).first()
+            member = lookup_member(uuid=query)
         except ValueError:
             pass
 
@@ -165,42 +163,25 @@ def api_save():
 
 
 # ─────────────────────────────────────────
-# 定期削除ジョブ（毎月1日 0:00 実行）
+# 定期削除ジョブ
+#   保持期間（既定: 2か月前の1日より前を削除）は retention の
+#   "work_contract" ポリシーで管理し、毎日 00:30 の retention ジョブで実行する
 # ─────────────────────────────────────────
 
-_flask_app = None   # スケジューラジョブから app を参照するための変数
+_flask_app = None   # 手動実行から app を参照するための変数
 
 
 def _auto_cleanup():
     if _flask_app is None:
         return
     with _flask_app.app_context():
-        today = date.today()
-        m = today.month - 2
-        y = today.year
-        if m <= 0:
-            m += 12
-            y -= 1
-        cutoff = date(y, m, 1)
-        deleted = WorkContract.query.filter(
-            WorkContract.work_date < cutoff
-        ).delete(synchronize_session=False)
-        db.session.commit()
-        print(f"[AutoCleanup] {deleted} 件削除 (cutoff: {cutoff})")
+        result = apply_retention("work_contract")
+        print(f"[AutoCleanup] {result['deleted']} 件削除 (cutoff: {result['cutoff']})")
 
 
 def init_scheduler(app):
     global _flask_app
     _flask_app = app
-    scheduler = BackgroundScheduler(timezone="Asia/Tokyo")
-    scheduler.add_job(
-        _auto_cleanup,
-        trigger=CronTrigger(day=1, hour=0, minute=0, timezone="Asia/Tokyo"),
-        id="work_contract_cleanup",
-        replace_existing=True,
-    )
-    scheduler.start()
-    return scheduler
 
 
 # 手動実行用（管理者向け）
@@ -0,0 +1,157 @@
+"""
+app/serializers.py
+JSON シリアライズ共通層（事前コンパイル列シリアライザ + orjson JSON プロバイダ）
+新規追加（2026-10-18）
+
+用途:
+    一覧系 API では to_dict() の属性ごとの整形と、Flask 標準（stdlib json）の
+    エンコードがレスポンス時間の大半を占めていた。
+
+    Serializer  : フィールド定義から「1オブジェクト → dict」の関数を1回だけ生成する
+                  （exec で dict リテラルを返す関数を組み立てる。属性ごとの分岐なし）
+    JSONProvider: orjson が使える場合は jsonify / app.json.dumps を orjson で行う
+                  （未インストール時は Flask 標準のまま動く）
+
+フィールド定義:
+    Serializer({
+        "id":          None,                       # 同名属性をそのまま
+        "entry_date":  iso,                        # 同名属性に変換関数を適用
+        "name":        attr("full_name"),          # 別名属性
+        "in_time":     attr("in_time", hm),        # 別名属性 + 変換関数
+        "status":      obj(lambda r: ...),         # オブジェクト全体から計算
+    })
+
+    to_dict = Serializer({...})
+    to_dict(record)          → dict
+    to_dict.many(records)    → list[dict]
+
+互換性:
+    ・日付は従来どおり各フィールドで文字列化する（iso / ymd_hm / hm）
+    ・dict に生の date / datetime が残っていた場合は Flask 標準と同じ
+      HTTP 日付形式で出力する（OPT_PASSTHROUGH_DATETIME → default）
+    ・キーのソート（sort_keys）も Flask 標準に合わせる
+"""
+
+from collections import namedtuple
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:   # orjson 未インストール時は標準 json のまま
+    orjson = None
+
+
+# =========================================
+# 変換関数
+# =========================================
+
+def iso(v):
+    """date / datetime → ISO 形式（None はそのまま）"""
+    return v.isoformat() if v is not None else None
+
+
+def ymd_hm(v):
+    """datetime → 'YYYY-MM-DD HH:MM'"""
+    return v.strftime("%Y-%m-%d %H:%M") if v is not None else None
+
+
+def hm(v):
+    """datetime / time → 'HH:MM'"""
+    return v.strftime("%H:%M") if v is not None else None
+
+
+def as_str(v):
+    """UUID 等 → 文字列"""
+    return str(v) if v is not None else None
+
+
+def flag(v):
+    """NULL 許容の真偽値 → bool（None は False）"""
+    return bool(v)
+
+
+# =========================================
+# シリアライザ
+# =========================================
+
+_Attr = namedtuple("_Attr", "name conv")
+_Obj  = namedtuple("_Obj", "fn")
+
+
+def attr(name: str, conv=None) -> _Attr:
+    """別名の属性を使うフィールド"""
+    return _Attr(name, conv)
+
+
+def obj(fn) -> _Obj:
+    """オブジェクト全体から値を計算するフィールド"""
+    return _Obj(fn)
+
+
+class Serializer:
+    """フィールド定義から dict 変換関数を生成する"""
+
+    def __init__(self, fields: dict):
+        self.fields = dict(fields)
+        self._fn = self._compile(self.fields)
+
+    @staticmethod
+    def _compile(fields: dict):
+        namespace, items = {}, []
+        for i, (key, spec) in enumerate(fields.items()):
+            if isinstance(spec, _Obj):
+                namespace[f"_c{i}"] = spec.fn
+                expr = f"_c{i}(o)"
+            else:
+                name, conv = (spec.name, spec.conv) if isinstance(spec, _Attr) else (key, spec)
+                if not name.isidentifier():
+                    raise ValueError(f"属性名が不正です: {name!r}")
+                if conv is None:
+                    expr = f"o.{name}"
+                else:
+                    namespace[f"_c{i}"] = conv
+                    expr = f"_c{i}(o.{name})"
+            items.append(f"{key!r}: {expr}")
+
+        source = "def _serialize(o):\n    return {" + ", ".join(items) + "}\n"
+        exec(compile(source, "<serializer>", "exec"), namespace)
+        return namespace["_serialize"]
+
+    def __call__(self, o) -> dict:
+        return self._fn(o)
+
+    def many(self, objs) -> list:
+        fn = self._fn
+        return [fn(o) for o in objs]
+
+
+# =========================================
+# Flask JSON プロバイダ
+# =========================================
+
+class JSONProvider(DefaultJSONProvider):
+    """
+    orjson でエンコードする JSON プロバイダ。
+    orjson が無い場合・dumps に追加引数がある場合は Flask 標準の処理を使う。
+    """
+
+    def _orjson_option(self) -> int:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_option()).decode()
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        data = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(data, default=self.default, option=self._orjson_option()),
+            mimetype=self.mimetype,
+        )
@@ -0,0 +1,172 @@
+"""
+app/serializers_bench.py
+JSON シリアライズ マイクロベンチマーク
+新規追加（2026-10-18）
+
+比較:
+    旧: 手書き to_dict（属性ごとに整形） + Flask 標準（stdlib json, sort_keys）
+    新: app.serializers.Serializer      + JSONProvider（orjson）
+
+対象:
+    io_flight 行（IoFlight のトランジェントオブジェクト）
+    会員一覧行（member_projection の射影行相当）
+
+実行（DB 接続不要）:
+    python -m app.serializers_bench            # 既定 5000 行
+    python -m app.serializers_bench 20000
+"""
+
+import json
+import sys
+import time
+import uuid as uuidlib
+from collections import namedtuple
+from datetime import date, datetime, time as dtime, timedelta
+
+from flask import Flask
+
+from app.models.io_flight import IoFlight
+from app.models.member_application import MemberApplication  # noqa: F401  マッパー解決用
+from app.routes.io_flight_routes import _record_to_dict
+from app.routes.member_projection import member_row_to_list_dict
+from app.serializers import JSONProvider, orjson
+
+
+_REPEAT = 5
+
+
+# =========================================
+# 旧実装（比較用にそのまま残す）
+# =========================================
+
+def _fd(d):
+    return d.isoformat() if d else None
+
+
+def _legacy_record_to_dict(r) -> dict:
+    return {
+        "id":             r.id,
+        "member_number":  r.member_number,
+        "uuid":           str(r.uuid) if r.uuid else None,
+        "member_class":   r.member_class,
+        "full_name":      r.full_name,
+        "course_name":    r.course_name,
+        "reg_no":         r.reg_no,
+        "reglimit_date":  _fd(r.reglimit_date),
+        "license":        r.license,
+        "glider_name":    r.glider_name,
+        "glider_color":   r.glider_color,
+        "repack_date":    _fd(r.repack_date),
+        "insurance_type": r.insurance_type,
+        "radio_type":     r.radio_type,
+        "entry_date":     r.entry_date.isoformat() if r.entry_date else None,
+        "in_time":        r.in_time.strftime("%H:%M") if r.in_time else None,
+        "out_time":       r.out_time.strftime("%H:%M") if r.out_time else None,
+        "status":         "下山済" if r.out_time else "入山中",
+        "yamachin":           r.yamachin,
+        "comment":            r.comment or "",
+        "entrance_fee_paid":   r.entrance_fee_paid,
+        "yamachin_confirmed": r.yamachin_confirmed,
+    }
+
+
+def _legacy_member_row_to_list_dict(row) -> dict:
+    return {
+        "id":              row.id,
+        "uuid":            str(row.uuid) if row.uuid else None,
+        "member_number":   row.member_number,
+        "full_name":       row.full_name,
+        "member_status":   row.member_status,
+        "member_type":     row.member_type,
+        "license":         row.license,
+        "glider_name":     row.glider_name,
+        "organization":    row.organization,
+        "reg_no":          row.reg_no,
+        "reglimit_date":   _fd(row.reglimit_date),
+        "repack_date":     _fd(row.repack_date),
+        "instructor_role": row.instructor_role,
+    }
+
+
+# =========================================
+# テストデータ
+# =========================================
+
+_MemberRow = namedtuple("_MemberRow", [
+    "id", "uuid", "member_number", "full_name", "member_status", "member_type",
+    "license", "glider_name", "organization", "reg_no", "reglimit_date",
+    "repack_date", "instructor_role",
+])
+
+
+def _io_flight_rows(n: int) -> list:
+    today = date.today()
+    rows = []
+    for i in range(n):
+        in_time = datetime.combine(today, dtime(8, 0)) + timedelta(minutes=i % 300)
+        rows.append(IoFlight(
+            id=i + 1, uuid=uuidlib.uuid4(), member_number=f"{i:05d}",
+            member_class="年会員", full_name=f"富士 太郎{i}", course_name=None,
+            reg_no=f"JHF-{i:06d}", reglimit_date=today + timedelta(days=i % 400),
+            license="パイロット", glider_name="ADVANCE IOTA", glider_color="青",
+            repack_date=today - timedelta(days=i % 365), insurance_type="JHF",
+            radio_type="無線", entry_date=today, in_time=in_time,
+            out_time=in_time + timedelta(hours=3) if i % 2 else None,
+            yamachin=bool(i % 5 == 0), comment=None if i % 3 else "テスト",
+            entrance_fee_paid=bool(i % 2), yamachin_confirmed=False,
+        ))
+    return rows
+
+
+def _member_rows(n: int) -> list:
+    today = date.today()
+    return [
+        _MemberRow(
+            i + 1, uuidlib.uuid4(), f"{i:05d}", f"富士 花子{i}", "active", "年会員",
+            "パイロット", "ADVANCE IOTA", "JHF", f"JHF-{i:06d}",
+            today + timedelta(days=i % 400), today - timedelta(days=i % 365), None,
+        )
+        for i in range(n)
+    ]
+
+
+# =========================================
+# 計測
+# =========================================
+
+def _best_of(fn) -> float:
+    best = None
+    for _ in range(_REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _compare(label: str, rows: list, legacy_fn, serializer, provider) -> None:
+    legacy = lambda: json.dumps([legacy_fn(r) for r in rows], sort_keys=True)
+    fast   = lambda: provider.dumps(serializer.many(rows))
+
+    assert json.loads(legacy()) == json.loads(fast()), f"{label}: 出力が一致しません"
+
+    t_legacy, t_fast = _best_of(legacy), _best_of(fast)
+    print(f"{label:<12} {len(rows):>7} 行  旧 {t_legacy * 1000:8.1f} ms  "
+          f"新 {t_fast * 1000:8.1f} ms  ×{t_legacy / t_fast:5.1f}")
+
+
+def main(argv=None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    n = int(argv[0]) if argv else 5000
+
+    app = Flask(__name__)
+    provider = JSONProvider(app)
+    print(f"orjson: {'有効' if orjson is not None else '未インストール（標準 json）'}")
+
+    _compare("io_flight", _io_flight_rows(n), _legacy_record_to_dict, _record_to_dict, provider)
+    _compare("members",   _member_rows(n),    _legacy_member_row_to_list_dict,
+             member_row_to_list_dict, provider)
+
+
+if __name__ == "__main__":
+    main()
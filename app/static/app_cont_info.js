@@ -9,6 +9,8 @@
      GET /api/cont_info/flight_days?year&month
      GET /api/cont_info/detail/<uuid>?year&month
      GET /api/cont_info/work_monthly?year&month
+     GET /api/cont_info/handover?year&month
+     GET /api/cont_info/handover/search?q  （引継ぎ報告事項の全期間検索）
    ========================================================= */
 
 "use strict";
@@ -888,6 +890,62 @@ async function openHandoverDetail(category) {
   }
 }
 
+/* ---- handover 全期間検索（モーダルに新しい順で表示） ---- */
+async function searchHandover() {
+  const q = $("handover-search-q").value.trim();
+  if (!q) return;
+
+  $("modal-title-text").textContent = `引継ぎ報告事項の検索：「${q}」`;
+  $("modal-body-content").innerHTML = `<p style="padding:28px 20px;color:var(--text-muted)">検索中…</p>`;
+  $("modal-summary").innerHTML = "";
+  $("detail-modal").classList.add("open");
+
+  try {
+    const res = await fetch(`/api/cont_info/handover/search?q=${encodeURIComponent(q)}`);
+    if (!res.ok) throw new Error(`HTTP ${res.status}`);
+    const json = await res.json();
+    const rows = json.data || [];
+
+    if (rows.length === 0) {
+      $("modal-body-content").innerHTML =
+        `<p style="padding:28px 20px;color:var(--text-muted)">該当する記録はありません</p>`;
+      return;
+    }
+
+    $("modal-body-content").innerHTML = `
+      <table>
+        <thead>
+          <tr>
+            <th>記入日</th>
+            <th>記入者</th>
+            <th>内容</th>
+          </tr>
+        </thead>
+        <tbody>
+          ${rows.map(r => `
+            <tr>
+              <td style="white-space:nowrap">${r.date}（${weekday(r.date)}）</td>
+              <td style="white-space:nowrap">${r.name || ""}</td>
+              <td style="color:var(--text-secondary)">
+                ${r.matches.map(h => `
+                  <div><span class="handover-hit-label">${h.label}</span>${h.content}</div>
+                `).join("")}
+              </td>
+            </tr>
+          `).join("")}
+        </tbody>
+      </table>
+    `;
+    $("modal-summary").innerHTML = json.has_more
+      ? `<span>新しい順に <strong>${rows.length} 件</strong> を表示（さらに古い記録があります）</span>`
+      : `<span>合計：<strong>${rows.length} 件</strong></span>`;
+
+  } catch (e) {
+    $("modal-body-content").innerHTML =
+      `<p style="padding:28px 20px;color:var(--danger)">エラー: ${e.message}</p>`;
+  }
+}
+
 /* ---- handover 月ナビ（repYear/repMonth を共用） ---- */
 function handoverMonthPrev() {
   let { repYear: y, repMonth: m } = state;
@@ -194,6 +194,7 @@ let currentMembers = [];
 async function fetchMembers(params = {}) {
   const url = new URL("/api/members", location.origin);
   Object.entries(params).forEach(([k,v]) => { if (v) url.searchParams.set(k,v); });
+  url.searchParams.set("stream", "1");   // サーバー側で行を読みながら配列を書き出す
   try {
     const res = await fetch(url);
     const data = await res.json();
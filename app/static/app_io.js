@@ -1,6 +1,8 @@
 /**
  * app_io.js  –  入下山管理ページ ロジック
  * Mt.FUJI PARAGLIDING / FujipSystem
+ * 改定: 2026-10-18
+ *   - 会員モーダルに入山集計（今シーズン / 通算の日数・前回の入山日・未入金件数）を表示
  * 改定: 2026-03-24
  *   - 検索方法変更：氏名入力 → 候補リスト表示 → PASSコード認証（携帯番号下4桁）
  *   - QRコードボタン追加（将来実装用プレースホルダー）
@@ -355,6 +357,17 @@ const IOApp = (() => {
       zone.innerHTML += _alertHTML('warning', '⚠ リパック期限まで1ヶ月を切っています。');
     }
 
+    // 会員別の入山集計（/api/io/lookup の stats）
+    const st = data.stats;
+    if (st) {
+      if (st.unpaid_cnt > 0) {
+        zone.innerHTML += _alertHTML('warning', `⚠ 入山料の未入金が ${st.unpaid_cnt} 件あります。`);
+      }
+      const last = st.last_entry_date ? ` ／ 前回 ${st.last_entry_date}` : '';
+      zone.innerHTML += _alertHTML('info',
+        `今シーズン ${st.season_flight_days} 日 ／ 通算 ${st.total_flight_days} 日${last}`);
+    }
+
     const btn       = document.getElementById('action-btn');
     const cancelBtn = document.getElementById('cancel-btn');
 
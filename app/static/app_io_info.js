@@ -2,6 +2,16 @@
  * app_io_info.js  –  入下山管理ページ ロジック
  * Mt.FUJI PARAGLIDING / FujipSystem
  *
+ * 変更点 (v8 / 2026-10-18):
+ *  - 山チン / 備考あり / 個人フィルターを /api/io/info/special のページング
+ *    （limit / after）で取得。末尾の「さらに表示」で続きを読み込む
+ *    件数表示は総件数（サーバー側の集計）
+ *
+ * 変更点 (v7 / 2026-10-18):
+ *  - 日別リストを /api/io/info/live（SSE）のライブボードに変更
+ *    ・接続時に一覧を受け取り、以降は入山 / 下山・山チン / 備考 / 入金の変更分のみ反映
+ *    ・EventSource 非対応ブラウザは従来どおり /api/io/info/daily を1回取得
+ *
  * 変更点 (v6 / 2026-03-25):
  *  - カレンダー日付クリック → ポップアップ廃止
  *    ・クリックした日付を S.currentDate にセット
@@ -32,8 +42,14 @@ const InfoApp = (() => {
     chkComment:    false,
     editingId:     null,
     suggestTimer:  null,
+    live:          null,       // 日別ライブボード（EventSource）
+    liveRecords:   new Map(),  // id → レコード
+    specialUrl:    null,       // 特殊フィルターの取得 URL（ページング用）
+    specialRecords: [],        // 特殊フィルターで読み込み済みのレコード
   };
 
+  const SPECIAL_PAGE_SIZE = 200;   // 特殊フィルター 1ページの件数
+
   const TODAY = (() => {
     const d = new Date();
     d.setHours(0, 0, 0, 0);
@@ -166,6 +182,7 @@ const InfoApp = (() => {
         $("memberNameInput").value = "";
         _hideFilterLabel();
         $("col-date").style.display = "none";
+        _closeLive();
         _renderDailyTable([], false);
         _updateStats(0, null, null);
         _updateDateNav();
@@ -441,6 +458,21 @@ const InfoApp = (() => {
       ? S.classFilter : "all";
     const dateStr = dateToISO(S.currentDate);
 
+    await _loadDaily(dateStr, filterVal);
+    // リスト更新後にカレンダーフォーカスも更新
+    _updateCalFocus();
+  }
+
+  /* ════════════════════════════════════════
+     日別リスト取得（ライブボード / 単発取得）
+     /api/io/info/live（SSE）で最初に一覧、以降は変更分のみ受け取る
+  ════════════════════════════════════════ */
+  async function _loadDaily(dateStr, filterVal) {
+    _closeLive();
+    if (window.EventSource) {
+      _openLive(dateStr, filterVal);
+      return;
+    }
     try {
       const data = await apiFetch(
         `/api/io/info/daily?date=${dateStr}&filter=${encodeURIComponent(filterVal)}`
@@ -450,14 +482,52 @@ const InfoApp = (() => {
     } catch (e) {
       toast("データの取得に失敗しました: " + e.message, "error");
     }
-    // リスト更新後にカレンダーフォーカスも更新
-    _updateCalFocus();
+  }
+
+  function _openLive(dateStr, filterVal) {
+    const es = new EventSource(
+      `/api/io/info/live?date=${dateStr}&filter=${encodeURIComponent(filterVal)}`
+    );
+    S.live = es;
+
+    es.addEventListener("snapshot", e => {
+      const data = JSON.parse(e.data);
+      S.liveRecords = new Map(data.records.map(r => [r.id, r]));
+      _renderLive();
+    });
+    es.addEventListener("upsert", e => {
+      const r = JSON.parse(e.data);
+      S.liveRecords.set(r.id, r);
+      _renderLive();
+    });
+    es.addEventListener("delete", e => {
+      S.liveRecords.delete(JSON.parse(e.data).id);
+      _renderLive();
+    });
+  }
+
+  function _closeLive() {
+    if (S.live) {
+      S.live.close();
+      S.live = null;
+    }
+    S.liveRecords = new Map();
+  }
+
+  function _renderLive() {
+    if (S.mode !== "daily") return;
+    const records = [...S.liveRecords.values()]
+      .sort((a, b) => (a.in_time ?? "").localeCompare(b.in_time ?? ""));
+    const inCnt = records.filter(r => !r.out_time).length;
+    _renderDailyTable(records, false);
+    _updateStats(records.length, inCnt, records.length - inCnt);
   }
 
   /* ════════════════════════════════════════
      山チン / 備考あり：全件表示（項2）
   ════════════════════════════════════════ */
   async function loadSpecialAll(type) {
+    _closeLive();
     S.mode          = "special";
     S.specialType   = type;
     S.specialPeriod = "all";
@@ -468,21 +538,16 @@ const InfoApp = (() => {
     $("filterLabelBar").style.display = "block";
     $("col-date").style.display       = "";
 
-    try {
-      const data = await apiFetch(
-        `/api/io/info/special?type=${encodeURIComponent(type)}&period=all&filter=all`
-      );
-      _renderDailyTable(data.records, true);
-      _updateStats(data.count, null, null);
-    } catch (e) {
-      toast("フィルター取得に失敗しました: " + e.message, "error");
-    }
+    await _loadSpecialPage(
+      `/api/io/info/special?type=${encodeURIComponent(type)}&period=all&filter=all`
+    );
   }
 
   /* ════════════════════════════════════════
      特殊フィルター ロード（個人系: 項5〜8）
   ════════════════════════════════════════ */
   async function loadSpecialFilter(type, period, memberQuery = "") {
+    _closeLive();
     S.mode = "special";
     _updateDateNav();
 
@@ -505,15 +570,49 @@ const InfoApp = (() => {
     if (memberQuery) url += `&query=${encodeURIComponent(memberQuery)}`;
     if (S.memberUUID) url += `&uuid=${encodeURIComponent(S.memberUUID)}`;
 
+    await _loadSpecialPage(url);
+  }
+
+  /* ════════════════════════════════════════
+     特殊フィルター ページング
+     url を指定すると先頭から、省略すると next_after の続きを読み込む
+  ════════════════════════════════════════ */
+  async function _loadSpecialPage(url = null, after = null) {
+    if (url) {
+      S.specialUrl     = url;
+      S.specialRecords = [];
+    }
+    const base = S.specialUrl;
+    let pageUrl = `${base}&limit=${SPECIAL_PAGE_SIZE}`;
+    if (after) pageUrl += `&after=${encodeURIComponent(after)}`;
+
     try {
-      const data = await apiFetch(url);
-      _renderDailyTable(data.records, true);
+      const data = await apiFetch(pageUrl);
+      if (S.mode !== "special" || S.specialUrl !== base) return;  // 別の表示に切り替え済み
+      S.specialRecords = S.specialRecords.concat(data.records);
+      _renderDailyTable(S.specialRecords, true);
+      if (data.has_more) _appendMoreRow(data.next_after, data.count);
       _updateStats(data.count, null, null);
     } catch (e) {
       toast("フィルター取得に失敗しました: " + e.message, "error");
     }
   }
 
+  function _appendMoreRow(nextAfter, total) {
+    const tr = document.createElement("tr");
+    tr.innerHTML = `
+      <td colspan="9" class="info-more">
+        <button type="button" class="info-more-btn">
+          さらに表示（${S.specialRecords.length} / ${total ?? "—"} 件）
+        </button>
+      </td>`;
+    tr.querySelector("button").addEventListener("click", e => {
+      e.currentTarget.disabled = true;
+      _loadSpecialPage(null, nextAfter);
+    });
+    $("dailyTbody").appendChild(tr);
+  }
+
   /* ════════════════════════════════════════
      テーブル描画
   ════════════════════════════════════════ */
@@ -647,7 +746,7 @@ const InfoApp = (() => {
       toast("保存しました");
       closeDetailModal();
       if (S.mode === "daily") {
-        loadDailyView();
+        if (!S.live) loadDailyView();   // ライブボード接続中は変更が自動で届く
       } else if (S.classFilter === "yamachin" || S.classFilter === "comment") {
         loadSpecialAll(S.classFilter);
       } else {
@@ -781,12 +880,7 @@ const InfoApp = (() => {
           const filterVal = ["all","年会員","冬季会員","スクール","ビジター"].includes(cf)
             ? cf : "all";
 
-          apiFetch(`/api/io/info/daily?date=${dateToISO(S.currentDate)}&filter=${encodeURIComponent(filterVal)}`)
-            .then(data => {
-              _renderDailyTable(data.records, false);
-              _updateStats(data.total, data.in_count, data.out_count);
-            })
-            .catch(e => toast("データの取得に失敗しました: " + e.message, "error"));
+          _loadDaily(dateToISO(S.currentDate), filterVal);
         }
       });
 
@@ -0,0 +1,85 @@
+"""
+member_projection_query() の発行クエリ数（N+1 の回帰テスト）
+
+members / member_flyers / member_contacts / member_courses だけを
+インメモリ SQLite に作成し、会員数を変えても一覧の取得が1クエリのままであることを確認する。
+"""
+
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+from app.db import db, init_db
+from app.models.member import Member
+from app.models.member_application import MemberApplication
+from app.models.member_contact import MemberContact
+from app.models.member_course import MemberCourse
+from app.models.member_flyer import MemberFlyer
+from app.routes.member_projection import member_projection_query, member_row_to_list_dict
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    init_db(app)
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[
+            Member.__table__, MemberApplication.__table__, MemberFlyer.__table__,
+            MemberContact.__table__, MemberCourse.__table__,
+        ])
+        yield app
+        db.session.remove()
+
+
+def _add_members(start, count):
+    for i in range(start, start + count):
+        m = Member(member_number=f"{i:05d}", full_name=f"会員{i}", member_status="active")
+        db.session.add(m)
+        db.session.flush()
+        db.session.add_all([
+            MemberFlyer(member_id=m.id, license="NP", glider_name=f"機体{i}"),
+            MemberContact(member_id=m.id, email=f"m{i}@example.com"),
+            MemberCourse(member_id=m.id, member_type="年会員", status="active",
+                         start_date=date(2026, 1, 1)),
+        ])
+    db.session.commit()
+
+
+@contextmanager
+def _count_queries():
+    statements = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _before)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _before)
+
+
+def _list_members():
+    rows = member_projection_query().order_by(Member.id).all()
+    return [member_row_to_list_dict(r) for r in rows]
+
+
+def test_member_list_is_single_query(app):
+    _add_members(1, 3)
+    with _count_queries() as few:
+        items = _list_members()
+    assert len(items) == 3
+
+    _add_members(4, 20)
+    with _count_queries() as many:
+        items = _list_members()
+    assert len(items) == 23
+
+    # 会員数によらず1クエリ
+    assert len(few) == len(many) == 1
+    assert items[0]["member_type"] == "年会員"
+    assert items[0]["glider_name"] == "機体1"
@@ -0,0 +1,43 @@
+"""
+各画面のクエリが想定したインデックスを使うことの確認（flask schema explain と同じ判定）
+
+PostgreSQL の DATABASE_URL が必要（起動時 DDL とマイグレーションを適用したうえで
+EXPLAIN を取る）。それ以外の環境ではスキップする。
+"""
+
+import os
+
+import pytest
+
+from app.db import db
+
+
+DATABASE_URL = os.environ.get("DATABASE_URL", "")
+
+pytestmark = pytest.mark.skipif(
+    not DATABASE_URL.startswith(("postgresql://", "postgres://")),
+    reason="EXPLAIN の確認には PostgreSQL の DATABASE_URL が必要",
+)
+
+
+@pytest.fixture(scope="module")
+def app():
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+def test_hot_queries_use_their_indexes(app):
+    from app.routes.schema_migrations import apply_migrations, explain_hot_queries
+
+    apply_migrations()
+    results = explain_hot_queries()
+    assert results
+
+    failed = [
+        f"{r['name']}（{r['index']}）: " + (r.get("error") or f"使用: {', '.join(r['indexes']) or 'なし'}")
+        for r in results if not r["used"]
+    ]
+    assert not failed, "\n".join(failed)